@@ -0,0 +1,77 @@
+"""
+Compare the grid and numpy backed :meth:`StarMapConstants.mapAdjacents` against the original all-pairs scan
+
+    python -m benchmarks.bench_adjacency --sizes 3000 10000 20000
+"""
+import argparse
+import math
+import time
+
+from roguewarapi.data import StarMapConstants
+from roguewarapi.data.neighborgraph import hasNumpy
+
+from .synthetic import makeConstantsPayload
+
+
+def bruteForceAdjacents(consts, maxDistance):
+    """
+    the original O(n^2) adjacency scan, kept as the reference implementation
+
+    :return: the adjacency lists in system order
+    :rtype: list[list[str]]
+    """
+    result = []
+    for const in consts:
+        adjacent = []
+        for other in consts:
+            if other.name != const.name:
+                if (const.posx - maxDistance <= other.posx <= const.posx + maxDistance) and (const.posy - maxDistance <= other.posy <= const.posy + maxDistance):
+                    if math.sqrt(pow(const.posx - other.posx, 2) + pow(const.posy - other.posy, 2)) <= maxDistance:
+                        adjacent.append(other.name)
+        result.append(adjacent)
+    return result
+
+
+def _timeBackend(payload, radius, useNumpy):
+    constants = StarMapConstants()
+    constants.fromJson(payload)
+    stTime = time.perf_counter()
+    constants.mapAdjacents(radius, useNumpy=useNumpy)
+    return constants, time.perf_counter() - stTime
+
+
+def run(sizes, radius, bruteLimit):
+    print(f'{"systems":>8} {"grid (s)":>10} {"numpy (s)":>10} {"brute (s)":>10} {"speedup":>8}  match')
+    for size in sizes:
+        payload = makeConstantsPayload(size, radius=radius)
+        constants, gridTime = _timeBackend(payload, radius, False)
+        lists = [const.adjacentSystems for const in constants.systemConstants]
+        numpyTime = '-'
+        match = True
+        if hasNumpy():
+            numpyConstants, elapsed = _timeBackend(payload, radius, True)
+            numpyTime = f'{elapsed:.3f}'
+            match = lists == [const.adjacentSystems for const in numpyConstants.systemConstants]
+
+        if size > bruteLimit:
+            print(f'{size:>8} {gridTime:>10.3f} {numpyTime:>10} {"-":>10} {"-":>8}  {match}')
+            continue
+        stTime = time.perf_counter()
+        expected = bruteForceAdjacents(constants.systemConstants, radius)
+        bruteTime = time.perf_counter() - stTime
+        match = match and expected == lists
+        print(f'{size:>8} {gridTime:>10.3f} {numpyTime:>10} {bruteTime:>10.3f} {bruteTime / gridTime:>7.1f}x  {match}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[3000, 10000, 20000])
+    parser.add_argument('--radius', type=float, default=50)
+    parser.add_argument('--brute-limit', type=int, default=20000,
+                        help='skip the all-pairs reference above this many systems')
+    args = parser.parse_args()
+    run(args.sizes, args.radius, args.brute_limit)
+
+
+if __name__ == '__main__':
+    main()
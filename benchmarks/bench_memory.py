@@ -0,0 +1,65 @@
+"""
+Measure the memory held by a parsed map with tracemalloc, comparing the regular classes against the slotted and
+columnar forms
+
+    python -m benchmarks.bench_memory --systems 10000
+"""
+import argparse
+import gc
+import tracemalloc
+
+from roguewarapi.data import StarMap, SlottedStarMap, StarMapConstants, SlottedStarMapConstants, ColumnarStarMap
+
+from .synthetic import makeStarMapPayload, makeConstantsPayload
+
+
+def _parse(cls, payload):
+    obj = cls()
+    obj.fromJson(payload)
+    return obj
+
+
+def retainedBytes(build, payload):
+    """
+    :param build: a function turning the payload into the object being measured
+    :param payload: the json payload, built before measuring so it isn't counted
+    :type payload: dict
+    :return: the number of bytes still allocated by the built object once building is done
+    :rtype: int
+    """
+    # build once up front so one-off costs such as the member schema and generated code aren't counted
+    build(payload)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        obj = build(payload)
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del obj
+    return retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--systems', type=int, default=10000)
+    args = parser.parse_args()
+
+    mapPayload = makeStarMapPayload(args.systems)
+    constPayload = makeConstantsPayload(args.systems)
+    rows = [
+        ('starmap', lambda payload: _parse(StarMap, payload), mapPayload),
+        ('slotted', lambda payload: _parse(SlottedStarMap, payload), mapPayload),
+        ('columnar', ColumnarStarMap.fromJson, mapPayload),
+        ('constants', lambda payload: _parse(StarMapConstants, payload), constPayload),
+        ('slotted', lambda payload: _parse(SlottedStarMapConstants, payload), constPayload),
+    ]
+    print(f'{args.systems} systems')
+    print(f'{"":>10} {"retained (MiB)":>15}')
+    for label, build, payload in rows:
+        print(f'{label:>10} {retainedBytes(build, payload) / 2 ** 20:>15.2f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Time :meth:`StarMap.fromJson` and :meth:`StarMap.toJson` on a large synthetic map with the original reflection code,
+the cached member schema and the generated (de)serializers
+
+    python -m benchmarks.bench_parse --systems 5000
+"""
+import argparse
+import time
+
+from roguewarapi.data import StarMap
+
+from .legacy import genericSerialization, legacySerialization
+from .synthetic import makeStarMapPayload
+
+
+def _best(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        stTime = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - stTime
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _parse(payload):
+    starmap = StarMap()
+    starmap.fromJson(payload)
+    return starmap
+
+
+def measure(payload, repeat):
+    """
+    :return: the best parse and serialize times, in seconds, and the serialized map
+    :rtype: tuple[float, float, str]
+    """
+    parseTime, starmap = _best(lambda: _parse(payload), repeat)
+    dumpTime, dumped = _best(starmap.toJson, repeat)
+    return parseTime, dumpTime, dumped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--systems', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    payload = makeStarMapPayload(args.systems)
+    with legacySerialization():
+        beforeParse, beforeDump, beforeJson = measure(payload, args.repeat)
+    with genericSerialization():
+        schemaParse, schemaDump, schemaJson = measure(payload, args.repeat)
+    afterParse, afterDump, afterJson = measure(payload, args.repeat)
+
+    print(f'{args.systems} systems')
+    print(f'{"":>10} {"before (s)":>11} {"schema (s)":>11} {"generated (s)":>14} {"speedup":>8}')
+    print(f'{"fromJson":>10} {beforeParse:>11.3f} {schemaParse:>11.3f} {afterParse:>14.3f} {beforeParse / afterParse:>7.1f}x')
+    print(f'{"toJson":>10} {beforeDump:>11.3f} {schemaDump:>11.3f} {afterDump:>14.3f} {beforeDump / afterDump:>7.1f}x')
+    print(f'identical output: {beforeJson == schemaJson == afterJson}')
+
+if __name__ == '__main__':
+    main()
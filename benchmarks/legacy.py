@@ -0,0 +1,157 @@
+"""
+The original reflection based serialization of :class:`BaseDataObject`, kept so benchmarks can measure the
+"before" numbers against the current implementation
+"""
+import base64
+import contextlib
+import inspect
+from collections import OrderedDict
+
+from roguewarapi.data import BaseDataObject
+
+
+def _get_members(self, bol_include_props=False):
+    """
+    get all non-private member attributes
+
+    .. note::
+        if you wish to exclude a non-private member, add that member to :attr:`_ExcludeFromMemebers`
+
+    :return: a list of all members that are not private, functions or properties
+    :rtype: list
+    """
+    lst_members = inspect.getmembers(self)
+    lst_filtered_members = []
+    for member in lst_members:
+        # print member
+        if member[0].startswith(
+                '__'):  # remove all members that use the standard double underscore, this removes most of the default python object members
+            pass
+        elif member[0].startswith('_'):  # remove private members that we declare
+            pass
+        elif callable(getattr(self, member[0])):  # remove any member that is callable, we only want attributes
+            pass
+        elif isinstance(getattr(type(self), member[0], getattr(self, member[0])),
+                        property):  # exclude properties because they are just for readability
+            if bol_include_props:
+                lst_filtered_members.append(member)
+        elif member[0] == 'JSON_Type':  # remove the attributes from this base class so that only the ones added by child classes remain
+            pass
+        elif member[0] in self._ExcludeFromMemebers:
+            pass
+        else:
+            lst_filtered_members.append(member)
+    return lst_filtered_members
+
+
+def _fromJson(self, dct_json):
+    """
+    populate this object from a json string representation of the object
+
+    :param dct_json: the json representation
+    :type dct_json: OrderedDict
+    :return: True if successful, False otherwise
+    :rtype: bool
+    """
+
+    lst_members = self._get_members()
+    for member in lst_members:
+        if member[0] in dct_json:
+            try:
+                if member[0] in self._B64Memebers:
+                    setattr(self, member[0], base64.standard_b64decode(dct_json[member[0]]))
+                else:
+                    setattr(self, member[0], dct_json[member[0]])
+            except Exception as e:
+                return False
+    for item in self._SubObjectMapping:
+        # Set the containing list as empty
+
+        obj_tmp = None
+        if not item.isList:
+            obj_tmp = dct_json
+        if item.JsonContainer is not None:
+            if item.JsonContainer in dct_json:
+                obj_tmp = dct_json[item.JsonContainer]
+
+        if item.isList:
+            setattr(self, item.Container, [])
+            obj_container = getattr(self, item.Container)
+
+            if obj_tmp is not None:
+                for tag in obj_tmp:
+                    new_obj = item.SubClass()
+                    new_obj._fromJson(tag)
+                    obj_container.append(new_obj)
+        else:
+            new_obj = item.SubClass()
+            if item.SubClass.JSON_Type in obj_tmp:
+                new_obj._fromJson(obj_tmp[item.SubClass.JSON_Type])
+            setattr(self, item.Container, new_obj)
+
+    return True
+
+
+def _toJson(self):
+    """
+    make an json representation of this object
+
+    :return: an JSON representation of the object
+    :rtype: OrderedDict
+    """
+
+    lst_members = self._get_members()
+    dct_json = OrderedDict()
+    if self._useStdDict:
+        dct_json = {}
+    for member in lst_members:
+        if member[1] is None:
+            pass
+        else:
+            member_data = member[1]
+            if member[0] in self._B64Memebers:
+                dct_json[member[0]] = base64.standard_b64encode(member_data)
+            else:
+                dct_json[member[0]] = member[1]
+    for item in self._SubObjectMapping:
+        json_tmp = item.SubClass.JSON_Type
+        if item.JsonContainer is not None:
+            dct_json[item.JsonContainer] = []
+            json_tmp = item.JsonContainer
+        member = getattr(self, item.Container)
+        if item.isList:
+            for obj in member:
+                dct_json[json_tmp].append(obj._toJson())
+        else:
+            if member is not None:
+                dct_json[json_tmp] = member._toJson()
+    return dct_json
+
+
+@contextlib.contextmanager
+def legacySerialization():
+    """
+    swap the original serialization methods onto :class:`BaseDataObject` for the duration of a with block
+    """
+    saved = {name: BaseDataObject.__dict__[name] for name in ('_get_members', '_fromJson', '_toJson')}
+    BaseDataObject._get_members = _get_members
+    BaseDataObject._fromJson = _fromJson
+    BaseDataObject._toJson = _toJson
+    try:
+        yield
+    finally:
+        for name, func in saved.items():
+            setattr(BaseDataObject, name, func)
+
+
+@contextlib.contextmanager
+def genericSerialization():
+    """
+    turn off the generated (de)serializers for the duration of a with block, so the generic schema driven
+    implementation is used
+    """
+    BaseDataObject._useGeneratedCode = False
+    try:
+        yield
+    finally:
+        BaseDataObject._useGeneratedCode = True
@@ -0,0 +1,217 @@
+"""
+Run every benchmark over synthetic maps of several sizes, write the results as json and optionally check them against a
+stored baseline
+
+    python -m benchmarks.run --sizes 1000 5000 --output results.json
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --tolerance 0.25
+
+A baseline is only meaningful on the machine it was recorded on, the one committed as benchmarks/baseline.json is a
+reference point whose `meta` records where it was made, record your own before checking against it. The check fails,
+exiting with 1, when any benchmark's best time is more than `tolerance` slower than its baseline
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+
+from roguewarapi import RogueWarApi
+from roguewarapi.data import LazyStarMap, StarMap, StarMapConstants, kFactions
+from roguewarapi.data.neighborgraph import hasNumpy
+
+from .stubserver import StubServer
+from .synthetic import makeConstantsPayload, makeStarMapPayload, systemNames
+
+_Lookups = 1000  # query benchmarks time this many calls and report the time per call
+
+
+def timeIt(func, repeat, setup=None, calls=1):
+    """
+    time a function
+
+    :param func: the function, called with the result of `setup` if there is one
+    :param repeat: how many times to time it
+    :type repeat: int
+    :param setup: optional, called before each timing and not timed itself
+    :param calls: the number of calls `func` makes of the thing being measured, times are divided by this
+    :type calls: int
+    :return: the best and median time per call, in seconds
+    :rtype: dict[str, float]
+    """
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        stTime = time.perf_counter()
+        if setup is not None:
+            func(arg)
+        else:
+            func()
+        times.append((time.perf_counter() - stTime) / calls)
+    return {'best': min(times), 'median': statistics.median(times), 'repeat': repeat}
+
+
+def _parsed(cls, payload):
+    obj = cls()
+    obj.fromJson(payload)
+    return obj
+
+
+def _lookupAll(func, keys):
+    for key in keys:
+        func(key)
+
+
+def benchmarkSize(size, repeat, radius):
+    """
+    :return: the results of every benchmark over maps of `size` systems, keyed by benchmark name
+    :rtype: dict[str, dict[str, float]]
+    """
+    mapPayload = makeStarMapPayload(size)
+    constPayload = makeConstantsPayload(size, radius=radius)
+    starmap = _parsed(StarMap, mapPayload)
+    constants = _parsed(StarMapConstants, constPayload)
+    constants.mapAdjacents(radius)
+    names = systemNames(size)
+    step = max(1, size // _Lookups)
+    lookups = (names[::step] * _Lookups)[:_Lookups]
+    factions = kFactions.listItemNames()
+    factionLookups = (factions * _Lookups)[:_Lookups]
+
+    results = {
+        'starmap.fromJson': timeIt(lambda: _parsed(StarMap, mapPayload), repeat),
+        'starmap.fromJson.lazy': timeIt(lambda: _parsed(LazyStarMap, mapPayload), repeat),
+        'starmap.toJson': timeIt(starmap.toJson, repeat),
+        'constants.fromJson': timeIt(lambda: _parsed(StarMapConstants, constPayload), repeat),
+        'constants.toJson': timeIt(constants.toJson, repeat),
+        # each run maps a fresh object, the constants cache their graphs
+        'constants.mapAdjacents': timeIt(lambda constants: constants.mapAdjacents(radius), repeat,
+                                         setup=lambda: _parsed(StarMapConstants, constPayload)),
+        'starmap.findSystem': timeIt(lambda: _lookupAll(starmap.findSystem, lookups), repeat, calls=_Lookups),
+        'starmap.findSystemsByOwner': timeIt(lambda: _lookupAll(starmap.findSystemsByOwner, factionLookups), repeat,
+                                             calls=_Lookups),
+    }
+    if hasNumpy():
+        results['constants.mapAdjacents.python'] = timeIt(
+            lambda constants: constants.mapAdjacents(radius, useNumpy=False), repeat,
+            setup=lambda: _parsed(StarMapConstants, constPayload))
+    results.update(benchmarkRequests(mapPayload, constPayload, repeat))
+    return results
+
+
+def benchmarkRequests(mapPayload, constPayload, repeat):
+    """
+    time the client's request path against a local stub server, every call misses the cache
+
+    :rtype: dict[str, dict[str, float]]
+    """
+    logger = logging.NullHandler()
+    with StubServer({'getmap': mapPayload, 'getsystemstatic': constPayload}) as server:
+        with RogueWarApi('benchmark', 'secret', url=server.url, loggerhandler=logger, starMapTtl=0) as api:
+            api.getStarMap()  # authenticate and open the connection outside the timings
+            return {
+                'api.getStarMap': timeIt(api.getStarMap, repeat),
+                'api.getSystemConstants': timeIt(lambda: api.getSystemConstants(bForce=True), repeat),
+            }
+
+
+def benchmarkEnums(repeat):
+    names = kFactions.listItemNames()
+    lookups = (names * _Lookups)[:_Lookups]
+    return {
+        'kFactions.findByName': timeIt(lambda: _lookupAll(kFactions.findByName, lookups), repeat, calls=_Lookups),
+    }
+
+
+def runAll(sizes, repeat, radius=50, only=None):
+    """
+    :param only: optional, only keep benchmarks whose name contains this
+    :type only: str
+    :return: the results document
+    :rtype: dict
+    """
+    results = {}
+    for name, result in benchmarkEnums(repeat).items():
+        results[name] = result
+    for size in sizes:
+        for name, result in benchmarkSize(size, repeat, radius).items():
+            results[f'{name}[{size}]'] = result
+    if only is not None:
+        results = {name: result for name, result in results.items() if only in name}
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'numpy': hasNumpy(),
+            'sizes': list(sizes),
+            'repeat': repeat,
+            'time': time.time(),
+        },
+        'results': results,
+    }
+
+
+def compare(document, baseline, tolerance):
+    """
+    compare results against a baseline
+
+    :param tolerance: how much slower than the baseline a result may be, 0.25 allows 25%
+    :type tolerance: float
+    :return: the name, baseline time, current time and ratio of every benchmark in both, and the names of the
+        regressions
+    :rtype: tuple[list[tuple[str, float, float, float]], list[str]]
+    """
+    rows = []
+    regressions = []
+    for name, result in document['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        ratio = result['best'] / before['best'] if before['best'] else float('inf')
+        rows.append((name, before['best'], result['best'], ratio))
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--radius', type=float, default=50)
+    parser.add_argument('--only', help='only run benchmarks whose name contains this')
+    parser.add_argument('--output', help='write the results to this json file')
+    parser.add_argument('--save-baseline', help='write the results to this json file as the new baseline')
+    parser.add_argument('--baseline', help='a baseline json file to check the results against')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    document = runAll(args.sizes, args.repeat, args.radius, args.only)
+    for str_name in (args.output, args.save_baseline):
+        if str_name:
+            with open(str_name, 'w') as m_file:
+                json.dump(document, m_file, indent=2, sort_keys=True)
+
+    if not args.baseline:
+        for name, result in document['results'].items():
+            print(f'{name:<45} {result["best"] * 1e3:>12.4f} ms {result["median"] * 1e3:>12.4f} ms')
+        return 0
+
+    with open(args.baseline) as m_file:
+        baseline = json.load(m_file)
+    rows, regressions = compare(document, baseline, args.tolerance)
+    print(f'{"benchmark":<45} {"baseline (ms)":>14} {"current (ms)":>14} {"ratio":>7}')
+    for name, before, after, ratio in rows:
+        flag = '  REGRESSION' if name in regressions else ''
+        print(f'{name:<45} {before * 1e3:>14.4f} {after * 1e3:>14.4f} {ratio:>6.2f}x{flag}')
+    if regressions:
+        print(f'{len(regressions)} regression(s) beyond {args.tolerance:.0%}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
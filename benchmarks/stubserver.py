@@ -0,0 +1,76 @@
+"""
+A local stand-in for the RogueWar service, serving synthetic payloads so the client's request path can be timed
+without a network
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_Token = 'benchmark-token'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, code, body=b''):
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.requests += 1
+        if self.headers.get('Authorization') != f'Bearer {_Token}':
+            return self._send(401)
+        body = self.server.routes.get(self.path.split('?')[0].rsplit('/', 1)[-1])
+        if body is None:
+            return self._send(404)
+        self._send(200, body)
+
+    def do_POST(self):
+        self.server.requests += 1
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self._send(200, json.dumps({'access_token': _Token}).encode())
+
+
+class StubServer(object):
+    """
+    Serves json payloads by endpoint name on a free local port, with the same bearer token authentication as the real
+    service. Use it as a context manager
+    """
+
+    def __init__(self, routes):
+        """
+        :param routes: the json-style payload of each endpoint, such as ``{'getmap': makeStarMapPayload(1000)}``
+        :type routes: dict[str, object]
+        """
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.routes = {name: json.dumps(payload).encode() for name, payload in routes.items()}
+        self._server.requests = 0
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        """
+        the url to pass to a client
+        """
+        return f'http://127.0.0.1:{self._server.server_port}'
+
+    @property
+    def requests(self):
+        """
+        the number of requests served so far
+        """
+        return self._server.requests
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,82 @@
+import math
+import random
+
+from roguewarapi.data import kFactions
+
+
+def _extentFor(count, neighbours, radius):
+    # size the square map so that each system has roughly `neighbours` others within `radius`
+    density = neighbours / (math.pi * radius * radius)
+    return math.sqrt(count / density)
+
+
+def systemNames(count):
+    """
+    :param count: how many names to generate
+    :type count: int
+    :return: unique, deterministic star system names
+    :rtype: list[str]
+    """
+    return [f'System-{index:05d}' for index in range(count)]
+
+
+def makeConstantsPayload(count, seed=1, neighbours=10, radius=50):
+    """
+    build a synthetic `getsystemstatic` payload
+
+    :param count: the number of star systems
+    :type count: int
+    :param seed: the random seed, the same seed always produces the same payload
+    :type seed: int
+    :param neighbours: the average number of systems within `radius` of each system
+    :type neighbours: float
+    :param radius: the radius used to size the map
+    :type radius: float
+    :return: a json-style dict
+    :rtype: dict
+    """
+    rand = random.Random(seed)
+    half = _extentFor(count, neighbours, radius) / 2
+    factions = kFactions.listItemNames()
+    coordinates = []
+    for name in systemNames(count):
+        coordinates.append({
+            'name': name,
+            'posx': round(rand.uniform(-half, half), 3),
+            'posy': round(rand.uniform(-half, half), 3),
+            'originalOwner': rand.choice(factions),
+        })
+    return {'Coordinates': coordinates}
+
+
+def makeStarMapPayload(count, seed=1, factionsPerSystem=3):
+    """
+    build a synthetic `getmap` payload
+
+    :param count: the number of star systems
+    :type count: int
+    :param seed: the random seed, the same seed always produces the same payload
+    :type seed: int
+    :param factionsPerSystem: the maximum number of faction control entries on each system
+    :type factionsPerSystem: int
+    :return: a json-style dict
+    :rtype: dict
+    """
+    rand = random.Random(seed)
+    factions = kFactions.listItemNames()
+    systems = []
+    for name in systemNames(count):
+        present = rand.sample(factions, rand.randint(1, factionsPerSystem))
+        systems.append({
+            'Players': rand.randint(0, 12),
+            'immuneFromWar': rand.random() < 0.05,
+            'markerType': rand.choice((0, 0, 0, 1, 2)),
+            'name': name,
+            'owner': present[0],
+            'factions': [{
+                'Name': faction,
+                'control': rand.randint(0, 100),
+                'ActivePlayers': rand.randint(0, 4),
+            } for faction in present],
+        })
+    return {'starsystems': systems}
@@ -1,2 +1,6 @@
+from .apibase import RequestError
 from .roguewarapi import RogueWarApi
+from .batch import BatchResult, fetchBatch, fetchBatchAsync, isRetryable
+from .asyncroguewarapi import AsyncRogueWarApi
+from .metrics import Metrics, MetricsRecorder, CallbackMetrics, PhaseStats
 from .data import *
\ No newline at end of file
@@ -0,0 +1,298 @@
+import logging
+import json
+import time
+import traceback
+
+from .data import StarMap, CacheManager, StarMapConstants, GlobalData
+from .data.snapshot import readSnapshotTag
+from .metrics import Metrics
+
+
+class RequestError(Exception):
+    """
+    Raised when the service answers a request with an error status
+    """
+
+    def __init__(self, status, url):
+        """
+        :param status: the http status code
+        :type status: int
+        :param url: the url requested
+        :type url: str
+        """
+        super().__init__(f'{url} failed with status {status}')
+        self.status = status  #: the http status code
+        self.url = url  #: the url requested
+
+
+class RogueWarApiBase:
+    """
+    The transport independent parts of a RogueWar API client: configuration, request headers and urls, and turning
+    json responses into data objects
+
+    .. warning::
+        Don't ever invoke on its own, use :class:`RogueWarApi <roguewarapi.RogueWarApi>` or
+        :class:`AsyncRogueWarApi <roguewarapi.AsyncRogueWarApi>`
+    """
+    _Version = "0.0.X"
+    DefaultUri = 'http://roguewar.org'  #: the default URI of the RogueWar service
+    _UserAgent = f'RogueWarApi/{_Version}'
+
+    _kStarMapCacheKey = "kStarMap"
+    _AdjacencyRadius = 50  # used until the server's support radius is known
+
+    NotModified = object()  #: returned by requests the server answered with 304 Not Modified
+
+    BatchRequests = ('globalData', 'systemConstants', 'starMap')  #: the requests :meth:`fetchBatch` can make
+    #: the requests :meth:`fetchBatch` makes by default, global data is left out as not every server serves it
+    DefaultBatch = ('systemConstants', 'starMap')
+    _BatchRequests = {'globalData': '_refreshGlobalData', 'systemConstants': '_refreshSystemConstants',
+                      'starMap': '_refreshStarMap'}
+
+
+    def __init__(self, appName, appSecret, url=None, loggerhandler=None, starMapTtl=60, staleWhileRevalidate=False,
+                 starMapGrace=300, snapshotPath=None, metrics=None, starMapCls=StarMap,
+                 globalDataUri='getglobaldata'):
+        """
+        :param appName: the name of the client, use the name provided to you as part of your Name/Secret combo for authentication
+        :type appName: str
+        :param appSecret: the client secret you were given for API access
+        :type appSecret: str
+        :param url: optional, the url to the service, if not supplied a default is used
+        :type url: str
+        :param loggerhandler: optional, a standard python logging handler object
+        :type loggerhandler: logging.Handler
+        :param starMapTtl: optional, the number of seconds a fetched starmap is considered fresh
+        :type starMapTtl: float
+        :param staleWhileRevalidate: optional, when True an expired starmap is returned straight away while a fresh one
+            is fetched in the background
+        :type staleWhileRevalidate: bool
+        :param starMapGrace: optional, how many seconds past expiry a starmap may still be returned while revalidating
+        :type starMapGrace: float
+        :param snapshotPath: optional, a file to keep a snapshot of the system constants in, so a new client can load
+            them, adjacency included, without downloading and mapping them once the server confirms they are current
+        :type snapshotPath: str
+        :param metrics: optional, receives the timings of each phase of a call, see :class:`Metrics <roguewarapi.Metrics>`
+        :type metrics: Metrics
+        :param starMapCls: optional, the starmap class to build, such as :class:`LazyStarMap <roguewarapi.data.LazyStarMap>`
+            to only decode the parts of the map that are read
+        :param globalDataUri: optional, the endpoint serving the server's :class:`GlobalData <roguewarapi.data.GlobalData>`,
+            relative to the api url
+        :type globalDataUri: str
+
+        """
+        self.appName = appName
+        self.appSecret = appSecret
+        self.BaseUri = self.DefaultUri + '/api/'
+        if url is not None:
+            self.BaseUri = url + '/api/'
+        self.appToken = ''
+        self.Logger = logging.getLogger("RogueWarApi")
+        self.Logger.setLevel(logging.INFO)
+        if loggerhandler is None:
+            nullhandler = logging.NullHandler()
+            self.Logger.addHandler(nullhandler)
+        else:
+            self.Logger.addHandler(loggerhandler)
+        self.cache = CacheManager()
+        self.starMapTtl = starMapTtl
+        self.staleWhileRevalidate = staleWhileRevalidate
+        self.starMapGrace = starMapGrace
+        self.snapshotPath = snapshotPath
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.starMapCls = starMapCls
+        self.globalDataUri = globalDataUri
+        self.starMapConstants = None # type: StarMapConstants
+        self.globalData = None  # type: GlobalData
+        self._headers = None # type: tuple[str, dict]
+        self._validators = {}  # type: dict[str, tuple[str, str]]
+        self._lastStarMap = None  # type: StarMap
+
+    @property
+    def supportRadius(self):
+        """
+        the radius system adjacency is mapped with, the server's `SupportRadius` once the global data has been fetched
+
+        :rtype: float
+        """
+        if self.globalData is not None and self.globalData.SupportRadius > 0:
+            return self.globalData.SupportRadius
+        return self._AdjacencyRadius
+
+    def _cachedStarMap(self):
+        """
+        look up the cached starmap
+
+        :return: the cached map, or None, and whether it has to be refreshed
+        :rtype: tuple[StarMap, bool]
+        """
+        entry = self.cache.getCacheEntry(self._kStarMapCacheKey)
+        if entry is None:
+            self.metrics.count('cache.miss', key=self._kStarMapCacheKey)
+            return None, True
+        now = time.time()
+        if not entry.isExpired(now):
+            self.metrics.count('cache.hit', key=self._kStarMapCacheKey)
+            return entry.data, False
+        if self.staleWhileRevalidate and now < entry.expireTime + self.starMapGrace:
+            self.metrics.count('cache.stale', key=self._kStarMapCacheKey)
+            return entry.data, True
+        self.metrics.count('cache.miss', key=self._kStarMapCacheKey)
+        return None, True
+
+    def _cacheStarMap(self, starmap):
+        # an expired map is only worth keeping while it may still be served stale
+        stale = self.starMapGrace if self.staleWhileRevalidate else 0
+        self.cache.placeCacheItem(self._kStarMapCacheKey, starmap, self.starMapTtl, stale)
+
+    def _getHeaders(self, cHeaders):
+        # the default headers only change when the token does, so they are built once per token, and kept together
+        # with it so threads never see the headers of one token paired with another
+        token = self.appToken
+        cached = self._headers
+        if cached is None or cached[0] != token:
+            headers = {'User-Agent': self._UserAgent, 'content-type': 'application/json', f'Authorization': f'Bearer {token}'}
+            if token == '':
+                del headers['Authorization']
+            cached = self._headers = (token, headers)
+        if cHeaders is None:
+            return cached[1]
+        headers = dict(cached[1])
+        for header in cHeaders:
+            headers[header] = cHeaders[header]
+            if headers[header] == '':
+                del headers[header]
+        return headers
+
+    def _conditionalHeaders(self, url, cHeaders):
+        """
+        add the validators of the last response from `url` to a set of request headers, so the server can answer
+        with 304 Not Modified if nothing has changed
+        """
+        validators = self._validators.get(url)
+        if validators is None:
+            return cHeaders
+        headers = dict(cHeaders) if cHeaders is not None else {}
+        etag, modified = validators
+        if etag:
+            headers['If-None-Match'] = etag
+        if modified:
+            headers['If-Modified-Since'] = modified
+        return headers
+
+    def _storeValidators(self, url, responseHeaders):
+        etag = responseHeaders.get('ETag')
+        modified = responseHeaders.get('Last-Modified')
+        if etag or modified:
+            self._validators[url] = (etag, modified)
+        else:
+            self._validators.pop(url, None)
+
+    def _buildUrl(self, uri, **kwargs):
+        url = self.BaseUri + uri
+        firstarg = False
+        for kwarg in kwargs:
+            if not firstarg:
+                url += f'?{kwarg}={kwargs[kwarg]}'
+                firstarg = True
+            else:
+                url += f'&{kwarg}={kwargs[kwarg]}'
+        return url
+
+    def _authRequestData(self):
+        jData = {
+            "botName" : self.appName,
+            "botSecret" : self.appSecret
+        }
+        return json.dumps(jData)
+
+    def _logFailure(self, error):
+        if isinstance(error, RequestError):
+            self.Logger.info(f'Request Failed: {error.status}')
+        else:
+            self.Logger.critical('Request Failed!')
+            for line in ''.join(traceback.format_exception(type(error), error, error.__traceback__)).split("\n"):
+                self.Logger.critical(line)
+
+    def _authCallback(self, jData):
+        self.appToken = jData['access_token']
+
+    def _parse(self, cls, kind, jData):
+        """
+        :raises ValueError: if the json couldn't be read into a `cls`
+        """
+        with self.metrics.timer('construct', kind=kind):
+            obj = cls()
+            if not isinstance(jData, dict) or not obj.fromJson(jData):
+                raise ValueError(f'the response is not a valid {kind}')
+        return obj
+
+    def _parseStarMap(self, jData):
+        return self._parse(self.starMapCls, 'StarMap', jData)
+
+    def _parseSystemConstants(self, jData):
+        return self._parse(StarMapConstants, 'StarMapConstants', jData)
+
+    def _parseGlobalData(self, jData):
+        return self._parse(GlobalData, 'GlobalData', jData)
+
+    def _needsMapping(self, constants):
+        graph = constants.adjacencyGraph
+        return graph is None or graph.radius != self.supportRadius
+
+    def _mapAdjacents(self, constants):
+        stTime = time.perf_counter()
+        constants.mapAdjacents(self.supportRadius)
+        elapsed = time.perf_counter() - stTime
+        self.metrics.timing('adjacency', elapsed, radius=self.supportRadius)
+        self.Logger.info(f"Adjacency Mapping took: {elapsed:0.02f} seconds")
+
+    def _snapshotTag(self, etag):
+        # ties a snapshot to the server it came from and the version of the constants it holds
+        return f'{self.BaseUri}\n{etag}'
+
+    def _snapshotETag(self):
+        """
+        find the ETag of the constants in the snapshot file, when it was saved from this server, and make it the
+        validator of the next constants request so the server can confirm the snapshot is still current
+
+        :return: the ETag, None if there is no snapshot of this server's constants
+        :rtype: str
+        """
+        if self.snapshotPath is None:
+            return None
+        tag = readSnapshotTag(self.snapshotPath)
+        prefix = self._snapshotTag('')
+        if tag is None or not tag.startswith(prefix) or len(tag) == len(prefix):
+            return None
+        etag = tag[len(prefix):]
+        self._validators[self._buildUrl('getsystemstatic')] = (etag, None)
+        return etag
+
+    def _loadConstantsSnapshot(self, etag):
+        """
+        load the system constants from the snapshot file, once the server has confirmed they are current
+
+        :param etag: the ETag the server confirmed
+        :type etag: str
+        :return: the constants, None if the snapshot has changed since its ETag was read
+        :rtype: StarMapConstants
+        """
+        constants = StarMapConstants.fromSnapshot(self.snapshotPath, tag=self._snapshotTag(etag))
+        if constants is not None:
+            self.Logger.info(f'Loaded system constants from snapshot: {self.snapshotPath}')
+        else:
+            self._validators.pop(self._buildUrl('getsystemstatic'), None)
+        return constants
+
+    def _saveConstantsSnapshot(self, constants):
+        if self.snapshotPath is None:
+            return
+        # without an ETag the snapshot could never be revalidated, so it wouldn't be used
+        etag = self._validators.get(self._buildUrl('getsystemstatic'), (None, None))[0]
+        if not etag:
+            return
+        try:
+            constants.toSnapshot(self.snapshotPath, self._snapshotTag(etag))
+        except OSError:
+            self.Logger.warning(f'Failed to write the system constants snapshot: {self.snapshotPath}')
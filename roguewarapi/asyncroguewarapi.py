@@ -0,0 +1,442 @@
+import asyncio
+import traceback
+
+from .apibase import RogueWarApiBase, RequestError
+from .batch import fetchBatchAsync
+from .data import StarMap, StarSystem
+from .data.streamparse import aiterStarSystems
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is optional, only the async client needs it
+    aiohttp = None
+
+
+class AsyncRogueWarApi(RogueWarApiBase):
+    """
+    An asyncio interface for accessing the Roguewar API, offering the same calls as
+    :class:`RogueWarApi <roguewarapi.RogueWarApi>` as coroutines
+
+    Requires the optional ``aiohttp`` package. Create and use each instance from a single event loop, and close it with
+    :meth:`close` or ``async with`` when done
+    """
+
+    def __init__(self, appName, appSecret, url=None, loggerhandler=None, poolSize=10, timeout=30, keepAlive=True,
+                 starMapTtl=60, staleWhileRevalidate=False, starMapGrace=300, snapshotPath=None, metrics=None,
+                 starMapCls=StarMap, globalDataUri='getglobaldata'):
+        """
+        :param appName: the name of the client, use the name provided to you as part of your Name/Secret combo for authentication
+        :type appName: str
+        :param appSecret: the client secret you were given for API access
+        :type appSecret: str
+        :param url: optional, the url to the service, if not supplied a default is used
+        :type url: str
+        :param loggerhandler: optional, a standard python logging handler object
+        :type loggerhandler: logging.Handler
+        :param poolSize: optional, the maximum number of connections kept open to the service
+        :type poolSize: int
+        :param timeout: optional, the total timeout of each request in seconds, None to wait forever
+        :type timeout: float
+        :param keepAlive: optional, reuse connections between requests, when False every request opens a new connection
+        :type keepAlive: bool
+        :param starMapTtl: optional, the number of seconds a fetched starmap is considered fresh
+        :type starMapTtl: float
+        :param staleWhileRevalidate: optional, when True an expired starmap is returned straight away while a fresh one
+            is fetched in the background
+        :type staleWhileRevalidate: bool
+        :param starMapGrace: optional, how many seconds past expiry a starmap may still be returned while revalidating
+        :type starMapGrace: float
+        :param snapshotPath: optional, a file to keep a snapshot of the system constants in, so a new client can load
+            them, adjacency included, without downloading and mapping them once the server confirms they are current
+        :type snapshotPath: str
+        :param metrics: optional, receives the timings of each phase of a call, such as a
+            :class:`MetricsRecorder <roguewarapi.MetricsRecorder>`, nothing is timed when not supplied
+        :type metrics: roguewarapi.Metrics
+        :param starMapCls: optional, the starmap class to build, such as :class:`LazyStarMap <roguewarapi.data.LazyStarMap>`
+            to only decode the parts of the map that are read
+        :param globalDataUri: optional, the endpoint serving the server's :class:`GlobalData <roguewarapi.data.GlobalData>`,
+            relative to the api url
+        :type globalDataUri: str
+
+        """
+        if aiohttp is None:
+            raise ImportError('aiohttp is required for AsyncRogueWarApi')
+        super().__init__(appName, appSecret, url=url, loggerhandler=loggerhandler, starMapTtl=starMapTtl,
+                         staleWhileRevalidate=staleWhileRevalidate, starMapGrace=starMapGrace,
+                         snapshotPath=snapshotPath, metrics=metrics, starMapCls=starMapCls,
+                         globalDataUri=globalDataUri)
+        self.poolSize = poolSize
+        self.timeout = timeout
+        self.keepAlive = keepAlive
+        self._session = None  # type: aiohttp.ClientSession
+        self._authLock = None  # type: asyncio.Lock
+        self._authGeneration = 0
+        self._authResult = False
+        self._starMapTask = None  # type: asyncio.Task
+        self._constantsTask = None  # type: asyncio.Task
+        self._constantsForced = False  # whether the running constants update fetches them whether or not they're held
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """
+        close all pooled connections, the client may still be used afterwards but will have to reconnect
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _getSession(self):
+        # the session has to be created inside the running event loop, so it is created on first use
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.poolSize, ssl=False, force_close=not self.keepAlive)
+            traceConfigs = [self._traceConfig()] if self.metrics.enabled else None
+            self._session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout),
+                                                  trace_configs=traceConfigs)
+        return self._session
+
+    def _traceConfig(self):
+        """
+        :return: a trace config reporting the `dns` and `connect` phases of the session's requests
+        :rtype: aiohttp.TraceConfig
+        """
+        metrics = self.metrics
+
+        async def onStart(session, context, params):
+            context.started = asyncio.get_running_loop().time()
+
+        def onEnd(phase):
+            async def handler(session, context, params):
+                metrics.timing(phase, asyncio.get_running_loop().time() - context.started, host=getattr(params, 'host', None))
+            return handler
+
+        traceConfig = aiohttp.TraceConfig()
+        traceConfig.on_dns_resolvehost_start.append(onStart)
+        traceConfig.on_dns_resolvehost_end.append(onEnd('dns'))
+        traceConfig.on_connection_create_start.append(onStart)
+        traceConfig.on_connection_create_end.append(onEnd('connect'))
+        return traceConfig
+
+    async def _send(self, method, uri, jData=None, headers=None, reauth=True, conditional=False, timeout=None,
+                    parse=None, **kwargs):
+        """
+        send a request and decode its json response, a request rejected with 401 is sent again with a new token
+
+        :param conditional: optional, make the request conditional on the validators of the last response from the
+            same url
+        :type conditional: bool
+        :param timeout: optional, the total timeout of this request, by default the client's
+        :type timeout: float
+        :param parse: optional, builds the result from the decoded json. The validators of the response are only kept
+            once it has been decoded and parsed, so a later 304 never confirms a result that failed to be built
+        :return: the decoded json, or the parsed result, `NotModified` if a conditional request was answered with 304
+            Not Modified
+        :raises RequestError: if the service answers with an error status
+        :raises aiohttp.ClientError: if the request couldn't be made
+        :raises asyncio.TimeoutError: if the request timed out
+        """
+        url = self._buildUrl(uri, **kwargs)
+        self.Logger.info(f'Sending {method} request to: {url}')
+        generation = self._authGeneration
+        bData = jData.encode() if jData is not None else None
+        sendHeaders = self._conditionalHeaders(url, headers) if conditional else headers
+        options = {} if timeout is None else {'timeout': aiohttp.ClientTimeout(total=timeout)}
+        with self.metrics.timer('request', method=method, uri=uri):
+            async with self._getSession().request(method, url, headers=self._getHeaders(sendHeaders), data=bData,
+                                                  **options) as result:
+                status = result.status
+                notModified = status == 304 and conditional
+                if result.ok and not notModified:
+                    # the whole body is received here, so decoding it below is timed apart from the request
+                    await result.read()
+        if notModified:
+            self.Logger.info(f'Not modified: {url}')
+            self.metrics.count('notModified', uri=uri)
+            return self.NotModified
+        if not result.ok:
+            if status == 401 and reauth and await self._refreshAuthToken(generation):
+                return await self._send(method, uri, jData=jData, headers=headers, reauth=False,
+                                        conditional=conditional, timeout=timeout, parse=parse, **kwargs)
+            raise RequestError(status, url)
+        with self.metrics.timer('decode', uri=uri):
+            jResult = await result.json(content_type=None)
+        if parse is not None:
+            jResult = parse(jResult)
+        if method == 'GET':
+            self._storeValidators(url, result.headers)
+        return jResult
+
+    async def _sendRequest(self, method, uri, **kwargs):
+        """
+        send a request with :meth:`_send`, logging a failure rather than raising it
+
+        :return: as :meth:`_send`, None if the request failed
+        """
+        try:
+            return await self._send(method, uri, **kwargs)
+        except Exception as e:
+            self._logFailure(e)
+        return None
+
+    def _startTask(self, coroutine):
+        """
+        run a fetch shared by every caller as a task, its failure is logged once here whether or not anything awaits it
+
+        :rtype: asyncio.Task
+        """
+        task = asyncio.ensure_future(coroutine)
+        task.add_done_callback(self._logTaskFailure)
+        return task
+
+    def _logTaskFailure(self, task):
+        if not task.cancelled() and task.exception() is not None:
+            self._logFailure(task.exception())
+
+    async def _refreshAuthToken(self, generation):
+        """
+        fetch a new token on behalf of every request that was rejected with the token of `generation`, only the first
+        caller sends the request, the others wait for it and share its outcome
+
+        :param generation: the token generation the failed request was sent with
+        :type generation: int
+        :return: True if a valid token is now available
+        :rtype: bool
+        """
+        if self._authLock is None:
+            self._authLock = asyncio.Lock()
+        async with self._authLock:
+            if generation == self._authGeneration:
+                self._authResult = await self._getAuthToken()
+                self._authGeneration += 1
+            return self._authResult
+
+    async def _ensureAuthToken(self):
+        """
+        fetch a token if the client doesn't have one yet
+
+        :return: True if a token is available
+        :rtype: bool
+        """
+        if self.appToken:
+            return True
+        return await self._refreshAuthToken(self._authGeneration)
+
+    async def _getAuthToken(self):
+        jData = await self._sendRequest('POST', 'botauth', jData=self._authRequestData(), reauth=False)
+        if jData is None:
+            return False
+        self._authCallback(jData)
+        return True
+
+    async def getStarMap(self):
+        """
+        Get the current starmap
+
+        concurrent calls that miss the cache share a single request, with `staleWhileRevalidate` enabled an expired
+        map is returned immediately and refreshed in the background
+
+        :return: a starmap object
+        :rtype: StarMap
+        """
+
+        with self.metrics.timer('getStarMap'):
+            starmap, refresh = self._cachedStarMap()
+            if not refresh:
+                return starmap
+            task = self._starMapFetch()
+            if starmap is not None:
+                return starmap
+            try:
+                # shield the shared fetch so one cancelled caller doesn't cancel it for everyone else
+                return await asyncio.shield(task)
+            except Exception:
+                return None  # logged by the task
+
+    def _starMapFetch(self, timeout=None):
+        """
+        :return: the running starmap fetch, started if there isn't one
+        :rtype: asyncio.Task
+        """
+        if self._starMapTask is None or self._starMapTask.done():
+            self._starMapTask = self._startTask(self._fetchStarMap(timeout))
+        return self._starMapTask
+
+    async def _refreshStarMap(self, timeout=None):
+        # the batch request takes the map from the cache while it is fresh, the miss isn't counted as nothing else is
+        cached = self.cache.peekCacheItem(self._kStarMapCacheKey)
+        if cached is not None:
+            return cached
+        return await asyncio.shield(self._starMapFetch(timeout))
+
+    async def _fetchStarMap(self, timeout=None):
+        # a 304 means the last map fetched is still current, so it is reused rather than downloaded and parsed again
+        starmap = await self._send('GET', 'getmap', conditional=self._lastStarMap is not None, timeout=timeout,
+                                   parse=self._parseStarMap)
+        if starmap is self.NotModified:
+            starmap = self._lastStarMap
+        self._lastStarMap = starmap
+        self._cacheStarMap(starmap)
+        return starmap
+
+    async def getSystemConstants(self, bForce=False):
+        """
+        retrieve constants about the starmap, this includes data like system positions, and original owner
+
+        adjacency is mapped at :attr:`supportRadius`, and remapped if that has changed since. The mapping runs in the
+        default executor so it doesn't block the event loop
+
+        :param bForce: force the data to be refreshed from the server, this generally shouldnt be needed, if the
+            server reports the constants haven't changed the current object is kept
+        :type bForce: bool
+        :return: a `StarMapConstants` object
+        :rtype: StarMapConstants
+        """
+        with self.metrics.timer('getSystemConstants'):
+            try:
+                await self._shareConstantsUpdate(bForce)
+            except Exception:
+                pass  # logged by the task
+        return self.starMapConstants
+
+    async def _refreshSystemConstants(self, timeout=None):
+        return await self._shareConstantsUpdate(True, timeout)
+
+    async def _shareConstantsUpdate(self, bForce, timeout=None):
+        """
+        update the constants if they are needed, concurrent calls share the running update
+
+        :raises Exception: whatever stopped the update
+        """
+        if self._constantsTask is not None and not self._constantsTask.done():
+            # a forced call only needs another update if the running one wasn't forced, or failed
+            forced = self._constantsForced
+            try:
+                await asyncio.shield(self._constantsTask)
+            except Exception:
+                forced = False
+            bForce = bForce and not forced
+        constants = self.starMapConstants
+        if bForce or constants is None or self._needsMapping(constants):
+            if self._constantsTask is None or self._constantsTask.done():
+                self._constantsForced = bForce
+                self._constantsTask = self._startTask(self._updateSystemConstants(bForce, timeout))
+            # shield the shared update so one cancelled caller doesn't cancel it for everyone else
+            await asyncio.shield(self._constantsTask)
+        return self.starMapConstants
+
+    async def _updateSystemConstants(self, bForce, timeout=None):
+        if bForce or self.starMapConstants is None:
+            # a 304 means the current constants, or those in the snapshot, are still valid
+            etag = self._snapshotETag() if self.starMapConstants is None else None
+            constants = await self._send('GET', 'getsystemstatic', timeout=timeout, parse=self._parseSystemConstants,
+                                         conditional=self.starMapConstants is not None or etag is not None)
+            if constants is self.NotModified and self.starMapConstants is None:
+                self.starMapConstants = self._loadConstantsSnapshot(etag)
+                if self.starMapConstants is None:
+                    constants = await self._send('GET', 'getsystemstatic', timeout=timeout,
+                                                 parse=self._parseSystemConstants)
+            if constants is not self.NotModified:
+                await asyncio.get_running_loop().run_in_executor(None, self._mapAdjacents, constants)
+                self.starMapConstants = constants
+                self._saveConstantsSnapshot(constants)
+        if self.starMapConstants is not None and self._needsMapping(self.starMapConstants):
+            # the constants may be read while they are mapped, so a remapped copy replaces them
+            constants = self.starMapConstants.copy()
+            await asyncio.get_running_loop().run_in_executor(None, self._mapAdjacents, constants)
+            self.starMapConstants = constants
+            self._saveConstantsSnapshot(constants)
+        return self.starMapConstants
+
+    async def getGlobalData(self, bForce=False):
+        """
+        retrieve the server's global constants, once fetched adjacency is mapped with their `SupportRadius`
+
+        :param bForce: force the data to be refreshed from the server
+        :type bForce: bool
+        :return: a `GlobalData` object, None if it has never been fetched successfully
+        :rtype: GlobalData
+        """
+        if bForce or self.globalData is None:
+            try:
+                await self._refreshGlobalData()
+            except Exception as e:
+                self._logFailure(e)
+        return self.globalData
+
+    async def _refreshGlobalData(self, timeout=None):
+        self.globalData = await self._send('GET', self.globalDataUri, timeout=timeout, parse=self._parseGlobalData)
+        return self.globalData
+
+    async def fetchBatch(self, names=RogueWarApiBase.DefaultBatch, maxWorkers=4, timeout=None, retries=2, backoff=0.5):
+        """
+        fetch several things at once, such as everything a new worker needs, rather than one request after another.
+        To fetch for several clients at once use :func:`fetchBatchAsync <roguewarapi.fetchBatchAsync>`
+
+        Each result is kept by the client as if it had been fetched with the matching ``get`` call, the starmap is
+        taken from the cache while it is fresh. Requests that fail to connect, time out or are answered with a 5xx or
+        429 status are retried
+
+        :param names: optional, the requests to make, from :attr:`BatchRequests`, by default :attr:`DefaultBatch`
+        :type names: list[str]
+        :param maxWorkers: the most requests in flight at once
+        :type maxWorkers: int
+        :param timeout: optional, the total timeout of each request in seconds, by default the client's own timeout
+        :type timeout: float
+        :param retries: how many more times a failed request is tried
+        :type retries: int
+        :param backoff: the wait before the first retry in seconds, doubling for each retry after it
+        :type backoff: float
+        :return: the result of each request, by name, holding either the fetched object or the error that stopped it
+        :rtype: dict[str, roguewarapi.BatchResult]
+        :raises ValueError: if a name isn't in :attr:`BatchRequests`
+        """
+        results = await fetchBatchAsync([(self, name) for name in names], maxWorkers=maxWorkers, timeout=timeout,
+                                        retries=retries, backoff=backoff)
+        return {result.name: result for result in results}
+
+    async def streamStarMap(self, cls=StarSystem, chunkSize=65536):
+        """
+        Stream the current starmap, parsing star systems as the response is received and yielding them one at a time
+        with ``async for``, only the system being parsed is held in memory. Streamed maps are not cached
+
+        If the request fails the failure is logged and nothing is yielded
+
+        :param cls: optional, the star system class to build, such as :class:`SlottedStarSystem <roguewarapi.data.SlottedStarSystem>`
+        :param chunkSize: the number of bytes to read from the response at a time
+        :type chunkSize: int
+        :return: an async generator of star system objects
+        :rtype: collections.abc.AsyncIterator[StarSystem]
+        """
+        result = await self._openStream('getmap')
+        if result is None:
+            return
+        try:
+            async for system in aiterStarSystems(result.content.iter_chunked(chunkSize), cls):
+                yield system
+        except (ValueError, aiohttp.ClientError, asyncio.TimeoutError):
+            self.Logger.critical('Failed to read the streamed starmap!')
+            for line in traceback.format_exc().split("\n"):
+                self.Logger.critical(line)
+        finally:
+            result.release()
+
+    async def _openStream(self, uri, headers=None, reauth=True, **kwargs):
+        try:
+            url = self._buildUrl(uri, **kwargs)
+            self.Logger.info(f'Sending streamed Get request to: {url}')
+            generation = self._authGeneration
+            result = await self._getSession().get(url, headers=self._getHeaders(headers))
+            if result.ok:
+                return result
+            result.release()
+            if result.status == 401 and reauth:
+                if await self._refreshAuthToken(generation):
+                    return await self._openStream(uri, headers=headers, reauth=False, **kwargs)
+            self.Logger.info(f'Request Failed: {result.status}')
+        except Exception as e:
+            self._logFailure(e)
+        return None
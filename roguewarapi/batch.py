@@ -0,0 +1,182 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from .apibase import RequestError
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is optional, only the async client needs it
+    aiohttp = None
+
+_RetryableErrors = (requests.ConnectionError, requests.Timeout, asyncio.TimeoutError)
+if aiohttp is not None:
+    _RetryableErrors += (aiohttp.ClientConnectionError,)
+
+
+class BatchResult(object):
+    """
+    The outcome of a single request made by :func:`fetchBatch`
+    """
+
+    def __init__(self, client, name):
+        self.client = client  #: the client the request was made with
+        self.name = name  #: the name of the request, one of :attr:`RogueWarApi.BatchRequests <roguewarapi.RogueWarApi.BatchRequests>`
+        self.value = None  #: the fetched object, such as a :class:`StarMap <roguewarapi.data.StarMap>`, None if the request failed
+        self.error = None  #: the exception raised by the last attempt, None if the request succeeded
+        self.attempts = 0  #: the number of times the request was tried
+        self.elapsed = 0.0  #: the time taken by every attempt and the waits between them, in seconds
+
+    @property
+    def ok(self):
+        """
+        :rtype: bool
+        """
+        return self.error is None
+
+    def __repr__(self):
+        outcome = type(self.value).__name__ if self.ok else repr(self.error)
+        return f'BatchResult({self.name!r}, {outcome}, attempts={self.attempts})'
+
+
+def isRetryable(error):
+    """
+    :param error: an error raised by a request
+    :type error: Exception
+    :return: True if the request may succeed if tried again: it couldn't connect, timed out, or the service was
+        unavailable or rate limited it
+    :rtype: bool
+    """
+    if isinstance(error, RequestError):
+        return error.status >= 500 or error.status == 429
+    return isinstance(error, _RetryableErrors)
+
+
+def _attempt(result, func, timeout, retries, backoff):
+    stTime = time.perf_counter()
+    for attempt in range(retries + 1):
+        result.attempts = attempt + 1
+        try:
+            result.value = func(timeout)
+            result.error = None
+            break
+        except Exception as e:
+            result.error = e
+            if attempt == retries or not isRetryable(e):
+                break
+            time.sleep(backoff * 2 ** attempt)
+    result.elapsed = time.perf_counter() - stTime
+    return result
+
+
+async def _attemptAsync(result, func, timeout, retries, backoff):
+    stTime = time.perf_counter()
+    for attempt in range(retries + 1):
+        result.attempts = attempt + 1
+        try:
+            result.value = await func(timeout)
+            result.error = None
+            break
+        except Exception as e:
+            result.error = e
+            if attempt == retries or not isRetryable(e):
+                break
+            await asyncio.sleep(backoff * 2 ** attempt)
+    result.elapsed = time.perf_counter() - stTime
+    return result
+
+
+def _batchCalls(jobs):
+    """
+    :return: a result and the method to call for each job, and every client in the jobs
+    :rtype: tuple[list[tuple[BatchResult, collections.abc.Callable]], list]
+    :raises ValueError: if a name isn't a batch request of its client
+    """
+    calls = []
+    for client, name in jobs:
+        method = client._BatchRequests.get(name)
+        if method is None:
+            raise ValueError(f'{name} is not a batch request, use one of {", ".join(client.BatchRequests)}')
+        calls.append((BatchResult(client, name), getattr(client, method)))
+
+    clients = []
+    for client, name in jobs:
+        if client not in clients:
+            clients.append(client)
+    return calls, clients
+
+
+def fetchBatch(jobs, maxWorkers=4, timeout=None, retries=2, backoff=0.5):
+    """
+    make independent requests at the same time on a bounded pool of threads, for instance to bootstrap a client, or to
+    refresh several clients for different accounts or servers at once
+
+    Clients that have no token are authenticated first, also in parallel, so their requests don't each have to be
+    rejected before retrying with one. Every fetched object is kept by its client just as if it had been fetched with
+    the matching ``get`` call, and once all requests are done system constants are remapped for any client whose
+    global data arrived after its constants were mapped
+
+    :param jobs: (client, name) pairs, the names are from :attr:`RogueWarApi.BatchRequests <roguewarapi.RogueWarApi.BatchRequests>`
+    :type jobs: list[tuple[roguewarapi.RogueWarApi, str]]
+    :param maxWorkers: the most requests in flight at once
+    :type maxWorkers: int
+    :param timeout: optional, the connect and read timeout of each request in seconds, or a (connect, read) tuple, by
+        default the client's own timeout
+    :type timeout: float
+    :param retries: how many more times a request is tried if it fails with an error that :func:`isRetryable`
+    :type retries: int
+    :param backoff: the wait before the first retry in seconds, doubling for each retry after it
+    :type backoff: float
+    :return: the result of every job, in the order given
+    :rtype: list[BatchResult]
+    :raises ValueError: if a name isn't a batch request of its client
+    """
+    calls, clients = _batchCalls(jobs)
+
+    with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+        list(executor.map(lambda client: client._ensureAuthToken(), clients))
+        futures = [executor.submit(_attempt, result, func, timeout, retries, backoff) for result, func in calls]
+        results = [future.result() for future in futures]
+
+    for client in clients:
+        if client.starMapConstants is not None:
+            client.getSystemConstants()
+    return results
+
+
+async def fetchBatchAsync(jobs, maxWorkers=4, timeout=None, retries=2, backoff=0.5):
+    """
+    the asyncio counterpart of :func:`fetchBatch` for :class:`AsyncRogueWarApi <roguewarapi.AsyncRogueWarApi>`
+    clients, the requests run concurrently on the running event loop
+
+    :param jobs: (client, name) pairs, the names are from :attr:`AsyncRogueWarApi.BatchRequests <roguewarapi.AsyncRogueWarApi.BatchRequests>`
+    :type jobs: list[tuple[roguewarapi.AsyncRogueWarApi, str]]
+    :param maxWorkers: the most requests in flight at once
+    :type maxWorkers: int
+    :param timeout: optional, the total timeout of each request in seconds, by default the client's own timeout
+    :type timeout: float
+    :param retries: how many more times a request is tried if it fails with an error that :func:`isRetryable`
+    :type retries: int
+    :param backoff: the wait before the first retry in seconds, doubling for each retry after it
+    :type backoff: float
+    :return: the result of every job, in the order given
+    :rtype: list[BatchResult]
+    :raises ValueError: if a name isn't a batch request of its client
+    """
+    calls, clients = _batchCalls(jobs)
+    slots = asyncio.Semaphore(maxWorkers)
+
+    async def limited(coroutine):
+        async with slots:
+            return await coroutine
+
+    await asyncio.gather(*(limited(client._ensureAuthToken()) for client in clients))
+    results = await asyncio.gather(*(limited(_attemptAsync(result, func, timeout, retries, backoff))
+                                     for result, func in calls))
+
+    for client in clients:
+        if client.starMapConstants is not None:
+            await client.getSystemConstants()
+    return list(results)
@@ -1,9 +1,18 @@
 from .basejsonobject import BaseDataObject, SubObjectMap
 from .kfactions import kFactions
 from .baseenum import BaseEnum
-from .factioncontrol import FactionControl
-from .starsystem import StarSystem
-from .starmap import StarMap
-from .objectcache import CacheManager
-from .starsystemconst import StarSystemConst, StarMapConstants
+from .factioncontrol import FactionControlBase, FactionControl, SlottedFactionControl
+from .starsystem import StarSystemBase, StarSystem, SlottedStarSystem, LazyStarSystem
+from .factionstats import FactionStats
+from .starmap import StarMap, SlottedStarMap, LazyStarMap
+from .starmapdelta import StarMapDelta, SystemDelta, ControlDelta
+from .factioncodes import FactionCodes
+from .columnarmap import ColumnarStarMap
+from .objectcache import CacheManager, CacheStats, SingleFlight
+from .archive import StarMapArchive
+from .spatialindex import SpatialGrid
+from .neighborgraph import NeighborGraph
+from .territory import TerritoryGraph
+from .starsystemconst import StarSystemConstBase, StarSystemConst, StarMapConstants, SlottedStarSystemConst, \
+    SlottedStarMapConstants
 from .globaldata import GlobalData
\ No newline at end of file
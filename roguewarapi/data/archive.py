@@ -0,0 +1,354 @@
+"""
+An append-only, memory mapped archive of :class:`StarMap <roguewarapi.data.StarMap>` snapshots
+
+An archive is a directory of three files:
+
+* ``strings.dat``, every system and faction name and the json text of every other value, each written once and
+  numbered in the order it was first seen
+* ``index.dat``, a fixed size entry per snapshot: its timestamp, the offset of its block in ``data.dat``, and its
+  system and faction control counts
+* ``data.dat``, a block per snapshot holding the columns of a :class:`ColumnarStarMap <roguewarapi.data.ColumnarStarMap>`
+  as fixed width little endian arrays, names stored as string numbers. Each column starts on an 8 byte boundary so a
+  single value can be read straight from its offset
+
+Every other value, such as a system's `Players` or a faction's `control`, is stored as the string number of its json
+text, so it is read back exactly as it was written, whether an integer, a float, a string such as ``'0.50'`` or None.
+As the values repeat from system to system and snapshot to snapshot, the strings file stays small
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from .columnarmap import ColumnarStarMap
+from .snapshot import _aligned, _littleEndian
+from .starmap import StarMap
+
+_Index = struct.Struct('<dQII')
+_Length = struct.Struct('<I')
+
+# (column, array typecode, length), the length is the system count, one more than it, or the control count
+_Columns = (
+    ('names', 'I', 'n'),
+    ('owners', 'I', 'n'),
+    ('players', 'I', 'n'),
+    ('markerType', 'I', 'n'),
+    ('immuneFromWar', 'I', 'n'),
+    ('ctlOffsets', 'I', 'n+1'),
+    ('ctlFaction', 'I', 'm'),
+    ('ctlControl', 'I', 'm'),
+    ('ctlActivePlayers', 'I', 'm'),
+)
+
+
+def _layout(int_systems, int_controls):
+    """
+    :return: the offset, typecode and length of each column within a snapshot block, and the size of the block
+    :rtype: tuple[dict[str, tuple[int, str, int]], int]
+    """
+    lengths = {'n': int_systems, 'n+1': int_systems + 1, 'm': int_controls}
+    columns = {}
+    offset = 0
+    for column, typecode, length in _Columns:
+        offset = _aligned(offset)
+        count = lengths[length]
+        columns[column] = (offset, typecode, count)
+        offset += count * array(typecode).itemsize
+    return columns, _aligned(offset)
+
+
+# the columns holding the string numbers of json text
+_JsonColumns = ('players', 'markerType', 'immuneFromWar', 'ctlControl', 'ctlActivePlayers')
+
+
+class StarMapArchive(object):
+    """
+    An append-only history of starmaps that can answer questions about a system across many snapshots without
+    loading the snapshots themselves
+
+    Open an archive with a directory, it is created if it doesn't exist. Only one process should append to an archive
+    at a time, but any number may read it by opening it read only, which never changes its files. A reader sees the
+    snapshots that were complete when it was opened, and those appended since each time it calls :meth:`refresh`
+    """
+
+    def __init__(self, str_path, readOnly=False):
+        """
+        :param str_path: the directory holding the archive
+        :type str_path: str
+        :param readOnly: optional, open an existing archive for reading only, as any process other than the one
+            appending to it must
+        :type readOnly: bool
+        """
+        if not readOnly:
+            os.makedirs(str_path, exist_ok=True)
+        self.path = str_path
+        self.readOnly = readOnly
+        self._strings = []  # type: list[str]
+        self._stringIds = {}  # type: dict[str, int]
+        self._entries = []  # type: list[tuple[float, int, int, int]]
+        self._rowGuess = {}  # type: dict[int, int]
+        self._map = None  # type: mmap.mmap
+        self._stringsSize = 0  # the bytes of strings.dat read so far
+        mode = 'rb' if readOnly else 'a+b'
+        self._stringsFile = open(os.path.join(str_path, 'strings.dat'), mode)
+        self._indexFile = open(os.path.join(str_path, 'index.dat'), mode)
+        self._dataFile = open(os.path.join(str_path, 'data.dat'), mode)
+        self._load()
+
+    def _load(self):
+        # the index is read before the strings, an append writes its strings before its index entry, so the strings
+        # of every entry read are already on disk
+        self._indexFile.seek(len(self._entries) * _Index.size)
+        data = self._indexFile.read()
+        complete = len(data) - len(data) % _Index.size
+        self._entries.extend(_Index.unpack_from(data, offset) for offset in range(0, complete, _Index.size))
+        partialIndex = complete != len(data)
+        self._stringsFile.seek(self._stringsSize)
+        data = self._stringsFile.read()
+        offset = 0
+        while offset + _Length.size <= len(data):
+            length, = _Length.unpack_from(data, offset)
+            if offset + _Length.size + length > len(data):
+                break
+            self._addString(data[offset + _Length.size:offset + _Length.size + length].decode('utf-8'))
+            offset += _Length.size + length
+        partialStrings = offset != len(data)
+        self._stringsSize += offset
+        # a partly written entry at the end of a file is either an append still in progress, which a reader must leave
+        # alone, or was left by an interrupted append, which the appender cuts off so its next append starts at an
+        # entry boundary
+        if not self.readOnly:
+            if partialStrings:
+                self._stringsFile.truncate(self._stringsSize)
+            if partialIndex:
+                self._indexFile.truncate(len(self._entries) * _Index.size)
+
+    def refresh(self):
+        """
+        pick up the snapshots appended by another process since the archive was opened or last refreshed
+
+        :return: the number of snapshots in the archive
+        :rtype: int
+        """
+        self._load()
+        return len(self._entries)
+
+    def _addString(self, string):
+        self._stringIds[string] = len(self._strings)
+        self._strings.append(string)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        close the archive's files
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        for m_file in (self._stringsFile, self._indexFile, self._dataFile):
+            m_file.close()
+
+    def _stringId(self, string, lst_new):
+        stringId = self._stringIds.get(string)
+        if stringId is None:
+            stringId = len(self._strings)
+            self._addString(string)
+            lst_new.append(string)
+        return stringId
+
+    def append(self, starmap, timestamp=None):
+        """
+        add a snapshot to the end of the archive
+
+        :param starmap: the map to record
+        :type starmap: StarMap | ColumnarStarMap
+        :param timestamp: optional, when the map was taken, defaults to now
+        :type timestamp: float
+        :return: the number of the new snapshot
+        :rtype: int
+        :raises ValueError: if the archive was opened read only
+        """
+        if self.readOnly:
+            raise ValueError('the archive was opened read only')
+        if not isinstance(starmap, ColumnarStarMap):
+            starmap = ColumnarStarMap.fromStarMap(starmap)
+        if timestamp is None:
+            timestamp = time.time()
+        newStrings = []
+        factionIds = [self._stringId(name, newStrings) for name in starmap.factions.names]
+        values = {
+            'names': array('I', (self._stringId(name, newStrings) for name in starmap.names)),
+            'owners': array('I', (factionIds[code] for code in starmap.owners)),
+            'ctlOffsets': array('I', starmap.ctlOffsets),
+            'ctlFaction': array('I', (factionIds[code] for code in starmap.ctlFaction)),
+        }
+        for column in _JsonColumns:
+            columnValues = getattr(starmap, column)
+            if column == 'immuneFromWar' and isinstance(columnValues, array):
+                # a packed column holds its booleans as numbers
+                columnValues = (bool(value) for value in columnValues)
+            values[column] = array('I', (self._stringId(json.dumps(value), newStrings) for value in columnValues))
+        systemCount = len(starmap.names)
+        controlCount = len(values['ctlFaction'])
+        columns, size = _layout(systemCount, controlCount)
+        block = bytearray(size)
+        for column, (offset, typecode, count) in columns.items():
+            data = _littleEndian(values[column])
+            block[offset:offset + len(data)] = data
+
+        # strings first and the index entry last, so an interrupted append never leaves an entry pointing at nothing
+        if newStrings:
+            written = b''.join(_Length.pack(len(data)) + data for data in (string.encode('utf-8') for string in newStrings))
+            self._stringsFile.write(written)
+            self._stringsFile.flush()
+            self._stringsSize += len(written)
+        self._dataFile.seek(0, os.SEEK_END)
+        offset = self._dataFile.tell()
+        self._dataFile.write(block)
+        self._dataFile.flush()
+        entry = (timestamp, offset, systemCount, controlCount)
+        self._indexFile.write(_Index.pack(*entry))
+        self._indexFile.flush()
+        self._entries.append(entry)
+        return len(self._entries) - 1
+
+    def _buffer(self, int_end):
+        # the mapping is only grown when a read goes past its end
+        if self._map is None or len(self._map) < int_end:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._dataFile.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _entry(self, snapshot):
+        timestamp, offset, systemCount, controlCount = self._entries[snapshot]
+        columns, size = _layout(systemCount, controlCount)
+        return offset, columns, self._buffer(offset + size)
+
+    def _readColumn(self, snapshot, column):
+        offset, columns, buf = self._entry(snapshot)
+        start, typecode, count = columns[column]
+        arr = array(typecode)
+        arr.frombytes(buf[offset + start:offset + start + count * arr.itemsize])
+        if sys.byteorder == 'big':
+            arr.byteswap()
+        return arr
+
+    def _readValue(self, snapshot, column, row):
+        offset, columns, buf = self._entry(snapshot)
+        start, typecode, count = columns[column]
+        return struct.unpack_from('<' + typecode, buf, offset + start + row * array(typecode).itemsize)[0]
+
+    def timestamp(self, snapshot):
+        """
+        :param snapshot: the number of a snapshot, negative numbers count back from the latest
+        :type snapshot: int
+        :return: when the snapshot was taken
+        :rtype: float
+        """
+        return self._entries[snapshot][0]
+
+    def rowOf(self, snapshot, name):
+        """
+        :param snapshot: the number of a snapshot
+        :type snapshot: int
+        :param name: a star system name
+        :type name: str
+        :return: the row of the system in the snapshot, -1 if it isn't in it
+        :rtype: int
+        """
+        nameId = self._stringIds.get(name)
+        if nameId is None:
+            return -1
+        systemCount = self._entries[snapshot][2]
+        # systems rarely move between snapshots, so the row a system was last found at is checked before searching
+        row = self._rowGuess.get(nameId)
+        if row is not None and row < systemCount and self._readValue(snapshot, 'names', row) == nameId:
+            return row
+        try:
+            row = self._readColumn(snapshot, 'names').index(nameId)
+        except ValueError:
+            return -1
+        self._rowGuess[nameId] = row
+        return row
+
+    def owner(self, snapshot, name):
+        """
+        :param snapshot: the number of a snapshot
+        :type snapshot: int
+        :param name: a star system name
+        :type name: str
+        :return: the owner of the system in the snapshot, None if the system isn't in it
+        :rtype: str
+        """
+        row = self.rowOf(snapshot, name)
+        if row < 0:
+            return None
+        return self._strings[self._readValue(snapshot, 'owners', row)]
+
+    def ownerHistory(self, name, last=None):
+        """
+        get the owner of a system across the archive, only the bytes holding the owners are read
+
+        :param name: a star system name
+        :type name: str
+        :param last: optional, only look at this many of the latest snapshots
+        :type last: int
+        :return: (timestamp, owner) for each snapshot holding the system, oldest first
+        :rtype: list[tuple[float, str]]
+        """
+        first = 0 if last is None else max(0, len(self._entries) - last)
+        history = []
+        for snapshot in range(first, len(self._entries)):
+            owner = self.owner(snapshot, name)
+            if owner is not None:
+                history.append((self._entries[snapshot][0], owner))
+        return history
+
+    def columns(self, snapshot, factionCodes=None):
+        """
+        :param snapshot: the number of a snapshot
+        :type snapshot: int
+        :param factionCodes: optional, the faction codes of the columns
+        :type factionCodes: FactionCodes
+        :return: the snapshot as columns
+        :rtype: ColumnarStarMap
+        """
+        strings = self._strings
+        read = {column: self._readColumn(snapshot, column) for column, typecode, length in _Columns}
+        offsets = read['ctlOffsets']
+        # each value is decoded once per distinct string, json.loads returns a new object for each call
+        decoded = {}
+        for column in _JsonColumns:
+            for stringId in set(read[column]).difference(decoded):
+                decoded[stringId] = json.loads(strings[stringId])
+            read[column] = [decoded[stringId] for stringId in read[column]]
+        controls = [(strings[faction], control, active)
+                    for faction, control, active in zip(read['ctlFaction'], read['ctlControl'], read['ctlActivePlayers'])]
+        return ColumnarStarMap._fromRows(((strings[name], strings[owner], players, marker, immune,
+                                           controls[offsets[row]:offsets[row + 1]])
+                                          for row, (name, owner, players, marker, immune)
+                                          in enumerate(zip(read['names'], read['owners'], read['players'],
+                                                           read['markerType'], read['immuneFromWar']))),
+                                         factionCodes)
+
+    def snapshot(self, snapshot, cls=StarMap):
+        """
+        :param snapshot: the number of a snapshot
+        :type snapshot: int
+        :param cls: optional, the starmap class to build, such as :class:`SlottedStarMap <roguewarapi.data.SlottedStarMap>`
+        :return: the snapshot as a starmap
+        :rtype: StarMap
+        """
+        return self.columns(snapshot).toStarMap(cls)
@@ -2,9 +2,35 @@ import inspect
 
 
 class BaseEnum(object):
+    """
+    A class whose public, non-callable class attributes are the items of an enum
+
+    The items of each subclass are collected once, when the class is created, into lookup tables, so every lookup is a
+    single dictionary access. :meth:`canonical` maps an equal string, such as one read from json, to the enum's own
+    value. Items added to the class after it is created are not picked up
+    """
+
+    _members = ()  # type: tuple[tuple[str, object], ...]
+    _byName = {}  # type: dict[str, object]
+    _byValue = {}  # type: dict[object, str]
+    _unhashable = ()  # type: tuple[tuple[str, object], ...]
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        lst_members = cls._findMembers()
+        cls._members = tuple(lst_members)
+        cls._byName = dict(lst_members)
+        cls._byValue = {}
+        lst_unhashable = []
+        for member in lst_members:
+            try:
+                cls._byValue.setdefault(member[1], member[0])  # the first of several items with the same value wins
+            except TypeError:  # unhashable values are searched for instead
+                lst_unhashable.append(member)
+        cls._unhashable = tuple(lst_unhashable)
 
     @classmethod
-    def _getMembers(cls):
+    def _findMembers(cls):
         lst_members = inspect.getmembers(cls)
         lst_filtered_members = []
         for member in lst_members:
@@ -19,6 +45,10 @@ class BaseEnum(object):
                 lst_filtered_members.append(member)
         return lst_filtered_members
 
+    @classmethod
+    def _getMembers(cls):
+        return list(cls._members)
+
     @classmethod
     def findByName(cls, item):
         """
@@ -29,11 +59,7 @@ class BaseEnum(object):
         :return: an integer, the member item number, if no matching item is found -1 will be returned
         :rtype: int
         """
-        lst_members = cls._getMembers()
-        for member in lst_members:
-            if member[0] == item:
-                return member[1]
-        return -1
+        return cls._byName.get(item, -1)
 
     @classmethod
     def isAnItem(cls, item):
@@ -45,11 +71,10 @@ class BaseEnum(object):
         :return: True if the item exists, False otherwise
         :rtype: bool
         """
-        lst_members = cls._getMembers()
-        for member in lst_members:
-            if member[1] == item:
-                return True
-        return False
+        try:
+            return item in cls._byValue
+        except TypeError:
+            return any(member[1] == item for member in cls._unhashable)
 
     @classmethod
     def getItemName(cls, item):
@@ -61,11 +86,30 @@ class BaseEnum(object):
         :return: the item name as a string if it exists,  otherwise
         :rtype: str
         """
-        lst_members = cls._getMembers()
-        for member in lst_members:
-            if member[1] == item:
-                return str(member[0])
-        return ''
+        try:
+            return cls._byValue.get(item, '')
+        except TypeError:
+            for member in cls._unhashable:
+                if member[1] == item:
+                    return member[0]
+            return ''
+
+    @classmethod
+    def canonical(cls, item):
+        """
+        get the enum's own value equal to `item`, storing it in place of an equal copy, such as a faction name decoded
+        from json, shares a single string between every system that uses it
+
+        :param item: the item
+        :return: the enum's value if `item` is an item, otherwise `item` itself
+        """
+        try:
+            name = cls._byValue.get(item)
+        except TypeError:
+            return item
+        if name is None:
+            return item
+        return cls._byName[name]
 
     @classmethod
     def listItemNames(cls):
@@ -75,29 +119,14 @@ class BaseEnum(object):
         :return: a list of all members of the enum as a list of strings
         :rtype: list[str]
         """
-        lst_to_return = []
-        lst_members = cls._getMembers()
-        for member in lst_members:
-            lst_to_return.append(str(member[0]))
-        return lst_to_return
-
-        ## <summary> get all non-private member attributes </summary>
+        return [str(member[0]) for member in cls._members]
 
     @classmethod
     def _getMembersSorted(cls):
-        lst_members = inspect.getmembers(cls)
-        lst_filtered_members = []
-        for member in lst_members:
-            if member[0].startswith(
-                    '__'):  # remove all members that use the standard double underscore, this removes most of the default python object members
-                pass
-            elif member[0].startswith('_'):  # remove private members that we declare
-                pass
-            elif callable(getattr(cls, member[0])):  # remove any member that is callable, we only want attributes
-                pass
-            else:
-                lst_filtered_members.append(member)
-        return sorted(lst_filtered_members, key=cls._sort_key)
+        """
+        get all non-private member attributes sorted by value
+        """
+        return sorted(cls._members, key=cls._sortKey)
 
     @classmethod
     def _sortKey(cls, lst_member):
@@ -105,4 +134,4 @@ class BaseEnum(object):
 
     @staticmethod
     def _docMember(lst_member):
-        return [lst_member[0], str(lst_member[1])]
\ No newline at end of file
+        return [lst_member[0], str(lst_member[1])]
@@ -1,4 +1,5 @@
 import inspect
+import types
 import base64
 import io
 import os.path
@@ -7,6 +8,7 @@ import codecs
 import traceback
 from collections import OrderedDict
 
+from .codegen import buildFromJson, buildToJson
 
 
 class SubObjectMap(object):
@@ -31,6 +33,26 @@ class SubObjectMap(object):
         self.isList = bol_list
 
 
+class MemberSchema(object):
+    """
+    The auto-generated members of a :class:`BaseDataObject` subclass, worked out once per class and reused by every
+    instance of it
+    """
+
+    def __init__(self, lst_fields, lst_members, lst_b64):
+        """
+        :param lst_fields: the names of the serializable members, in sorted order
+        :type lst_fields: list[str]
+        :param lst_members: the names of the serializable members and properties, in sorted order
+        :type lst_members: list[str]
+        :param lst_b64: the names of members that are base64 encoded for serialization
+        :type lst_b64: list[str]
+        """
+        self.Fields = tuple(lst_fields)
+        self.Members = tuple(lst_members)
+        self.B64Fields = frozenset(lst_b64)
+
+
 class BaseDataObject(object):
     """
      A basic data class that can auto-generate itself into forms useful for printing or writing to file
@@ -40,12 +62,71 @@ class BaseDataObject(object):
         be sub-classed into objects for specific data types and provide those auto-generating capabilities to them
 
     """
+    __slots__ = ()
+
     JSON_Type = 'BaseDataObject'
     _ExcludeFromMemebers = []  #: a list of members to exclude from auto-generate functions
     _StrShowProps = False       #: Force a string representation to show its properties when true
     _SubObjectMapping = []
     _B64Memebers = []  #: Memebers that need to be base64 encoded for serialization as they may hold invalid json data
+    _CanonicalMemebers = {}  #: Memebers whose decoded value is passed through a function, such as :meth:`BaseEnum.canonical <roguewarapi.data.baseenum.BaseEnum.canonical>`, to share one copy of each value
     _useStdDict = True
+    _useGeneratedCode = True  #: (de)serialize through functions generated for each class rather than the generic code
+    _generatedFromJson = None
+    _generatedToJson = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # each subclass gets its own generated functions, they are built from the class's member schema the first time
+        # the class is (de)serialized
+        cls._generatedFromJson = None
+        cls._generatedToJson = None
+
+    @classmethod
+    def _generatedFunction(cls, str_kind, obj_instance=None):
+        """
+        get the generated ``_fromJson`` or ``_toJson`` function of this class, generating it on first use
+
+        :param str_kind: either 'FromJson' or 'ToJson'
+        :type str_kind: str
+        :param obj_instance: optional, an instance to build the member schema from, one is created if not supplied
+        :type obj_instance: BaseDataObject
+        :return: the generated function, None if this class should use the generic implementation
+        """
+        if not cls._useGeneratedCode:
+            return None
+        str_attr = '_generated' + str_kind
+        func = cls.__dict__.get(str_attr)
+        if func is None:
+            # mark the class while its code is generated so a class that contains itself falls back to a method call
+            setattr(cls, str_attr, False)
+            try:
+                if obj_instance is None:
+                    obj_instance = cls()
+                schema = obj_instance._getMemberSchema()
+                if str_kind == 'FromJson':
+                    func = buildFromJson(cls, schema, cls._SubObjectMapping)
+                else:
+                    func = buildToJson(cls, schema, cls._SubObjectMapping, cls._useStdDict)
+            except Exception:
+                func = False
+            setattr(cls, str_attr, func)
+        return func or None
+
+    @classmethod
+    def _directFunction(cls, str_kind):
+        """
+        get the generated function that a parent object can call directly to (de)serialize an instance of this class,
+        classes that override ``_fromJson``/``_toJson`` must be called through the method instead
+
+        :param str_kind: either 'FromJson' or 'ToJson'
+        :type str_kind: str
+        :return: the generated function, None if the parent should call the method
+        """
+        str_method = '_fromJson' if str_kind == 'FromJson' else '_toJson'
+        if getattr(cls, str_method) is not getattr(BaseDataObject, str_method):
+            return None
+        return cls._generatedFunction(str_kind)
 
     def _getUtfEncoding(self, btData):
         """
@@ -58,38 +139,68 @@ class BaseDataObject(object):
         else:
             return 'utf-8'
 
-    def _get_members(self, bol_include_props=False):
+    def _buildMemberSchema(self):
         """
-        get all non-private member attributes
+        work out which members are auto-generated by inspecting this instance
 
         .. note::
             if you wish to exclude a non-private member, add that member to :attr:`_ExcludeFromMemebers`
 
-        :return: a list of all members that are not private, functions or properties
-        :rtype: list
+        :rtype: MemberSchema
         """
         lst_members = inspect.getmembers(self)
-        lst_filtered_members = []
+        lst_fields = []
+        lst_all = []
         for member in lst_members:
-            # print member
             if member[0].startswith(
                     '__'):  # remove all members that use the standard double underscore, this removes most of the default python object members
                 pass
             elif member[0].startswith('_'):  # remove private members that we declare
                 pass
+            elif isinstance(getattr(type(self), member[0], None), types.MemberDescriptorType):  # members declared in __slots__ are always attributes, even before they are set
+                if member[0] not in self._ExcludeFromMemebers:
+                    lst_fields.append(member[0])
+                    lst_all.append(member[0])
             elif callable(getattr(self, member[0])):  # remove any member that is callable, we only want attributes
                 pass
             elif isinstance(getattr(type(self), member[0], getattr(self, member[0])),
                             property):  # exclude properties because they are just for readability
-                if bol_include_props:
-                    lst_filtered_members.append(member)
+                lst_all.append(member[0])
             elif member[0] == 'JSON_Type':  # remove the attributes from this base class so that only the ones added by child classes remain
                 pass
             elif member[0] in self._ExcludeFromMemebers:
                 pass
             else:
-                lst_filtered_members.append(member)
-        return lst_filtered_members
+                lst_fields.append(member[0])
+                lst_all.append(member[0])
+        return MemberSchema(lst_fields, lst_all, [str_name for str_name in lst_fields if str_name in self._B64Memebers])
+
+    def _getMemberSchema(self):
+        """
+        get the auto-generated members of this object's class, inspecting the class only the first time it is needed
+
+        :rtype: MemberSchema
+        """
+        cls = type(self)
+        schema = cls.__dict__.get('_memberSchema')
+        if schema is None:
+            schema = self._buildMemberSchema()
+            cls._memberSchema = schema
+        return schema
+
+    def _get_members(self, bol_include_props=False):
+        """
+        get all non-private member attributes
+
+        .. note::
+            if you wish to exclude a non-private member, add that member to :attr:`_ExcludeFromMemebers`
+
+        :return: a list of all members that are not private, functions or properties
+        :rtype: list
+        """
+        schema = self._getMemberSchema()
+        lst_names = schema.Members if bol_include_props else schema.Fields
+        return [(str_name, getattr(self, str_name)) for str_name in lst_names]
 
     def __str__(self):
         lst_members = self._get_members(bol_include_props=self._StrShowProps)
@@ -147,15 +258,31 @@ class BaseDataObject(object):
         :return: True if successful, False otherwise
         :rtype: bool
         """
+        func = type(self)._generatedFunction('FromJson', self)
+        if func is None:
+            return self._fromJsonGeneric(dct_json)
+        return func(self, dct_json)
 
-        lst_members = self._get_members()
-        for member in lst_members:
-            if member[0] in dct_json:
+    def _fromJsonGeneric(self, dct_json):
+        """
+        populate this object from a json string representation of the object by walking its member schema
+
+        :param dct_json: the json representation
+        :type dct_json: OrderedDict
+        :return: True if successful, False otherwise
+        :rtype: bool
+        """
+
+        schema = self._getMemberSchema()
+        for str_name in schema.Fields:
+            if str_name in dct_json:
                 try:
-                    if member[0] in self._B64Memebers:
-                        setattr(self, member[0], base64.standard_b64decode(dct_json[member[0]]))
+                    if str_name in schema.B64Fields:
+                        setattr(self, str_name, base64.standard_b64decode(dct_json[str_name]))
+                    elif str_name in self._CanonicalMemebers:
+                        setattr(self, str_name, self._CanonicalMemebers[str_name](dct_json[str_name]))
                     else:
-                        setattr(self, member[0], dct_json[member[0]])
+                        setattr(self, str_name, dct_json[str_name])
                 except Exception as e:
                     return False
         for item in self._SubObjectMapping:
@@ -192,20 +319,31 @@ class BaseDataObject(object):
         :return: an JSON representation of the object
         :rtype: OrderedDict
         """
+        func = type(self)._generatedFunction('ToJson', self)
+        if func is None:
+            return self._toJsonGeneric()
+        return func(self)
 
-        lst_members = self._get_members()
+    def _toJsonGeneric(self):
+        """
+        make an json representation of this object by walking its member schema
+
+        :return: an JSON representation of the object
+        :rtype: OrderedDict
+        """
+
+        schema = self._getMemberSchema()
         dct_json = OrderedDict()
         if self._useStdDict:
             dct_json = {}
-        for member in lst_members:
-            if member[1] is None:
+        for str_name in schema.Fields:
+            member_data = getattr(self, str_name)
+            if member_data is None:
                 pass
+            elif str_name in schema.B64Fields:
+                dct_json[str_name] = base64.standard_b64encode(member_data)
             else:
-                member_data = member[1]
-                if member[0] in self._B64Memebers:
-                    dct_json[member[0]] = base64.standard_b64encode(member_data)
-                else:
-                    dct_json[member[0]] = member[1]
+                dct_json[str_name] = member_data
         for item in self._SubObjectMapping:
             json_tmp = item.SubClass.JSON_Type
             if item.JsonContainer is not None:
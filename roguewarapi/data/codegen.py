@@ -0,0 +1,158 @@
+"""
+Generates specialised ``_fromJson``/``_toJson`` functions for :class:`BaseDataObject <roguewarapi.data.BaseDataObject>`
+subclasses
+
+The generated functions do exactly what the generic, schema driven implementations do, in the same order, but with
+every member name, base64 check and sub object mapping resolved when the code is generated rather than on every call
+"""
+import base64
+from collections import OrderedDict
+
+
+def _target(str_name, str_obj='self'):
+    if str_name.isidentifier():
+        return f'{str_obj}.{str_name}'
+    return None
+
+
+def _assign(lst_lines, str_indent, str_name, str_value):
+    str_target = _target(str_name)
+    if str_target is None:
+        lst_lines.append(f'{str_indent}setattr(self, {str_name!r}, {str_value})')
+    else:
+        lst_lines.append(f'{str_indent}{str_target} = {str_value}')
+
+
+def _read(str_name):
+    str_target = _target(str_name)
+    if str_target is None:
+        return f'getattr(self, {str_name!r})'
+    return str_target
+
+
+def _childCall(cls_sub, str_kind, dct_namespace, int_index):
+    """
+    work out how generated code should call into a sub object, child classes that don't override the method are
+    called through their own generated function so the call skips the dispatch in the base class
+    """
+    func = cls_sub._directFunction(str_kind)
+    if func is None:
+        return None
+    str_func = f'_sub{int_index}{str_kind}'
+    dct_namespace[str_func] = func
+    return str_func
+
+
+def buildFromJson(cls, schema, lst_mapping):
+    """
+    generate a ``_fromJson`` function for a class
+
+    :param cls: the class to generate for
+    :param schema: the member schema of the class
+    :type schema: roguewarapi.data.basejsonobject.MemberSchema
+    :param lst_mapping: the class's sub object mapping
+    :type lst_mapping: list[roguewarapi.data.SubObjectMap]
+    :return: a function taking (self, dct_json)
+    """
+    dct_namespace = {'b64decode': base64.standard_b64decode}
+    lst_lines = ['def _fromJson(self, dct_json):']
+    for str_name in schema.Fields:
+        lst_lines.append(f'    if {str_name!r} in dct_json:')
+        lst_lines.append('        try:')
+        if str_name in schema.B64Fields:
+            _assign(lst_lines, '            ', str_name, f'b64decode(dct_json[{str_name!r}])')
+        elif str_name in cls._CanonicalMemebers:
+            str_func = f'_canonical{len(dct_namespace)}'
+            dct_namespace[str_func] = cls._CanonicalMemebers[str_name]
+            _assign(lst_lines, '            ', str_name, f'{str_func}(dct_json[{str_name!r}])')
+        else:
+            _assign(lst_lines, '            ', str_name, f'dct_json[{str_name!r}]')
+        lst_lines.append('        except Exception:')
+        lst_lines.append('            return False')
+
+    for int_index, item in enumerate(lst_mapping):
+        str_cls = f'_Sub{int_index}'
+        dct_namespace[str_cls] = item.SubClass
+        str_child = _childCall(item.SubClass, 'FromJson', dct_namespace, int_index)
+        if str_child is None:
+            str_call = 'new_obj._fromJson({})'
+        else:
+            str_call = str_child + '(new_obj, {})'
+
+        lst_lines.append('    obj_tmp = ' + ('None' if item.isList else 'dct_json'))
+        if item.JsonContainer is not None:
+            lst_lines.append(f'    if {item.JsonContainer!r} in dct_json:')
+            lst_lines.append(f'        obj_tmp = dct_json[{item.JsonContainer!r}]')
+        if item.isList:
+            lst_lines.append('    obj_container = []')
+            _assign(lst_lines, '    ', item.Container, 'obj_container')
+            lst_lines.append('    if obj_tmp is not None:')
+            lst_lines.append('        for tag in obj_tmp:')
+            lst_lines.append(f'            new_obj = {str_cls}()')
+            lst_lines.append('            ' + str_call.format('tag'))
+            lst_lines.append('            obj_container.append(new_obj)')
+        else:
+            str_type = item.SubClass.JSON_Type
+            lst_lines.append(f'    new_obj = {str_cls}()')
+            lst_lines.append(f'    if {str_type!r} in obj_tmp:')
+            lst_lines.append('        ' + str_call.format(f'obj_tmp[{str_type!r}]'))
+            _assign(lst_lines, '    ', item.Container, 'new_obj')
+    lst_lines.append('    return True')
+    return _compile(cls, '_fromJson', lst_lines, dct_namespace)
+
+
+def buildToJson(cls, schema, lst_mapping, bol_std_dict):
+    """
+    generate a ``_toJson`` function for a class
+
+    :param cls: the class to generate for
+    :param schema: the member schema of the class
+    :type schema: roguewarapi.data.basejsonobject.MemberSchema
+    :param lst_mapping: the class's sub object mapping
+    :type lst_mapping: list[roguewarapi.data.SubObjectMap]
+    :param bol_std_dict: True to build plain dicts, False for OrderedDicts
+    :type bol_std_dict: bool
+    :return: a function taking (self)
+    """
+    dct_namespace = {'b64encode': base64.standard_b64encode, 'OrderedDict': OrderedDict}
+    lst_lines = ['def _toJson(self):']
+    lst_lines.append('    dct_json = {}' if bol_std_dict else '    dct_json = OrderedDict()')
+    for str_name in schema.Fields:
+        lst_lines.append(f'    member_data = {_read(str_name)}')
+        lst_lines.append('    if member_data is not None:')
+        if str_name in schema.B64Fields:
+            lst_lines.append(f'        dct_json[{str_name!r}] = b64encode(member_data)')
+        else:
+            lst_lines.append(f'        dct_json[{str_name!r}] = member_data')
+
+    for int_index, item in enumerate(lst_mapping):
+        str_child = _childCall(item.SubClass, 'ToJson', dct_namespace, int_index)
+        if str_child is None:
+            str_call = '{}._toJson()'
+        else:
+            str_call = str_child + '({})'
+
+        str_json = item.SubClass.JSON_Type
+        lst_lines.append(f'    member = {_read(item.Container)}')
+        if item.isList and item.JsonContainer is not None:
+            lst_lines.append(f'    dct_json[{item.JsonContainer!r}] = [' + str_call.format('obj') + ' for obj in member]')
+        elif item.isList:
+            lst_lines.append('    for obj in member:')
+            lst_lines.append(f'        dct_json[{str_json!r}].append(' + str_call.format('obj') + ')')
+        else:
+            if item.JsonContainer is not None:
+                str_json = item.JsonContainer
+                lst_lines.append(f'    dct_json[{str_json!r}] = []')
+            lst_lines.append('    if member is not None:')
+            lst_lines.append(f'        dct_json[{str_json!r}] = ' + str_call.format('member'))
+    lst_lines.append('    return dct_json')
+    return _compile(cls, '_toJson', lst_lines, dct_namespace)
+
+
+def _compile(cls, str_func, lst_lines, dct_namespace):
+    str_source = '\n'.join(lst_lines) + '\n'
+    exec(compile(str_source, f'<generated {cls.__qualname__}.{str_func}>', 'exec'), dct_namespace)
+    func = dct_namespace[str_func]
+    func.__qualname__ = f'{cls.__qualname__}.{str_func}'
+    func.__source__ = str_source
+    return func
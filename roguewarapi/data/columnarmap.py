@@ -0,0 +1,264 @@
+from array import array
+from collections import Counter
+
+from .factioncodes import FactionCodes
+from .starmap import StarMap
+
+
+def _pack(values, typecode):
+    """
+    pack a column into an array when every value is of the type the array stores, otherwise keep it as a list so
+    converting back is lossless
+    """
+    expected = bool if typecode == 'b' else (float if typecode == 'd' else int)
+    for value in values:
+        if type(value) is not expected:
+            return list(values)
+    try:
+        return array(typecode, values)
+    except OverflowError:
+        return list(values)
+
+
+def _packNumeric(values):
+    packed = _pack(values, 'q')
+    if isinstance(packed, list):
+        packed = _pack(values, 'd')
+    return packed
+
+
+class ColumnarStarMap(object):
+    """
+    A :class:`StarMap <roguewarapi.data.StarMap>` stored as columns rather than as a list of
+    :class:`StarSystem <roguewarapi.data.StarSystem>` objects
+
+    Row ``i`` of every column describes the ``i``-th system of the map. Owners and faction names are stored as
+    :class:`FactionCodes` and numeric columns as packed :class:`array.array` objects. Faction control is a flattened
+    sparse table, the entries of row ``i`` are ``ctlOffsets[i]:ctlOffsets[i + 1]`` of the ``ctl`` columns. A column
+    holding values that don't fit an array, such as the default empty string `control`, is kept as a list instead
+    """
+
+    def __init__(self, factionCodes=None):
+        """
+        :param factionCodes: optional, the faction codes to use, share one between maps to compare their columns
+        :type factionCodes: FactionCodes
+        """
+        self.factions = factionCodes if factionCodes is not None else FactionCodes()
+        self.names = []  # type: list[str]
+        self.owners = array('H')
+        self.players = array('q')
+        self.markerType = array('q')
+        self.immuneFromWar = array('b')
+        self.ctlOffsets = array('Q', [0])
+        self.ctlFaction = array('H')
+        self.ctlControl = array('q')
+        self.ctlActivePlayers = array('q')
+        self._rows = None  # type: dict[str, int]
+        self._rowCount = 0
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def _fromRows(cls, rows, factionCodes):
+        # rows are (name, owner, players, markerType, immuneFromWar, [(faction, control, activePlayers)])
+        columnar = cls(factionCodes)
+        code = columnar.factions.code
+        names = columnar.names
+        owners = []
+        players = []
+        markers = []
+        immune = []
+        offsets = columnar.ctlOffsets
+        ctlFaction = []
+        ctlControl = []
+        ctlActive = []
+        for name, owner, systemPlayers, marker, systemImmune, controls in rows:
+            names.append(name)
+            owners.append(code(owner))
+            players.append(systemPlayers)
+            markers.append(marker)
+            immune.append(systemImmune)
+            for faction, control, activePlayers in controls:
+                ctlFaction.append(code(faction))
+                ctlControl.append(control)
+                ctlActive.append(activePlayers)
+            offsets.append(len(ctlFaction))
+        columnar.owners = array('H', owners)
+        columnar.players = _packNumeric(players)
+        columnar.markerType = _packNumeric(markers)
+        columnar.immuneFromWar = _pack(immune, 'b')
+        columnar.ctlFaction = array('H', ctlFaction)
+        columnar.ctlControl = _packNumeric(ctlControl)
+        columnar.ctlActivePlayers = _packNumeric(ctlActive)
+        return columnar
+
+    @classmethod
+    def fromStarMap(cls, starmap, factionCodes=None):
+        """
+        convert a starmap into columns
+
+        :param starmap: the map to convert
+        :type starmap: StarMap
+        :param factionCodes: optional, the faction codes to use
+        :type factionCodes: FactionCodes
+        :rtype: ColumnarStarMap
+        """
+        return cls._fromRows(((system.name, system.owner, system.Players, system.markerType, system.immuneFromWar,
+                               [(fctCtl.Name, fctCtl.control, fctCtl.ActivePlayers) for fctCtl in system.availableFactions])
+                              for system in starmap.systems), factionCodes)
+
+    @classmethod
+    def fromJson(cls, dct_json, factionCodes=None):
+        """
+        build the columns straight from a `getmap` payload without creating any star system objects
+
+        :param dct_json: the parsed json payload
+        :type dct_json: dict
+        :param factionCodes: optional, the faction codes to use
+        :type factionCodes: FactionCodes
+        :rtype: ColumnarStarMap
+        """
+        # missing fields take the same defaults as StarSystem and FactionControl
+        return cls._fromRows(((system.get('name', ''), system.get('owner', ''), system.get('Players', 0),
+                               system.get('markerType', 0), system.get('immuneFromWar', False),
+                               [(fctCtl.get('Name', ''), fctCtl.get('control', ''), fctCtl.get('ActivePlayers', 0))
+                                for fctCtl in system.get('factions') or ()])
+                              for system in dct_json.get('starsystems') or ()), factionCodes)
+
+    def toStarMap(self, cls=StarMap):
+        """
+        convert the columns back into a starmap
+
+        :param cls: optional, the starmap class to build, such as :class:`SlottedStarMap <roguewarapi.data.SlottedStarMap>`
+        :return: a starmap equal to the one the columns were built from
+        :rtype: StarMap
+        """
+        starmap = cls()
+        systemCls = cls._SubObjectMapping[0].SubClass
+        controlCls = systemCls._SubObjectMapping[0].SubClass
+        factionName = self.factions.names
+        immune = self.immuneFromWar
+        offsets = self.ctlOffsets
+        for row, name in enumerate(self.names):
+            system = systemCls()
+            system.name = name
+            system.owner = factionName[self.owners[row]]
+            system.Players = self.players[row]
+            system.markerType = self.markerType[row]
+            system.immuneFromWar = bool(immune[row]) if isinstance(immune, array) else immune[row]
+            controls = system.availableFactions
+            for entry in range(offsets[row], offsets[row + 1]):
+                fctCtl = controlCls()
+                fctCtl.Name = factionName[self.ctlFaction[entry]]
+                fctCtl.control = self.ctlControl[entry]
+                fctCtl.ActivePlayers = self.ctlActivePlayers[entry]
+                controls.append(fctCtl)
+            starmap.systems.append(system)
+        starmap.reindex()
+        return starmap
+
+    def rowOf(self, name):
+        """
+        :param name: a star system name
+        :type name: str
+        :return: the row of the system, -1 if it isn't on the map
+        :rtype: int
+        """
+        if self._rows is None or self._rowCount != len(self.names):
+            self._rows = {}
+            for row, systemName in enumerate(self.names):
+                self._rows.setdefault(systemName, row)
+            self._rowCount = len(self.names)
+        return self._rows.get(name, -1)
+
+    def rowsByOwner(self, owner):
+        """
+        :param owner: the owning faction
+        :type owner: str
+        :return: the rows of every system held by the faction
+        :rtype: list[int]
+        """
+        code = self.factions.find(owner)
+        if code < 0:
+            return []
+        return [row for row, ownerCode in enumerate(self.owners) if ownerCode == code]
+
+    def systemsByOwner(self, owner):
+        """
+        :param owner: the owning faction
+        :type owner: str
+        :return: the names of every system held by the faction, in map order
+        :rtype: list[str]
+        """
+        names = self.names
+        return [names[row] for row in self.rowsByOwner(owner)]
+
+    def filterRows(self, owner=None, minPlayers=None, markerType=None, immuneFromWar=None):
+        """
+        find the rows matching every supplied condition
+
+        :param owner: optional, the owning faction
+        :type owner: str
+        :param minPlayers: optional, the minimum number of players
+        :type minPlayers: int
+        :param markerType: optional, marker bits that must all be set
+        :type markerType: int
+        :param immuneFromWar: optional, the required immunity
+        :type immuneFromWar: bool
+        :rtype: list[int]
+        """
+        rows = range(len(self.names))
+        if owner is not None:
+            rows = self.rowsByOwner(owner)
+        if minPlayers is not None:
+            players = self.players
+            rows = [row for row in rows if players[row] >= minPlayers]
+        if markerType is not None:
+            markers = self.markerType
+            rows = [row for row in rows if markers[row] & markerType == markerType]
+        if immuneFromWar is not None:
+            immune = self.immuneFromWar
+            rows = [row for row in rows if bool(immune[row]) == immuneFromWar]
+        return list(rows)
+
+    def countByOwner(self):
+        """
+        :return: the number of systems held by each faction
+        :rtype: dict[str, int]
+        """
+        names = self.factions.names
+        return {names[code]: count for code, count in Counter(self.owners).items()}
+
+    def playersByOwner(self):
+        """
+        :return: the total players across the systems held by each faction
+        :rtype: dict[str, int]
+        """
+        totals = {}
+        names = self.factions.names
+        for ownerCode, players in zip(self.owners, self.players):
+            totals[names[ownerCode]] = totals.get(names[ownerCode], 0) + players
+        return totals
+
+    def activePlayersByFaction(self):
+        """
+        :return: the total `ActivePlayers` of each faction across every system's control table
+        :rtype: dict[str, int]
+        """
+        totals = {}
+        names = self.factions.names
+        for factionCode, active in zip(self.ctlFaction, self.ctlActivePlayers):
+            totals[names[factionCode]] = totals.get(names[factionCode], 0) + active
+        return totals
+
+    def controlOf(self, row):
+        """
+        :param row: a system row
+        :type row: int
+        :return: the (faction, control, activePlayers) entries of the system
+        :rtype: list[tuple[str, object, int]]
+        """
+        names = self.factions.names
+        return [(names[self.ctlFaction[entry]], self.ctlControl[entry], self.ctlActivePlayers[entry])
+                for entry in range(self.ctlOffsets[row], self.ctlOffsets[row + 1])]
@@ -0,0 +1,48 @@
+from .kfactions import kFactions
+
+
+class FactionCodes(object):
+    """
+    Interns faction names into small integer codes
+
+    The codes of the factions listed in :class:`kFactions <roguewarapi.data.kFactions>` are fixed, so they are the same
+    for every map. Any other name is given the next free code the first time it is seen
+    """
+
+    def __init__(self):
+        self.names = list(kFactions.listItemNames())  # type: list[str]
+        self._codes = {name: code for code, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def code(self, name):
+        """
+        :param name: a faction name
+        :type name: str
+        :return: the code of the faction, a new code is assigned if the name hasn't been seen before
+        :rtype: int
+        """
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def find(self, name):
+        """
+        :param name: a faction name
+        :type name: str
+        :return: the code of the faction, -1 if it has never been seen
+        :rtype: int
+        """
+        return self._codes.get(name, -1)
+
+    def name(self, code):
+        """
+        :param code: a faction code
+        :type code: int
+        :return: the faction name
+        :rtype: str
+        """
+        return self.names[code]
@@ -1,14 +1,19 @@
 from .basejsonobject import BaseDataObject
+from .kfactions import kFactions
 import re
 
 
-class FactionControl(BaseDataObject):
+class FactionControlBase(BaseDataObject):
 
     """
-    Represents the control level a faction has over a system and any active players present
+    The behaviour shared by :class:`FactionControl` and :class:`SlottedFactionControl`, which only differ in how they
+    store their members
     """
 
+    __slots__ = ()
+
     JSON_Type = "fctControl"
+    _CanonicalMemebers = {'Name': kFactions.canonical}
 
     def __init__(self):
         self.Name = ""
@@ -17,4 +22,32 @@ class FactionControl(BaseDataObject):
 
     @property
     def prettyName(self):
-        return re.sub('([a-z])([A-Z])', r'\1 \2', self.Name)
\ No newline at end of file
+        return re.sub('([a-z])([A-Z])', r'\1 \2', self.Name)
+
+    @property
+    def hasControl(self):
+        """
+        :return: True if the faction holds any control over the system
+        :rtype: bool
+        """
+        try:
+            return float(self.control) != 0
+        except (TypeError, ValueError):
+            return False
+
+
+class FactionControl(FactionControlBase):
+
+    """
+    Represents the control level a faction has over a system and any active players present
+    """
+
+
+class SlottedFactionControl(FactionControlBase):
+
+    """
+    A :class:`FactionControl` that stores its members in ``__slots__`` instead of an instance dictionary, use it when
+    holding many maps in memory at once
+    """
+
+    __slots__ = ('Name', 'control', 'ActivePlayers')
@@ -0,0 +1,16 @@
+from .basejsonobject import BaseDataObject
+
+
+class FactionStats(BaseDataObject):
+    """
+    Aggregated totals for a single faction across a :class:`StarMap <roguewarapi.data.StarMap>`
+    """
+
+    JSON_Type = "FactionStats"
+
+    def __init__(self, name=""):
+        self.name = name  #: the faction these totals belong to
+        self.systems = 0  #: the number of systems the faction owns
+        self.players = 0  #: the total `Players` across the systems the faction owns
+        self.activePlayers = 0  #: the total `ActivePlayers` of the faction's control entries on every system
+        self.contestedSystems = 0  #: the number of systems the faction owns that another faction holds control in
@@ -0,0 +1,287 @@
+import math
+from array import array
+
+from .spatialindex import SpatialGrid
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, everything here falls back to pure python
+    np = None
+
+
+def hasNumpy():
+    """
+    :return: True if the optional numpy backend is available
+    :rtype: bool
+    """
+    return np is not None
+
+
+class NeighborGraph(object):
+    """
+    A compact, CSR-style adjacency structure over star systems
+
+    The neighbours of node ``i`` are ``indices[offsets[i]:offsets[i + 1]]``, sorted by node id. Node ids are the
+    positions of the systems in :attr:`StarMapConstants.systemConstants <roguewarapi.data.StarMapConstants.systemConstants>`.
+    When numpy is available `offsets` and `indices` are numpy arrays, otherwise they are :class:`array.array` objects
+    """
+
+    def __init__(self, names, offsets, indices, radius):
+        """
+        :param names: the name of each node
+        :type names: list[str]
+        :param offsets: the start of each node's neighbour list in `indices`, one longer than `names`
+        :param indices: the concatenated neighbour lists
+        :param radius: the radius the graph was built with
+        :type radius: float
+        """
+        self.names = names
+        self.offsets = offsets
+        self.indices = indices
+        self.radius = radius
+        self._nodeIds = None  # type: dict[str, int]
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def nodeCount(self):
+        """
+        :rtype: int
+        """
+        return len(self.names)
+
+    @property
+    def edgeCount(self):
+        """
+        the number of directed edges, each adjacent pair is counted once in each direction
+
+        :rtype: int
+        """
+        return int(self.offsets[-1]) if len(self.offsets) else 0
+
+    def nodeOf(self, name):
+        """
+        :param name: a star system name
+        :type name: str
+        :return: the node id of the system, -1 if it is not in the graph
+        :rtype: int
+        """
+        if self._nodeIds is None:
+            self._nodeIds = {}
+            for node, nodeName in enumerate(self.names):
+                self._nodeIds.setdefault(nodeName, node)
+        return self._nodeIds.get(name, -1)
+
+    def degree(self, node):
+        """
+        :param node: a node id
+        :type node: int
+        :return: the number of neighbours of the node
+        :rtype: int
+        """
+        return int(self.offsets[node + 1] - self.offsets[node])
+
+    def neighbors(self, node):
+        """
+        :param node: a node id
+        :type node: int
+        :return: the node ids adjacent to `node`
+        """
+        return self.indices[self.offsets[node]:self.offsets[node + 1]]
+
+    def neighborNames(self, node):
+        """
+        :param node: a node id
+        :type node: int
+        :return: the names of the systems adjacent to `node`
+        :rtype: list[str]
+        """
+        names = self.names
+        return [names[other] for other in self.neighbors(node)]
+
+    def toLists(self):
+        """
+        expand the graph into per-system name lists, the same form as :attr:`StarSystemConst.adjacentSystems`
+
+        :rtype: list[list[str]]
+        """
+        return [self.neighborNames(node) for node in range(len(self.names))]
+
+
+def _pythonGraph(names, posx, posy, maxDistance):
+    grid = SpatialGrid(maxDistance)
+    for index in range(len(names)):
+        grid.insert(posx[index], posy[index])
+    offsets = array('q', [0])
+    indices = array('q')
+    for index, name in enumerate(names):
+        for other in grid.queryRadiusIndices(posx[index], posy[index], maxDistance):
+            if names[other] != name:
+                indices.append(other)
+        offsets.append(len(indices))
+    return NeighborGraph(names, offsets, indices, maxDistance)
+
+
+def _numpyGraph(names, posx, posy, maxDistance, blockSize):
+    count = len(names)
+    px = np.ascontiguousarray(posx, dtype=np.float64)
+    py = np.ascontiguousarray(posy, dtype=np.float64)
+    codeOf = {}
+    codes = np.fromiter((codeOf.setdefault(name, len(codeOf)) for name in names), dtype=np.int64, count=count)
+
+    # bucket the systems into vertical strips one radius wide and sort each strip by y, a block of rows from one strip
+    # then only has to be compared against a short y window of itself and its two neighbouring strips
+    cellSize = maxDistance if maxDistance > 0 else 1.0
+    strips = np.floor(px / cellSize).astype(np.int64)
+    order = np.lexsort((py, strips))
+    sx = px[order]
+    sy = py[order]
+    scodes = codes[order]
+    stripIds, stripStarts = np.unique(strips[order], return_index=True)
+    stripEnds = np.append(stripStarts[1:], count)
+    stripRanges = {int(strip): (int(start), int(end)) for strip, start, end in zip(stripIds, stripStarts, stripEnds)}
+
+    sources = []
+    targets = []
+    for stripStart, stripEnd in stripRanges.values():
+        for start in range(stripStart, stripEnd, blockSize):
+            stop = min(stripEnd, start + blockSize)
+            bx = sx[start:stop, None]
+            by = sy[start:stop, None]
+            lowY = sy[start] - maxDistance
+            highY = sy[stop - 1] + maxDistance
+            windows = []
+            lowStrip = int(np.floor((bx.min() - maxDistance) / cellSize))
+            highStrip = int(np.floor((bx.max() + maxDistance) / cellSize))
+            for strip in range(lowStrip, highStrip + 1):
+                bounds = stripRanges.get(strip)
+                if bounds is None:
+                    continue
+                column = sy[bounds[0]:bounds[1]]
+                lo = bounds[0] + int(np.searchsorted(column, lowY, side='left'))
+                hi = bounds[0] + int(np.searchsorted(column, highY, side='right'))
+                if lo < hi:
+                    windows.append(np.arange(lo, hi))
+            if not windows:
+                continue
+            cols = np.concatenate(windows)
+            cx = sx[None, cols]
+            cy = sy[None, cols]
+            mask = (bx - maxDistance <= cx) & (cx <= bx + maxDistance) & (by - maxDistance <= cy) & (cy <= by + maxDistance)
+            mask &= scodes[start:stop, None] != scodes[None, cols]
+            dx = bx - cx
+            dy = by - cy
+            dist = np.sqrt(dx * dx + dy * dy)
+            # numpy and math.pow may round differently in the last bit, so pairs sitting on the radius are settled
+            # with exactly the same expression the pure python path uses
+            near = mask & (np.abs(dist - maxDistance) <= abs(maxDistance) * 1e-12)
+            mask &= dist <= maxDistance
+            for row, col in zip(*np.nonzero(near)):
+                const = order[start + row]
+                other = order[cols[col]]
+                mask[row, col] = math.sqrt(pow(posx[const] - posx[other], 2) + pow(posy[const] - posy[other], 2)) <= maxDistance
+            rows, hits = np.nonzero(mask)
+            sources.append(order[rows + start])
+            targets.append(order[cols[hits]])
+
+    if sources:
+        source = np.concatenate(sources)
+        target = np.concatenate(targets)
+    else:
+        source = np.zeros(0, dtype=np.intp)
+        target = np.zeros(0, dtype=np.intp)
+    sort = np.lexsort((target, source))
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(source, minlength=count), out=offsets[1:])
+    return NeighborGraph(names, offsets, target[sort].astype(np.int64), maxDistance)
+
+
+def buildNeighborGraph(names, posx, posy, maxDistance, useNumpy=None, blockSize=64):
+    """
+    compute the neighbour graph of a set of star systems, two systems are adjacent when they have different names and
+    lie within `maxDistance` of each other
+
+    :param names: the name of each system
+    :type names: list[str]
+    :param posx: the x coordinate of each system
+    :param posy: the y coordinate of each system
+    :param maxDistance: the maximum distance to consider as adjacent
+    :type maxDistance: float
+    :param useNumpy: optional, force the numpy (True) or pure python (False) backend, by default numpy is used when
+        it is installed
+    :type useNumpy: bool
+    :param blockSize: the number of systems compared per batch by the numpy backend
+    :type blockSize: int
+    :rtype: NeighborGraph
+    """
+    if useNumpy is None:
+        useNumpy = np is not None
+    if useNumpy and np is None:
+        raise ImportError('numpy is required for the numpy adjacency backend')
+    if maxDistance < 0:
+        offsets = [0] * (len(names) + 1)
+        if useNumpy:
+            return NeighborGraph(names, np.array(offsets, dtype=np.int64), np.zeros(0, dtype=np.int64), maxDistance)
+        return NeighborGraph(names, array('q', offsets), array('q'), maxDistance)
+    if useNumpy:
+        return _numpyGraph(names, posx, posy, maxDistance, blockSize)
+    return _pythonGraph(names, posx, posy, maxDistance)
+
+
+def filterNeighborGraph(graph, posx, posy, maxDistance, useNumpy=None):
+    """
+    narrow a neighbour graph down to a smaller radius, this only looks at the edges already in the graph so it is much
+    cheaper than building the smaller graph from scratch, and gives exactly the same result
+
+    :param graph: the graph to filter
+    :type graph: NeighborGraph
+    :param posx: the x coordinate of each system
+    :param posy: the y coordinate of each system
+    :param maxDistance: the new maximum distance, no larger than the radius of `graph`
+    :type maxDistance: float
+    :param useNumpy: optional, force the numpy (True) or pure python (False) backend
+    :type useNumpy: bool
+    :rtype: NeighborGraph
+    """
+    if maxDistance > graph.radius:
+        raise ValueError(f'cannot widen a graph of radius {graph.radius} to {maxDistance}')
+    if useNumpy is None:
+        useNumpy = np is not None
+    if useNumpy and np is None:
+        raise ImportError('numpy is required for the numpy adjacency backend')
+    names = graph.names
+    count = len(names)
+    if useNumpy:
+        graphOffsets = np.asarray(graph.offsets, dtype=np.int64)
+        target = np.asarray(graph.indices, dtype=np.int64)
+        source = np.repeat(np.arange(count), np.diff(graphOffsets))
+        xs = np.asarray(posx, dtype=np.float64)
+        ys = np.asarray(posy, dtype=np.float64)
+        dx = xs[source] - xs[target]
+        dy = ys[source] - ys[target]
+        dist = np.sqrt(dx * dx + dy * dy)
+        keep = dist <= maxDistance
+        # settle pairs sitting on the radius with the expression the graph builders use
+        for edge in np.nonzero(np.abs(dist - maxDistance) <= abs(maxDistance) * 1e-12)[0]:
+            const = source[edge]
+            other = target[edge]
+            keep[edge] = math.sqrt(pow(posx[const] - posx[other], 2) + pow(posy[const] - posy[other], 2)) <= maxDistance
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(source[keep], minlength=count), out=offsets[1:])
+        return NeighborGraph(names, offsets, target[keep], maxDistance)
+
+    graphOffsets = list(graph.offsets)
+    graphIndices = list(graph.indices)
+    xs = list(posx)
+    ys = list(posy)
+    offsets = array('q', [0])
+    indices = array('q')
+    for const in range(count):
+        x = xs[const]
+        y = ys[const]
+        for other in graphIndices[graphOffsets[const]:graphOffsets[const + 1]]:
+            if math.sqrt(pow(x - xs[other], 2) + pow(y - ys[other], 2)) <= maxDistance:
+                indices.append(other)
+        offsets.append(len(indices))
+    return NeighborGraph(names, offsets, indices, maxDistance)
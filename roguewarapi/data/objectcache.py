@@ -1,24 +1,293 @@
+import sys
+import threading
 import time
+from collections import OrderedDict
 
 
 class CacheObject:
 
-    def __init__(self, data, expiry):
+    def __init__(self, data, expiry, stale=0, size=0):
         self.data = data
         self.expireTime = time.time() + expiry
+        self.removeTime = self.expireTime + stale  #: when the entry is dropped, stale entries are kept until then
+        self.size = size
 
+    def isExpired(self, now=None):
+        """
+        :param now: optional, the time to check against, defaults to the current time
+        :type now: float
+        :rtype: bool
+        """
+        if now is None:
+            now = time.time()
+        return now >= self.expireTime
 
-class CacheManager:
+
+class CacheStats:
+    """
+    A snapshot of the counters of a :class:`CacheManager`
+    """
 
     def __init__(self):
-        self.cache = {}
+        self.hits = 0  #: lookups that found a live entry
+        self.misses = 0  #: lookups that found nothing, or only an expired entry
+        self.evictions = 0  #: entries dropped to stay within the entry or byte limit
+        self.expirations = 0  #: entries dropped because they expired
+        self.entries = 0  #: entries currently held
+        self.bytes = 0  #: the total size of the entries currently held
+
+    @property
+    def hitRate(self):
+        """
+        :return: the fraction of lookups that were hits, 0 before the first lookup
+        :rtype: float
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def copy(self):
+        stats = CacheStats()
+        stats.__dict__.update(self.__dict__)
+        return stats
+
+    def __repr__(self):
+        return (f'CacheStats(hits={self.hits}, misses={self.misses}, evictions={self.evictions}, '
+                f'expirations={self.expirations}, entries={self.entries}, bytes={self.bytes})')
+
+
+class CacheManager:
+    """
+    A thread safe cache of expiring items
+
+    Items expire after their own TTL and the least recently used items are evicted once the cache holds more than
+    `maxEntries` items or more than `maxBytes` bytes, as measured by `sizeOf`. An expired item can be kept around for a
+    while longer so callers can still serve it while they refresh it, see :meth:`getCacheEntry`
+    """
+
+    def __init__(self, maxEntries=None, maxBytes=None, sizeOf=sys.getsizeof):
+        """
+        :param maxEntries: optional, the most items to hold, None for no limit
+        :type maxEntries: int
+        :param maxBytes: optional, the most bytes to hold, None for no limit
+        :type maxBytes: int
+        :param sizeOf: optional, measures the size of an item in bytes when `maxBytes` is set, the default
+            :func:`sys.getsizeof` doesn't follow references so pass a deeper measure for container objects
+        """
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        self.sizeOf = sizeOf
+        self.cache = OrderedDict()  # type: OrderedDict[object, CacheObject]
+        self._lock = threading.RLock()
+        self._stats = CacheStats()
+        self._nextPurge = float('inf')
+
+    def __len__(self):
+        with self._lock:
+            return len(self.cache)
 
     def getCacheItem(self, key):
-        if key in self.cache:
-            if time.time() < self.cache[key].expireTime:
-                return self.cache[key].data
-        return None
+        """
+        :param key: the cache key
+        :return: the cached item, None if there is none or it has expired
+        """
+        entry = self.getCacheEntry(key)
+        if entry is None or entry.isExpired():
+            return None
+        return entry.data
+
+    def peekCacheItem(self, key):
+        """
+        look up an item without counting a hit or miss or marking it as recently used
+
+        :param key: the cache key
+        :return: the cached item, None if there is none or it has expired
+        """
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is None or entry.isExpired():
+                return None
+            return entry.data
+
+    def getCacheEntry(self, key):
+        """
+        get the cache entry for a key even if it has expired, as long as it is still within its stale window
+
+        :param key: the cache key
+        :return: the entry, None if there isn't one
+        :rtype: CacheObject
+        """
+        with self._lock:
+            now = time.time()
+            entry = self.cache.get(key)
+            if entry is not None and now >= entry.removeTime:
+                self._drop(key)
+                self._stats.expirations += 1
+                entry = None
+            if entry is None or entry.isExpired(now):
+                self._stats.misses += 1
+            else:
+                self._stats.hits += 1
+            if entry is not None:
+                self.cache.move_to_end(key)
+            return entry
+
+    def placeCacheItem(self, key, item, expire=60, stale=0):
+        """
+        :param key: the cache key
+        :param item: the item to cache
+        :param expire: optional, the number of seconds the item is valid for
+        :type expire: float
+        :param stale: optional, the number of seconds an expired item is kept for after it expires
+        :type stale: float
+        """
+        size = self.sizeOf(item) if self.maxBytes is not None else 0
+        entry = CacheObject(item, expire, stale, size)
+        with self._lock:
+            if key in self.cache:
+                self._drop(key)
+            self.cache[key] = entry
+            self._stats.bytes += size
+            self._nextPurge = min(self._nextPurge, entry.removeTime)
+            if self._nextPurge <= time.time():
+                self.purgeExpired()
+            self._evict()
+
+    def removeCacheItem(self, key):
+        """
+        :param key: the cache key
+        :return: True if an item was removed
+        :rtype: bool
+        """
+        with self._lock:
+            if key not in self.cache:
+                return False
+            self._drop(key)
+            return True
+
+    def clear(self):
+        with self._lock:
+            self.cache.clear()
+            self._stats.bytes = 0
+            self._nextPurge = float('inf')
+
+    def purgeExpired(self):
+        """
+        drop every item whose stale window has passed
+
+        :return: the number of items dropped
+        :rtype: int
+        """
+        with self._lock:
+            now = time.time()
+            expired = [key for key, entry in self.cache.items() if now >= entry.removeTime]
+            for key in expired:
+                self._drop(key)
+            self._stats.expirations += len(expired)
+            self._nextPurge = min((entry.removeTime for entry in self.cache.values()), default=float('inf'))
+            return len(expired)
+
+    def stats(self):
+        """
+        :return: a snapshot of the cache's counters
+        :rtype: CacheStats
+        """
+        with self._lock:
+            stats = self._stats.copy()
+            stats.entries = len(self.cache)
+            return stats
+
+    def resetStats(self):
+        """
+        zero the hit, miss, eviction and expiry counters
+        """
+        with self._lock:
+            stats = CacheStats()
+            stats.bytes = self._stats.bytes
+            self._stats = stats
+
+    def _drop(self, key):
+        self._stats.bytes -= self.cache.pop(key).size
+
+    def _evict(self):
+        while self.cache and ((self.maxEntries is not None and len(self.cache) > self.maxEntries) or
+                              (self.maxBytes is not None and self._stats.bytes > self.maxBytes)):
+            self._stats.bytes -= self.cache.popitem(last=False)[1].size
+            self._stats.evictions += 1
+
+
+class _Flight:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None  # type: BaseException
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key, while a call is running every other caller for that key waits for it
+    and receives its result instead of making the call again
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}  # type: dict[object, _Flight]
+
+    def inFlight(self, key):
+        """
+        :param key: the call key
+        :return: True if a call for the key is currently running
+        :rtype: bool
+        """
+        with self._lock:
+            return key in self._flights
+
+    def do(self, key, func, *args):
+        """
+        run `func` unless a call for the same key is already running, in which case wait for that one
+
+        :param key: the call key
+        :param func: the function to call
+        :return: the result of whichever call ran, exceptions raised by it are raised to every waiting caller
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if leader:
+            try:
+                flight.result = func(*args)
+            except BaseException as e:
+                flight.error = e
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def doInBackground(self, key, func, *args):
+        """
+        start `func` on a background thread unless a call for the same key is already running
 
-    def placeCacheItem(self, key, item, expire=60):
+        :param key: the call key
+        :param func: the function to call
+        :return: True if a new call was started
+        :rtype: bool
+        """
+        with self._lock:
+            if key in self._flights:
+                return False
+        thread = threading.Thread(target=self._runQuietly, args=(key, func) + args, daemon=True)
+        thread.start()
+        return True
 
-        self.cache[key] = CacheObject(item, expire)
\ No newline at end of file
+    def _runQuietly(self, key, func, *args):
+        try:
+            self.do(key, func, *args)
+        except Exception:
+            pass
@@ -0,0 +1,221 @@
+"""
+A compact binary snapshot of :class:`StarMapConstants <roguewarapi.data.StarMapConstants>`, including the adjacency
+graph and the radius it was built with, so a new process can load the constants without fetching and mapping them
+
+The file is a fixed header followed by 8 byte aligned sections, every number is little endian:
+
+=========================  =====================================================================================
+section                    contents
+=========================  =====================================================================================
+header                     magic, format version, flags, system count, string count, edge count, radius, tag size
+tag                        the utf-8 tag the snapshot was saved with, such as the ETag of the constants
+string offsets             uint32, one more than the string count
+strings                    every distinct name and owner, utf-8, back to back
+names, owners              uint32 string numbers, one per system
+posx, posy                 float64, one per system
+adjacency offsets          int64, one more than the system count, empty without a graph
+adjacency indices          uint32, one per edge
+=========================  =====================================================================================
+"""
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from .neighborgraph import NeighborGraph, np
+
+SnapshotVersion = 1  #: the format version, snapshots written with any other version are ignored
+
+_Magic = b'RWSC'
+_Header = struct.Struct('<4sHHIIQdI')
+_IntegralX = 1
+_IntegralY = 2
+_HasGraph = 4
+
+
+def _aligned(int_offset):
+    return (int_offset + 7) & ~7
+
+
+def _littleEndian(arr):
+    if sys.byteorder == 'big':
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def writeConstantsSnapshot(constants, str_name, graph=None, tag=''):
+    """
+    write a snapshot of a set of star map constants, the file is replaced atomically
+
+    :param constants: the constants to save
+    :type constants: roguewarapi.data.StarMapConstants
+    :param str_name: the name of the file to write
+    :type str_name: str
+    :param graph: optional, the adjacency graph to save, without one the adjacency lists aren't saved
+    :type graph: NeighborGraph
+    :param tag: optional, a tag to check when loading, such as the ETag or server version of the constants
+    :type tag: str
+    """
+    consts = constants.systemConstants
+    strings = {}
+    names = array('I', (strings.setdefault(const.name, len(strings)) for const in consts))
+    owners = array('I', (strings.setdefault(const.originalOwner, len(strings)) for const in consts))
+    encoded = [string.encode('utf-8') for string in strings]
+    stringOffsets = array('I', [0])
+    for data in encoded:
+        stringOffsets.append(stringOffsets[-1] + len(data))
+    posx = array('d', (const.posx for const in consts))
+    posy = array('d', (const.posy for const in consts))
+
+    flags = 0
+    if all(type(const.posx) is int for const in consts):
+        flags |= _IntegralX
+    if all(type(const.posy) is int for const in consts):
+        flags |= _IntegralY
+    adjOffsets = array('q')
+    adjIndices = array('I')
+    radius = math.nan
+    if graph is not None:
+        flags |= _HasGraph
+        adjOffsets = array('q', (int(offset) for offset in graph.offsets))
+        adjIndices = array('I', (int(index) for index in graph.indices))
+        radius = graph.radius
+    bTag = tag.encode('utf-8')
+
+    sections = [bTag, _littleEndian(stringOffsets), b''.join(encoded), _littleEndian(names), _littleEndian(owners),
+                _littleEndian(posx), _littleEndian(posy), _littleEndian(adjOffsets), _littleEndian(adjIndices)]
+    str_tmp = f'{str_name}.{os.getpid()}.tmp'
+    with open(str_tmp, 'wb') as m_file:
+        m_file.write(_Header.pack(_Magic, SnapshotVersion, flags, len(consts), len(encoded), len(adjIndices), radius,
+                                  len(bTag)))
+        written = _Header.size
+        for data in sections:
+            padding = _aligned(written) - written
+            m_file.write(b'\0' * padding + data)
+            written += padding + len(data)
+    os.replace(str_tmp, str_name)
+
+
+class _Reader(object):
+
+    def __init__(self, buf, int_offset):
+        self.buf = buf
+        self.offset = int_offset
+
+    def take(self, int_size):
+        start = _aligned(self.offset)
+        self.offset = start + int_size
+        if self.offset > len(self.buf):
+            raise ValueError('truncated snapshot')
+        return start
+
+    def array(self, typecode, int_count):
+        """
+        :return: a numpy view of the file when numpy is installed, otherwise a copy in an :class:`array.array`
+        """
+        arr = array(typecode)
+        start = self.take(int_count * arr.itemsize)
+        if np is not None:
+            return np.frombuffer(self.buf, dtype=np.dtype(typecode).newbyteorder('<'), count=int_count, offset=start)
+        arr.frombytes(self.buf[start:self.offset])
+        if sys.byteorder == 'big':
+            arr.byteswap()
+        return arr
+
+
+def readSnapshotTag(str_name):
+    """
+    read only the tag of a snapshot, so it can be checked before the snapshot is loaded
+
+    :param str_name: the name of the file to read
+    :type str_name: str
+    :return: the tag the snapshot was saved with, None if the file is missing or of another format version
+    :rtype: str
+    """
+    try:
+        with open(str_name, 'rb') as m_file:
+            header = m_file.read(_Header.size)
+            magic, version, flags, count, stringCount, edgeCount, savedRadius, tagSize = _Header.unpack(header)
+            if magic != _Magic or version != SnapshotVersion:
+                return None
+            m_file.seek(_aligned(_Header.size))
+            data = m_file.read(tagSize)
+            if len(data) != tagSize:
+                return None
+            return data.decode('utf-8')
+    except (OSError, struct.error, UnicodeDecodeError):
+        return None
+
+
+def readConstantsSnapshot(str_name, cls, tag=None, radius=None):
+    """
+    load star map constants from a snapshot, the file is memory mapped and when numpy is installed the positions and
+    adjacency graph are used straight from the mapping
+
+    :param str_name: the name of the file to read
+    :type str_name: str
+    :param cls: the constants class to build
+    :param tag: optional, the tag the snapshot must have been saved with
+    :type tag: str
+    :param radius: optional, the adjacency radius the snapshot must have been saved with
+    :type radius: float
+    :return: the constants, their adjacency graph or None, and the saved tag, or None if the file is missing, of
+        another format version, or doesn't match `tag` or `radius`
+    :rtype: tuple[roguewarapi.data.StarMapConstants, NeighborGraph, str]
+    """
+    try:
+        with open(str_name, 'rb') as m_file:
+            buf = mmap.mmap(m_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        magic, version, flags, count, stringCount, edgeCount, savedRadius, tagSize = _Header.unpack_from(buf, 0)
+        if magic != _Magic or version != SnapshotVersion:
+            return None
+        reader = _Reader(buf, _Header.size)
+        start = reader.take(tagSize)
+        savedTag = buf[start:reader.offset].decode('utf-8')
+        if tag is not None and savedTag != tag:
+            return None
+        if radius is not None and (not flags & _HasGraph or savedRadius != radius):
+            return None
+
+        stringOffsets = reader.array('I', stringCount + 1)
+        start = reader.take(int(stringOffsets[-1]))
+        blob = buf[start:reader.offset]
+        strings = [blob[stringOffsets[i]:stringOffsets[i + 1]].decode('utf-8') for i in range(stringCount)]
+        names = reader.array('I', count).tolist()
+        owners = reader.array('I', count).tolist()
+        posx = reader.array('d', count)
+        posy = reader.array('d', count)
+        graph = None
+        if flags & _HasGraph:
+            adjOffsets = reader.array('q', count + 1)
+            adjIndices = reader.array('I', edgeCount)
+            graph = NeighborGraph([strings[name] for name in names], adjOffsets, adjIndices, savedRadius)
+    except (struct.error, ValueError, IndexError, UnicodeDecodeError):
+        return None
+
+    constants = cls()
+    constCls = cls._SubObjectMapping[0].SubClass
+    xs = posx.tolist()
+    ys = posy.tolist()
+    if flags & _IntegralX:
+        xs = [int(x) for x in xs]
+    if flags & _IntegralY:
+        ys = [int(y) for y in ys]
+    consts = constants.systemConstants
+    for node in range(count):
+        const = constCls()
+        const.name = strings[names[node]]
+        const.posx = xs[node]
+        const.posy = ys[node]
+        const.originalOwner = strings[owners[node]]
+        if graph is not None:
+            const._adjacent = graph.neighborNames(node)
+        consts.append(const)
+    constants._positions = (posx, posy)
+    return constants, graph, savedTag
@@ -0,0 +1,168 @@
+import math
+
+
+class SpatialGrid(object):
+    """
+    A uniform grid over a set of 2d points, bucketing each point into a square cell so that radius queries
+    only need to look at the handful of cells around the query point instead of every point on the map
+
+    Items are kept in insertion order and every query returns its results in that same order
+    """
+
+    def __init__(self, cellSize):
+        """
+        :param cellSize: the width of a grid cell, ideally the most common query radius
+        :type cellSize: float
+        """
+        if cellSize <= 0:
+            cellSize = 1.0
+        self.cellSize = float(cellSize)
+        self._cells = {}  # type: dict[tuple[int, int], list[int]]
+        self._posx = []  # type: list[float]
+        self._posy = []  # type: list[float]
+        self._items = []
+
+    def __len__(self):
+        return len(self._items)
+
+    @classmethod
+    def fromSystems(cls, systems, cellSize):
+        """
+        build a grid from a list of star system constants
+
+        :param systems: the systems to index
+        :type systems: list[roguewarapi.data.StarSystemConst]
+        :param cellSize: the width of a grid cell
+        :type cellSize: float
+        :return: a populated grid, items are the system objects themselves
+        :rtype: SpatialGrid
+        """
+        grid = cls(cellSize)
+        for system in systems:
+            grid.insert(system.posx, system.posy, system)
+        return grid
+
+    def _cellOf(self, pos):
+        return int(math.floor(pos / self.cellSize))
+
+    def insert(self, posx, posy, item=None):
+        """
+        add a point to the grid
+
+        :param posx: the x coordinate of the point
+        :type posx: float
+        :param posy: the y coordinate of the point
+        :type posy: float
+        :param item: optional, an object to associate with the point
+        :return: the index of the newly inserted point
+        :rtype: int
+        """
+        index = len(self._items)
+        self._posx.append(posx)
+        self._posy.append(posy)
+        self._items.append(item)
+        key = (self._cellOf(posx), self._cellOf(posy))
+        cell = self._cells.get(key)
+        if cell is None:
+            self._cells[key] = [index]
+        else:
+            cell.append(index)
+        return index
+
+    def position(self, index):
+        """
+        :param index: the index of a point
+        :type index: int
+        :return: the x and y coordinates of the point
+        :rtype: tuple[float, float]
+        """
+        return self._posx[index], self._posy[index]
+
+    def item(self, index):
+        """
+        :param index: the index of a point
+        :type index: int
+        :return: the object associated with the point
+        """
+        return self._items[index]
+
+    def candidates(self, posx, posy, radius):
+        """
+        get the index of every point whose cell overlaps the bounding box of a query circle, this is a superset of the
+        points within the radius
+
+        :param posx: the x coordinate of the query point
+        :type posx: float
+        :param posy: the y coordinate of the query point
+        :type posy: float
+        :param radius: the query radius
+        :type radius: float
+        :return: a sorted list of point indices
+        :rtype: list[int]
+        """
+        if radius < 0:
+            return []
+        # the cell bounds are derived from the same expressions used for the bounding box test, floor division is
+        # monotonic so no point that passes the box test can fall outside these cells
+        minCellX = self._cellOf(posx - radius)
+        maxCellX = self._cellOf(posx + radius)
+        minCellY = self._cellOf(posy - radius)
+        maxCellY = self._cellOf(posy + radius)
+        found = []
+        cells = self._cells
+        if (maxCellX - minCellX + 1) * (maxCellY - minCellY + 1) > len(cells):
+            for key, cell in cells.items():
+                if minCellX <= key[0] <= maxCellX and minCellY <= key[1] <= maxCellY:
+                    found.extend(cell)
+        else:
+            for cellX in range(minCellX, maxCellX + 1):
+                for cellY in range(minCellY, maxCellY + 1):
+                    cell = cells.get((cellX, cellY))
+                    if cell is not None:
+                        found.extend(cell)
+        found.sort()
+        return found
+
+    def queryRadiusIndices(self, posx, posy, radius):
+        """
+        find the index of every point within a radius of a position
+
+        :param posx: the x coordinate of the query point
+        :type posx: float
+        :param posy: the y coordinate of the query point
+        :type posy: float
+        :param radius: the query radius
+        :type radius: float
+        :return: a list of point indices in insertion order
+        :rtype: list[int]
+        """
+        allx = self._posx
+        ally = self._posy
+        minx = posx - radius
+        maxx = posx + radius
+        miny = posy - radius
+        maxy = posy + radius
+        found = []
+        for index in self.candidates(posx, posy, radius):
+            otherx = allx[index]
+            othery = ally[index]
+            if (minx <= otherx <= maxx) and (miny <= othery <= maxy):
+                if math.sqrt(pow(posx - otherx, 2) + pow(posy - othery, 2)) <= radius:
+                    found.append(index)
+        return found
+
+    def queryRadius(self, posx, posy, radius):
+        """
+        find every item within a radius of a position
+
+        :param posx: the x coordinate of the query point
+        :type posx: float
+        :param posy: the y coordinate of the query point
+        :type posy: float
+        :param radius: the query radius
+        :type radius: float
+        :return: a list of items in insertion order
+        :rtype: list
+        """
+        items = self._items
+        return [items[index] for index in self.queryRadiusIndices(posx, posy, radius)]
@@ -1,5 +1,9 @@
 from .basejsonobject import BaseDataObject, SubObjectMap
-from .starsystem import StarSystem
+from .starsystem import StarSystem, SlottedStarSystem, LazyStarSystem
+from .systemindex import SystemIndex
+from .factionstats import FactionStats
+from .starmapdelta import StarMapDelta, applySystemDelta, diffSystems
+from .territory import TerritoryGraph
 
 
 class StarMap(BaseDataObject):
@@ -12,7 +16,15 @@ class StarMap(BaseDataObject):
 
     def __init__(self):
         self._systems = [] # type: list[StarSystem]
+        self._index = SystemIndex('owner')
+        self._stats = None  # type: dict[str, FactionStats]
+        self._statsVersion = -1
+        self._territory = None  # type: tuple
 
+    def _fromJson(self, dct_json):
+        result = super()._fromJson(dct_json)
+        self._index.rebuild(self._systems)
+        return result
 
     @property
     def systems(self):
@@ -22,9 +34,223 @@ class StarMap(BaseDataObject):
         """
         return self._systems
 
+    def addSystem(self, system):
+        """
+        add a star system to the map, keeping the lookup tables up to date
+
+        :param system: the system to add
+        :type system: StarSystem
+        """
+        self._index.ensure(self._systems)
+        self._systems.append(system)
+        self._index.added(system)
+
+    def reindex(self):
+        """
+        rebuild the name and owner lookup tables and drop the cached faction totals, only needed after editing a
+        system's name, owner, `Players` or faction control in place
+        """
+        self._index.rebuild(self._systems)
+
+    def findSystem(self, name):
+        """
+        find a star system by its name
+
+        :param name: the name of the system
+        :type name: str
+        :return: the matching :class:`StarSystem <roguewarapi.data.StarSystem>`, None if not found
+        :rtype: StarSystem
+        """
+        return self._index.byName(self._systems, name)
+
     def findSystemsByOwner(self, owner):
-        systs = []
+        """
+        find all star systems held by a faction
+
+        :param owner: the owning faction
+        :type owner: str
+        :return: a list of :class:`StarSystem <roguewarapi.data.StarSystem>` objects, in map order
+        :rtype: list[StarSystem]
+        """
+        return self._index.byOwner(self._systems, owner)
+
+    def _computeStats(self):
+        self._index.ensure(self._systems)
+        if self._stats is not None and self._statsVersion == self._index.version:
+            return self._stats
+        stats = {}
         for system in self._systems:
-            if system.owner == owner:
-                systs.append(system)
-        return systs
\ No newline at end of file
+            owner = stats.get(system.owner)
+            if owner is None:
+                owner = stats[system.owner] = FactionStats(system.owner)
+            owner.systems += 1
+            owner.players += system.Players
+            contested = False
+            for fctCtl in system.availableFactions:
+                faction = stats.get(fctCtl.Name)
+                if faction is None:
+                    faction = stats[fctCtl.Name] = FactionStats(fctCtl.Name)
+                faction.activePlayers += fctCtl.ActivePlayers
+                if not contested and fctCtl.Name != system.owner and fctCtl.hasControl:
+                    contested = True
+            if contested:
+                owner.contestedSystems += 1
+        self._stats = stats
+        self._statsVersion = self._index.version
+        return stats
+
+    def factionStats(self, faction):
+        """
+        get the aggregated totals for a faction, all factions are totalled together in a single pass over the map the
+        first time this is called and the results are reused until systems are added or removed. Call :meth:`reindex`
+        after editing a system's owner, `Players` or faction control in place
+
+        :param faction: the faction
+        :type faction: str
+        :return: the faction's totals, all zero if the faction isn't present on the map
+        :rtype: FactionStats
+        """
+        stats = self._computeStats().get(faction)
+        if stats is None:
+            return FactionStats(faction)
+        return stats
+
+    def factionLeaderboard(self, sortBy='systems'):
+        """
+        get the totals of every faction present on the map, ranked highest first, these are cached in the same way as
+        :meth:`factionStats`
+
+        :param sortBy: the :class:`FactionStats <roguewarapi.data.FactionStats>` attribute to rank by
+        :type sortBy: str
+        :return: a list of :class:`FactionStats <roguewarapi.data.FactionStats>`
+        :rtype: list[FactionStats]
+        """
+        return sorted(self._computeStats().values(), key=lambda stats: getattr(stats, sortBy), reverse=True)
+
+    def joinConstants(self, constants):
+        """
+        pair every system on the map with its constants
+
+        :param constants: the starmap constants to join against
+        :type constants: roguewarapi.data.StarMapConstants
+        :return: a list of (`StarSystem`, `StarSystemConst`) tuples in map order, the constant is None for systems
+            that have no matching entry
+        :rtype: list[tuple[StarSystem, roguewarapi.data.StarSystemConst]]
+        """
+        findConst = constants.findSystem
+        return [(system, findConst(system.name)) for system in self._systems]
+
+    def territory(self, constants, radius=None):
+        """
+        get the faction territory of this map over the adjacency graph of its systems, the result is cached until the
+        map or the graph changes
+
+        :param constants: the starmap constants the graph is built from
+        :type constants: roguewarapi.data.StarMapConstants
+        :param radius: optional, the adjacency radius, by default the graph the constants were mapped with is used
+        :type radius: float
+        :return: the territory graph
+        :rtype: TerritoryGraph
+        """
+        graph = constants.adjacencyGraph if radius is None else constants.neighborGraph(radius)
+        if graph is None:
+            raise ValueError('the constants have no adjacency mapped, pass a radius')
+        self._index.ensure(self._systems)
+        cached = self._territory
+        if cached is not None and cached[0] is graph and cached[1] == self._index.version:
+            return cached[2]
+        territory = TerritoryGraph(graph, self)
+        self._territory = (graph, self._index.version, territory)
+        return territory
+
+    def diff(self, other):
+        """
+        work out what changed between this map and a newer one, systems are matched by name so the cost is linear in
+        the size of the maps
+
+        :param other: the newer map
+        :type other: StarMap
+        :return: the changes, applying them to this map with :meth:`apply` makes it equal to `other`
+        :rtype: StarMapDelta
+        """
+        delta = StarMapDelta()
+        findOld = self.findSystem
+        for system in other._systems:
+            old = findOld(system.name)
+            if old is None:
+                delta._added.append(system)
+            else:
+                change = diffSystems(old, system)
+                if change is not None:
+                    delta._changed.append(change)
+        newNames = set(system.name for system in other._systems)
+        delta.removed = [system.name for system in self._systems if system.name not in newNames]
+        # apply keeps the remaining systems in place and appends new ones, the full order is only needed if that
+        # doesn't reproduce the new map's order
+        order = [system.name for system in other._systems]
+        expected = [system.name for system in self._systems if system.name in newNames]
+        expected.extend(system.name for system in delta._added)
+        if order != expected:
+            delta.order = order
+        return delta
+
+    def apply(self, delta):
+        """
+        apply the changes made by :meth:`diff` to this map in place
+
+        :param delta: the changes
+        :type delta: StarMapDelta
+        :raises ValueError: if a changed system isn't on this map
+        """
+        systemCls = self._SubObjectMapping[0].SubClass
+        controlCls = systemCls._SubObjectMapping[0].SubClass
+        if delta.removed:
+            removed = set(delta.removed)
+            self._systems[:] = [system for system in self._systems if system.name not in removed]
+        findSystem = self.findSystem
+        for change in delta.changedSystems:
+            system = findSystem(change.name)
+            if system is None:
+                raise ValueError(f'{change.name} is not on the map')
+            applySystemDelta(system, change, controlCls)
+        for added in delta.addedSystems:
+            system = systemCls()
+            system._fromJson(added._toJson())
+            self._systems.append(system)
+        if delta.order is not None:
+            byName = {}
+            for system in self._systems:
+                byName.setdefault(system.name, system)
+            self._systems[:] = [byName[name] for name in delta.order]
+        self.reindex()
+
+
+class SlottedStarMap(StarMap):
+
+    """
+    A :class:`StarMap` made of :class:`SlottedStarSystem <roguewarapi.data.SlottedStarSystem>` objects, which take
+    considerably less memory when many maps are kept around
+    """
+
+    _SubObjectMapping = [
+        SubObjectMap(SlottedStarSystem, "_systems", "starsystems")
+    ]
+
+
+class LazyStarMap(StarMap):
+
+    """
+    A :class:`StarMap` made of :class:`LazyStarSystem <roguewarapi.data.LazyStarSystem>` objects, reading one only
+    decodes the names and owners of its systems, everything else is decoded as it is used
+    """
+
+    _SubObjectMapping = [
+        SubObjectMap(LazyStarSystem, "_systems", "starsystems")
+    ]
+
+    def _fromJson(self, dct_json):
+        item = self._SubObjectMapping[0]
+        fromRaw = item.SubClass._fromRaw
+        self._systems = [fromRaw(tag) for tag in dct_json.get(item.JsonContainer) or ()]
+        self._index.rebuild(self._systems)
+        return True
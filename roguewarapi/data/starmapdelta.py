@@ -0,0 +1,232 @@
+from .basejsonobject import BaseDataObject, SubObjectMap
+from .starsystem import StarSystem
+
+
+# the members a delta may change, anything else named in a delta read from json is ignored
+_SystemMembers = ('owner', 'Players', 'markerType', 'immuneFromWar')
+_ControlMembers = ('control', 'ActivePlayers')
+
+
+def _numeric(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class ControlDelta(BaseDataObject):
+    """
+    The change to a single faction's control entry on a system, only the members named in :attr:`changed` hold new
+    values, the others are None
+    """
+
+    JSON_Type = "ControlDelta"
+
+    def __init__(self):
+        self.Name = ""  #: the faction
+        self.occurrence = None  #: which entry of the faction this is when a system lists it more than once, None for the first
+        self.changed = []  #: the names of the members that changed, as a new value may itself be None
+        self.control = None  #: the new control
+        self.controlDelta = None  #: the change in control, None if unchanged or either value isn't a number
+        self.ActivePlayers = None  #: the new number of active players
+
+
+class SystemDelta(BaseDataObject):
+    """
+    The changes to a single star system between two maps, only the members named in :attr:`changed` hold new values,
+    the others are None
+    """
+
+    JSON_Type = "SystemDelta"
+
+    _SubObjectMapping = [
+        SubObjectMap(ControlDelta, "_controls", "factions")
+    ]
+
+    def __init__(self):
+        self.name = ""  #: the system
+        self.changed = []  #: the names of the members that changed, as a new value may itself be None
+        self.owner = None  #: the new owner
+        self.previousOwner = None  #: the owner before the change
+        self.Players = None  #: the new number of players
+        self.markerType = None  #: the new marker bits
+        self.immuneFromWar = None  #: the new immunity
+        self.factionOrder = None  #: the names of the system's factions, only set when factions were added, removed or reordered
+        self._controls = []  # type: list[ControlDelta]
+
+    @property
+    def controlChanges(self):
+        """
+        :return: the changed and added faction control entries
+        :rtype: list[ControlDelta]
+        """
+        return self._controls
+
+    @property
+    def isOwnershipFlip(self):
+        """
+        :rtype: bool
+        """
+        return 'owner' in self.changed
+
+
+class StarMapDelta(BaseDataObject):
+    """
+    The changes between two :class:`StarMap <roguewarapi.data.StarMap>` snapshots, made by
+    :meth:`StarMap.diff <roguewarapi.data.StarMap.diff>` and applied with
+    :meth:`StarMap.apply <roguewarapi.data.StarMap.apply>`
+    """
+
+    JSON_Type = "StarMapDelta"
+
+    _SubObjectMapping = [
+        SubObjectMap(SystemDelta, "_changed", "changed"),
+        SubObjectMap(StarSystem, "_added", "added"),
+    ]
+
+    def __init__(self):
+        self.removed = []  #: the names of the systems no longer on the map
+        self.order = None  #: the names of every system on the new map, only set when the systems were reordered
+        self._changed = []  # type: list[SystemDelta]
+        self._added = []  # type: list[StarSystem]
+
+    def __len__(self):
+        return len(self._changed) + len(self._added) + len(self.removed)
+
+    @property
+    def isEmpty(self):
+        """
+        :return: True if the maps were the same
+        :rtype: bool
+        """
+        return not len(self) and self.order is None
+
+    @property
+    def changedSystems(self):
+        """
+        :rtype: list[SystemDelta]
+        """
+        return self._changed
+
+    @property
+    def addedSystems(self):
+        """
+        :rtype: list[StarSystem]
+        """
+        return self._added
+
+    @property
+    def ownershipFlips(self):
+        """
+        :return: a (system, previous owner, new owner) tuple for every system that changed hands
+        :rtype: list[tuple[str, str, str]]
+        """
+        return [(change.name, change.previousOwner, change.owner) for change in self._changed if change.isOwnershipFlip]
+
+
+def _controlsByKey(controls):
+    """
+    :return: the faction control entries keyed by (name, occurrence), so a faction listed twice is still matched up
+    :rtype: dict[tuple[str, int], FactionControl]
+    """
+    byKey = {}
+    seen = {}
+    for fctCtl in controls:
+        occurrence = seen.get(fctCtl.Name, 0)
+        seen[fctCtl.Name] = occurrence + 1
+        byKey[(fctCtl.Name, occurrence)] = fctCtl
+    return byKey
+
+
+def diffSystems(old, new):
+    """
+    :param old: the system before
+    :type old: StarSystem
+    :param new: the system after
+    :type new: StarSystem
+    :return: the changes, None if the systems are the same
+    :rtype: SystemDelta
+    """
+    change = None
+    if old.owner != new.owner:
+        change = SystemDelta()
+        change.owner = new.owner
+        change.previousOwner = old.owner
+        change.changed.append('owner')
+    for str_member in _SystemMembers[1:]:
+        value = getattr(new, str_member)
+        if getattr(old, str_member) != value:
+            if change is None:
+                change = SystemDelta()
+            setattr(change, str_member, value)
+            change.changed.append(str_member)
+
+    oldControls = _controlsByKey(old.availableFactions)
+    controls = []
+    for key, fctCtl in _controlsByKey(new.availableFactions).items():
+        before = oldControls.get(key)
+        if before is None:
+            control = ControlDelta()
+            control.control = fctCtl.control
+            control.ActivePlayers = fctCtl.ActivePlayers
+            control.changed = list(_ControlMembers)
+        elif before.control != fctCtl.control or before.ActivePlayers != fctCtl.ActivePlayers:
+            control = ControlDelta()
+            if before.control != fctCtl.control:
+                control.control = fctCtl.control
+                control.changed.append('control')
+                if _numeric(before.control) and _numeric(fctCtl.control):
+                    control.controlDelta = fctCtl.control - before.control
+            if before.ActivePlayers != fctCtl.ActivePlayers:
+                control.ActivePlayers = fctCtl.ActivePlayers
+                control.changed.append('ActivePlayers')
+        else:
+            continue
+        control.Name = fctCtl.Name
+        if key[1]:
+            control.occurrence = key[1]
+        controls.append(control)
+    order = [fctCtl.Name for fctCtl in new.availableFactions]
+    reordered = order != [fctCtl.Name for fctCtl in old.availableFactions]
+
+    if controls or reordered:
+        if change is None:
+            change = SystemDelta()
+        change._controls = controls
+        if reordered:
+            change.factionOrder = order
+    if change is not None:
+        change.name = new.name
+    return change
+
+
+def applySystemDelta(system, change, controlCls):
+    """
+    apply the changes to a system in place
+
+    :param system: the system to change
+    :type system: StarSystem
+    :param change: the changes
+    :type change: SystemDelta
+    :param controlCls: the faction control class of the system
+    """
+    for str_member in change.changed:
+        if str_member in _SystemMembers:
+            setattr(system, str_member, getattr(change, str_member))
+    controls = system.availableFactions
+    byKey = _controlsByKey(controls)
+    for control in change.controlChanges:
+        key = (control.Name, control.occurrence or 0)
+        fctCtl = byKey.get(key)
+        if fctCtl is None:
+            fctCtl = byKey[key] = controlCls()
+            fctCtl.Name = control.Name
+            controls.append(fctCtl)
+        for str_member in control.changed:
+            if str_member in _ControlMembers:
+                setattr(fctCtl, str_member, getattr(control, str_member))
+    if change.factionOrder is not None:
+        seen = {}
+        ordered = []
+        for name in change.factionOrder:
+            occurrence = seen.get(name, 0)
+            seen[name] = occurrence + 1
+            ordered.append(byKey[(name, occurrence)])
+        controls[:] = ordered
@@ -1,17 +1,23 @@
 from .basejsonobject import BaseDataObject, SubObjectMap
-from .factioncontrol import FactionControl
+from .factioncontrol import FactionControl, SlottedFactionControl
+from .kfactions import kFactions
 
 
-class StarSystem(BaseDataObject):
+class StarSystemBase(BaseDataObject):
+
+    """
+    The behaviour shared by :class:`StarSystem` and :class:`SlottedStarSystem`, which only differ in how they store
+    their members and which faction control class they are made of
+    """
+
+    __slots__ = ()
 
     JSON_Type = "StarSystem"
 
-    _SubObjectMapping = [
-        SubObjectMap(FactionControl, "_fctCtl", "factions")
-    ]
+    _CanonicalMemebers = {'owner': kFactions.canonical}
 
     def __init__(self):
-        self.Players = 0,  #: the number of active players in the system
+        self.Players = 0  #: the number of active players in the system
         self._fctCtl = []
         self.immuneFromWar = False  #: if this system is immune from war missions
         self.markerType = 0  #: a bitfield, non-zero values indicate an event is taking place here
@@ -26,4 +32,101 @@ class StarSystem(BaseDataObject):
         :return: a list of :class:`FactionControl <roguewarapi.data.FactionControl>`
         :rtype: list[FactionControl]
         """
-        return self._fctCtl
\ No newline at end of file
+        return self._fctCtl
+
+    @property
+    def isContested(self):
+        """
+        a system is contested when a faction other than its owner holds control in it
+
+        :rtype: bool
+        """
+        for fctCtl in self._fctCtl:
+            if fctCtl.Name != self.owner and fctCtl.hasControl:
+                return True
+        return False
+
+
+class StarSystem(StarSystemBase):
+
+    _SubObjectMapping = [
+        SubObjectMap(FactionControl, "_fctCtl", "factions")
+    ]
+
+
+class SlottedStarSystem(StarSystemBase):
+
+    """
+    A :class:`StarSystem` that stores its members in ``__slots__`` instead of an instance dictionary, its factions are
+    :class:`SlottedFactionControl <roguewarapi.data.SlottedFactionControl>` objects
+    """
+
+    __slots__ = ('Players', '_fctCtl', 'immuneFromWar', 'markerType', 'name', 'owner')
+
+    _SubObjectMapping = [
+        SubObjectMap(SlottedFactionControl, "_fctCtl", "factions")
+    ]
+
+
+class LazyStarSystem(StarSystem):
+
+    """
+    A :class:`StarSystem` that keeps the json it was read from and decodes each member, its factions included, the
+    first time it is read. The name and owner are decoded straight away, as the map's lookup tables need them, so
+    systems that are only asked for those never build their
+    :class:`FactionControl <roguewarapi.data.FactionControl>` objects
+
+    Members that are set are kept like those of any other system. The json is held for as long as the system is, and
+    mustn't be changed after it has been read
+    """
+
+    _Defaults = {'Players': 0, 'immuneFromWar': False, 'markerType': 0, 'name': '', 'owner': ''}
+
+    def __init__(self):
+        # no members are set, so reading one falls through to __getattr__ and is decoded from the json
+        self._raw = {}
+
+    def __getattr__(self, name):
+        if name == '_fctCtl':
+            item = self._SubObjectMapping[0]
+            value = []
+            for tag in self._raw.get(item.JsonContainer) or ():
+                fctCtl = item.SubClass()
+                fctCtl._fromJson(tag)
+                value.append(fctCtl)
+        elif name in self._Defaults:
+            value = self._raw.get(name, self._Defaults[name])
+        else:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        setattr(self, name, value)
+        return value
+
+    def _getMemberSchema(self):
+        # members are only set once they are read, so inspecting a lazy system would miss them, it has the same members
+        # as an eager one
+        schema = StarSystem.__dict__.get('_memberSchema')
+        if schema is None:
+            schema = StarSystem()._getMemberSchema()
+        return schema
+
+    @classmethod
+    def _fromRaw(cls, dct_json):
+        """
+        make a system from its json, the same as reading the json into a new system but without the calls
+        """
+        system = cls.__new__(cls)
+        system._raw = dct_json
+        system.name = dct_json.get('name', '')
+        system.owner = kFactions.canonical(dct_json.get('owner', ''))
+        return system
+
+    def _fromJson(self, dct_json):
+        for name in ('_fctCtl', *self._Defaults):
+            try:
+                delattr(self, name)
+            except AttributeError:
+                pass
+        self._raw = dct_json
+        self.name = dct_json.get('name', '')
+        self.owner = kFactions.canonical(dct_json.get('owner', ''))
+        return True
@@ -1,7 +1,20 @@
+from array import array
+
 from .basejsonobject import BaseDataObject, SubObjectMap
-import math
+from .spatialindex import SpatialGrid
+from .neighborgraph import NeighborGraph, buildNeighborGraph, filterNeighborGraph, np
+from .systemindex import SystemIndex
+from .snapshot import readConstantsSnapshot, writeConstantsSnapshot
+
+
+class StarSystemConstBase(BaseDataObject):
 
-class StarSystemConst(BaseDataObject):
+    """
+    The behaviour shared by :class:`StarSystemConst` and :class:`SlottedStarSystemConst`, which only differ in how they
+    store their members
+    """
+
+    __slots__ = ()
 
     JSON_Type = 'StarSystemConst'
 
@@ -21,6 +34,35 @@ class StarSystemConst(BaseDataObject):
         """
         return self._adjacent
 
+    def copy(self):
+        """
+        :return: a copy of this system with its own adjacency list
+        :rtype: StarSystemConstBase
+        """
+        const = type(self)()
+        const.name = self.name
+        const.posx = self.posx
+        const.posy = self.posy
+        const.originalOwner = self.originalOwner
+        const._adjacent = list(self._adjacent)
+        return const
+
+
+class StarSystemConst(StarSystemConstBase):
+
+    """
+    The fixed details of a star system: its position, original owner and the systems adjacent to it
+    """
+
+
+class SlottedStarSystemConst(StarSystemConstBase):
+
+    """
+    A :class:`StarSystemConst` that stores its members in ``__slots__`` instead of an instance dictionary
+    """
+
+    __slots__ = ('name', 'posx', 'posy', 'originalOwner', '_adjacent')
+
 
 class StarMapConstants(BaseDataObject):
 
@@ -30,8 +72,16 @@ class StarMapConstants(BaseDataObject):
         SubObjectMap(StarSystemConst, '_consts', 'Coordinates')
     ]
 
+    _DefaultGridCellSize = 50
+
     def __init__(self):
         self._consts = [] # type: list[StarSystemConst]
+        self._grid = None # type: SpatialGrid
+        self._positions = None
+        self._index = SystemIndex('originalOwner')
+        self._adjacencyGraph = None  # type: NeighborGraph
+        self._graphs = {}  # type: dict[float, NeighborGraph]
+        self._snapshotTag = None  # type: str
 
     @property
     def systemConstants(self):
@@ -42,19 +92,200 @@ class StarMapConstants(BaseDataObject):
         """
         return self._consts
 
-    def mapAdjacents(self, maxDistance):
+    @property
+    def adjacencyGraph(self):
+        """
+        the graph the adjacency lists were last mapped from, None if they haven't been mapped
+
+        :rtype: NeighborGraph
+        """
+        return self._adjacencyGraph
+
+    @property
+    def snapshotTag(self):
+        """
+        the tag of the snapshot these constants were loaded from, None if they weren't loaded from a snapshot
+
+        :rtype: str
+        """
+        return self._snapshotTag
+
+    def _fromJson(self, dct_json):
+        self._grid = None
+        self._positions = None
+        self._adjacencyGraph = None
+        self._graphs = {}
+        self._snapshotTag = None
+        result = super()._fromJson(dct_json)
+        self._index.rebuild(self._consts)
+        return result
+
+    def addSystem(self, const):
+        """
+        add a star system constant, keeping the lookup tables up to date
+
+        :param const: the system to add
+        :type const: StarSystemConst
+        """
+        self._index.ensure(self._consts)
+        self._consts.append(const)
+        self._index.added(const)
+
+    def reindex(self):
+        """
+        rebuild the name and owner lookup tables, only needed after editing a system's name or original owner in place
+        """
+        self._index.rebuild(self._consts)
+
+    def positionArrays(self):
+        """
+        get the coordinates of every system as two contiguous float arrays, in the same order as :attr:`systemConstants`
+
+        :return: the x and y arrays, numpy float64 arrays when numpy is installed, otherwise :class:`array.array`
+        :rtype: tuple
+        """
+        if self._positions is None or len(self._positions[0]) != len(self._consts):
+            posx = array('d', (const.posx for const in self._consts))
+            posy = array('d', (const.posy for const in self._consts))
+            if np is not None:
+                posx = np.frombuffer(posx, dtype=np.float64)
+                posy = np.frombuffer(posy, dtype=np.float64)
+            self._positions = (posx, posy)
+        return self._positions
+
+    def neighborGraph(self, maxDistance, useNumpy=None):
+        """
+        compute a compact adjacency graph of all systems without touching the per-system adjacency lists
+
+        graphs are cached per radius, and a graph for a radius smaller than one already cached is filtered from the
+        larger graph rather than built from scratch
+
+        :param maxDistance: the maximum distance to consider as adjacent
+        :type maxDistance: float
+        :param useNumpy: optional, force the numpy (True) or pure python (False) backend, by default numpy is used when
+            it is installed
+        :type useNumpy: bool
+        :return: a graph whose node ids are the positions of the systems in :attr:`systemConstants`
+        :rtype: NeighborGraph
+        """
+        if self._graphs and len(next(iter(self._graphs.values()))) != len(self._consts):
+            self._graphs = {}
+        graph = self._graphs.get(maxDistance)
+        if graph is not None:
+            return graph
+        posx, posy = self.positionArrays()
+        wider = [radius for radius in self._graphs if radius > maxDistance]
+        if wider:
+            graph = filterNeighborGraph(self._graphs[min(wider)], posx, posy, maxDistance, useNumpy=useNumpy)
+        else:
+            graph = buildNeighborGraph([const.name for const in self._consts], posx, posy, maxDistance, useNumpy=useNumpy)
+        self._graphs[maxDistance] = graph
+        return graph
+
+    def clearGraphCache(self):
+        """
+        drop every cached adjacency graph, along with the position arrays and spatial grid they are built from, only
+        needed after moving a system in place
+        """
+        self._graphs = {}
+        self._positions = None
+        self._grid = None
+
+    def spatialIndex(self, cellSize=None):
+        """
+        get a spatial grid over the positions of all systems, the grid is cached and reused for later calls
+
+        :param cellSize: optional, the cell size of the grid, a new grid is only built when this differs from the cached one
+        :type cellSize: float
+        :return: a grid whose items are the `StarSystemConst` objects
+        :rtype: SpatialGrid
         """
-        recalculate starsystem adjacency
+        if cellSize is None:
+            cellSize = self._DefaultGridCellSize if self._grid is None else self._grid.cellSize
+        if self._grid is None or self._grid.cellSize != float(cellSize) or len(self._grid) != len(self._consts):
+            self._grid = SpatialGrid.fromSystems(self._consts, cellSize)
+        return self._grid
+
+    def findSystemsInRadius(self, posx, posy, radius):
+        """
+        find all systems within a radius of a position
+
+        :param posx: the x coordinate of the position
+        :type posx: float
+        :param posy: the y coordinate of the position
+        :type posy: float
+        :param radius: the search radius
+        :type radius: float
+        :return: a list of `StarSystemConst` in the order they appear in :attr:`systemConstants`
+        :rtype: list[StarSystemConst]
+        """
+        return self.spatialIndex().queryRadius(posx, posy, radius)
+
+    def copy(self):
+        """
+        copy the constants, each system is copied so the copy can be remapped without changing the adjacency lists of
+        these constants, the positions and cached graphs are shared
+
+        :rtype: StarMapConstants
+        """
+        constants = type(self)()
+        constants._consts = [const.copy() for const in self._consts]
+        constants._positions = self._positions
+        constants._adjacencyGraph = self._adjacencyGraph
+        constants._graphs = dict(self._graphs)
+        constants._snapshotTag = self._snapshotTag
+        constants._index.rebuild(constants._consts)
+        return constants
+
+    def mapAdjacents(self, maxDistance, useNumpy=None):
+        """
+        recalculate starsystem adjacency, replacing the adjacency lists of every system in place, to remap constants
+        that are in use elsewhere map a :meth:`copy` instead
         :param maxDistance: the maximum distance to consider as adjacent
         :type maxDistance: float
+        :param useNumpy: optional, force the numpy (True) or pure python (False) backend, by default numpy is used when
+            it is installed
+        :type useNumpy: bool
+        """
+        graph = self.neighborGraph(maxDistance, useNumpy=useNumpy)
+        for node, const in enumerate(self._consts):
+            const.adjacentSystems[:] = graph.neighborNames(node)
+        self._adjacencyGraph = graph
+
+    def toSnapshot(self, str_name, tag=''):
+        """
+        write a compact binary snapshot of the constants and their adjacency graph, if they have been mapped, that
+        :meth:`fromSnapshot` can load much faster than the json
+
+        :param str_name: the name of the file to write
+        :type str_name: str
+        :param tag: optional, a tag to check when loading, such as the ETag or server version of the constants
+        :type tag: str
         """
-        for const in self._consts:
+        writeConstantsSnapshot(self, str_name, graph=self._adjacencyGraph, tag=tag)
 
-            for other in self._consts:
-                if other.name != const.name:
-                    if (const.posx - maxDistance <= other.posx <= const.posx + maxDistance) and (const.posy - maxDistance <= other.posy <= const.posy + maxDistance):
-                        if math.sqrt(pow(const.posx - other.posx, 2) + pow(const.posy - other.posy, 2)) <= maxDistance:
-                            const.adjacentSystems.append(other.name)
+    @classmethod
+    def fromSnapshot(cls, str_name, tag=None, radius=None):
+        """
+        load constants from a snapshot written by :meth:`toSnapshot`
+
+        :param str_name: the name of the file to read
+        :type str_name: str
+        :param tag: optional, the tag the snapshot must have been written with
+        :type tag: str
+        :param radius: optional, the adjacency radius the snapshot must have been mapped with
+        :type radius: float
+        :return: the constants, None if the file is missing, out of date or doesn't match `tag` or `radius`
+        :rtype: StarMapConstants
+        """
+        loaded = readConstantsSnapshot(str_name, cls, tag=tag, radius=radius)
+        if loaded is None:
+            return None
+        constants, constants._adjacencyGraph, constants._snapshotTag = loaded
+        if constants._adjacencyGraph is not None:
+            constants._graphs[constants._adjacencyGraph.radius] = constants._adjacencyGraph
+        constants._index.rebuild(constants._consts)
+        return constants
 
     def findSystem(self, system):
         """
@@ -65,6 +296,26 @@ class StarMapConstants(BaseDataObject):
         :return: a `StarSystemConst` object for the matching system, None if not found
         :rtype: StarSystemConst
         """
-        for const in self._consts:
-            if system == const.name:
-                return const
\ No newline at end of file
+        return self._index.byName(self._consts, system)
+
+    def findSystemsByOriginalOwner(self, owner):
+        """
+        find all star systems originally held by a faction
+
+        :param owner: the original owner
+        :type owner: str
+        :return: a list of `StarSystemConst`, in the order they appear in :attr:`systemConstants`
+        :rtype: list[StarSystemConst]
+        """
+        return self._index.byOwner(self._consts, owner)
+
+
+class SlottedStarMapConstants(StarMapConstants):
+
+    """
+    A :class:`StarMapConstants` made of :class:`SlottedStarSystemConst` objects
+    """
+
+    _SubObjectMapping = [
+        SubObjectMap(SlottedStarSystemConst, '_consts', 'Coordinates')
+    ]
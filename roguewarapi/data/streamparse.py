@@ -0,0 +1,270 @@
+import codecs
+import collections
+import json
+
+from .starsystem import StarSystem
+
+
+class _Starved(Exception):
+    """
+    Raised by a :class:`_ChunkFeed` that needs a chunk which hasn't been fed yet
+    """
+
+
+class _ChunkFeed(object):
+    """
+    The chunks of a document fed in as they are received, so a document received asynchronously can be parsed by the
+    same code as any other. Reading past the chunks fed so far raises :class:`_Starved` until the feed is closed
+    """
+
+    def __init__(self):
+        self._chunks = collections.deque()
+        self.closed = False
+
+    def feed(self, chunk):
+        self._chunks.append(chunk)
+
+    def close(self):
+        self.closed = True
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._chunks:
+            return self._chunks.popleft()
+        if self.closed:
+            raise StopIteration
+        raise _Starved()
+
+
+class _JsonStream(object):
+    """
+    A text buffer over an iterable of byte or string chunks that only holds the part of the document still being
+    parsed
+
+    An operation that runs out of chunks raises whatever the iterable raised, having consumed nothing, so it can be
+    tried again once there is more of the document
+    """
+
+    _CompactAt = 1 << 16
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self._json = json.JSONDecoder()
+        self._wanted = 0
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fetch(self):
+        """
+        append the next chunk to the buffer
+
+        :return: False once the input is exhausted
+        :rtype: bool
+        """
+        if self.eof:
+            return False
+        if self.pos >= self._CompactAt:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            if isinstance(chunk, bytes):
+                chunk = self._decoder.decode(chunk)
+            if chunk:
+                self.buf += chunk
+                return True
+        self.buf += self._decoder.decode(b'', final=True)
+        self.eof = True
+        return True
+
+    def peek(self):
+        """
+        skip whitespace and return the next character without consuming it
+
+        :return: the next character, None at the end of the input
+        :rtype: str
+        """
+        while True:
+            buf = self.buf
+            pos = self.pos
+            length = len(buf)
+            while pos < length and buf[pos] in ' \t\n\r':
+                pos += 1
+            self.pos = pos
+            if pos < length:
+                return buf[pos]
+            if not self._fetch():
+                return None
+
+    def expect(self, str_char):
+        if self.peek() != str_char:
+            raise ValueError(f'expected {str_char!r} at offset {self.pos} of the json stream')
+        self.pos += 1
+
+    def value(self):
+        """
+        decode the next complete json value
+
+        :return: the decoded value
+        """
+        self.peek()
+        while True:
+            if len(self.buf) - self.pos >= self._wanted or self.eof:
+                try:
+                    value, end = self._json.raw_decode(self.buf, self.pos)
+                    # a number at the very end of the buffer, or cut off before its fraction or exponent, such as
+                    # '2.' or '1e', may continue in the next chunk
+                    if self.eof or (end < len(self.buf) and self.buf[end] not in '.eE'):
+                        self.pos = end
+                        self._wanted = 0
+                        return value
+                except json.JSONDecodeError:
+                    if self.eof:
+                        raise
+                # grow the buffer geometrically before trying again so a large value isn't re-scanned per chunk
+                self._wanted = 2 * (len(self.buf) - self.pos)
+            self._fetch()
+
+
+_Start, _Members, _Colon, _Member, _Items, _Done = range(6)
+_End = object()
+
+
+class _ArrayReader(object):
+    """
+    Reads the elements of an array held by a key of a top level json object one at a time. The reader only moves on
+    to its next step once the current one has completed, so a step interrupted by the stream running out of chunks is
+    simply started again
+    """
+
+    def __init__(self, stream, str_key):
+        self._stream = stream
+        self._key = str_key
+        self._state = _Start
+        self._inObject = False
+        self._member = None
+
+    def read(self):
+        """
+        :return: the next element, `_End` once there are no more
+        """
+        stream = self._stream
+        while True:
+            state = self._state
+            if state == _Items:
+                char = stream.peek()
+                if char == ']':
+                    stream.pos += 1
+                    self._state = _Members if self._inObject else _Done
+                elif char == ',':
+                    stream.pos += 1
+                elif char is None:
+                    raise ValueError('unexpected end of the json stream')
+                else:
+                    return stream.value()
+            elif state == _Members:
+                char = stream.peek()
+                if char == '}':
+                    self._state = _Done
+                elif char == ',':
+                    stream.pos += 1
+                else:
+                    self._member = stream.value()
+                    self._state = _Colon
+            elif state == _Colon:
+                stream.expect(':')
+                self._state = _Member
+            elif state == _Member:
+                if self._member == self._key and stream.peek() == '[':
+                    stream.pos += 1
+                    self._state = _Items
+                else:
+                    stream.value()
+                    self._state = _Members
+            elif state == _Start:
+                # if the document is itself an array its elements are read instead
+                if stream.peek() == '[':
+                    stream.pos += 1
+                    self._state = _Items
+                else:
+                    stream.expect('{')
+                    self._inObject = True
+                    self._state = _Members
+            else:
+                return _End
+
+
+def iterJsonArray(chunks, str_key):
+    """
+    incrementally decode the elements of an array held by a key of a top level json object, each element is yielded as
+    soon as it has been received and nothing before it is kept in memory
+
+    :param chunks: the json document as an iterable of byte or string chunks, such as ``response.iter_content()``
+    :param str_key: the key of the array, if the document is itself an array its elements are yielded instead
+    :type str_key: str
+    :return: a generator of decoded elements
+    """
+    reader = _ArrayReader(_JsonStream(chunks), str_key)
+    while True:
+        value = reader.read()
+        if value is _End:
+            return
+        yield value
+
+
+async def aiterJsonArray(chunks, str_key):
+    """
+    the asynchronous counterpart of :func:`iterJsonArray`
+
+    :param chunks: the json document as an async iterable of byte or string chunks, such as
+        ``response.content.iter_chunked(65536)``
+    :param str_key: the key of the array, if the document is itself an array its elements are yielded instead
+    :type str_key: str
+    :return: an async generator of decoded elements
+    """
+    feed = _ChunkFeed()
+    reader = _ArrayReader(_JsonStream(feed), str_key)
+    chunks = chunks.__aiter__()
+    while True:
+        try:
+            value = reader.read()
+        except _Starved:
+            try:
+                feed.feed(await chunks.__anext__())
+            except StopAsyncIteration:
+                feed.close()
+            continue
+        if value is _End:
+            return
+        yield value
+
+
+def iterStarSystems(chunks, cls=StarSystem):
+    """
+    incrementally parse the star systems of a `getmap` payload, yielding each one as soon as it has been received
+
+    :param chunks: the json document as an iterable of byte or string chunks
+    :param cls: optional, the star system class to build, such as :class:`SlottedStarSystem <roguewarapi.data.SlottedStarSystem>`
+    :return: a generator of :class:`StarSystem <roguewarapi.data.StarSystem>` objects in map order
+    """
+    for dct_json in iterJsonArray(chunks, 'starsystems'):
+        system = cls()
+        system._fromJson(dct_json)
+        yield system
+
+
+async def aiterStarSystems(chunks, cls=StarSystem):
+    """
+    the asynchronous counterpart of :func:`iterStarSystems`
+
+    :param chunks: the json document as an async iterable of byte or string chunks
+    :param cls: optional, the star system class to build
+    :return: an async generator of :class:`StarSystem <roguewarapi.data.StarSystem>` objects in map order
+    """
+    async for dct_json in aiterJsonArray(chunks, 'starsystems'):
+        system = cls()
+        system._fromJson(dct_json)
+        yield system
@@ -0,0 +1,98 @@
+class SystemIndex(object):
+    """
+    Name and owner lookup tables over a list of star system objects
+
+    The index remembers which list it was built from and how long it was, so a list that has been replaced or grown
+    and shrunk is picked up and re-indexed automatically. Edits that keep the list the same length, such as replacing
+    an entry in place or changing a system's owner, need an explicit :meth:`rebuild`
+    """
+
+    def __init__(self, ownerAttr):
+        """
+        :param ownerAttr: the attribute of each system to index as its owner
+        :type ownerAttr: str
+        """
+        self._ownerAttr = ownerAttr
+        self._items = None  # type: list
+        self._count = -1
+        self._byName = {}  # type: dict[str, object]
+        self._byOwner = {}  # type: dict[str, list]
+        self.version = 0  #: incremented every time the indexed contents change
+
+    def rebuild(self, items):
+        """
+        index every system in a list
+
+        :param items: the systems to index
+        :type items: list
+        """
+        byName = {}
+        byOwner = {}
+        ownerAttr = self._ownerAttr
+        for item in items:
+            byName.setdefault(item.name, item)
+            owner = getattr(item, ownerAttr)
+            owned = byOwner.get(owner)
+            if owned is None:
+                byOwner[owner] = [item]
+            else:
+                owned.append(item)
+        self._byName = byName
+        self._byOwner = byOwner
+        self._items = items
+        self._count = len(items)
+        self.version += 1
+
+    def ensure(self, items):
+        """
+        re-index a list if it is not the one this index was built from or its length has changed
+
+        :param items: the systems that should be indexed
+        :type items: list
+        """
+        if items is not self._items or len(items) != self._count:
+            self.rebuild(items)
+
+    def added(self, item):
+        """
+        record a system that has just been appended to the indexed list
+
+        :param item: the new system
+        """
+        self._byName.setdefault(item.name, item)
+        self._byOwner.setdefault(getattr(item, self._ownerAttr), []).append(item)
+        self._count += 1
+        self.version += 1
+
+    def byName(self, items, name):
+        """
+        :param items: the indexed list
+        :type items: list
+        :param name: the name of the system
+        :type name: str
+        :return: the first system in the list with this name, None if there isn't one
+        """
+        self.ensure(items)
+        return self._byName.get(name)
+
+    def byOwner(self, items, owner):
+        """
+        :param items: the indexed list
+        :type items: list
+        :param owner: the owner to look for
+        :type owner: str
+        :return: every system with this owner, in list order
+        :rtype: list
+        """
+        self.ensure(items)
+        return list(self._byOwner.get(owner, ()))
+
+    def owners(self, items):
+        """
+        :param items: the indexed list
+        :type items: list
+        :return: every distinct owner in the list
+        :rtype: list[str]
+        """
+        self.ensure(items)
+        return list(self._byOwner)
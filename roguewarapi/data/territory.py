@@ -0,0 +1,185 @@
+from collections import deque
+
+from .factioncodes import FactionCodes
+
+
+class TerritoryGraph(object):
+    """
+    Faction territory over the adjacency graph of the map, for a single :class:`StarMap <roguewarapi.data.StarMap>`
+    snapshot
+
+    Nodes are the node ids of a :class:`NeighborGraph <roguewarapi.data.NeighborGraph>`, that is the positions of the
+    systems in :attr:`StarMapConstants.systemConstants <roguewarapi.data.StarMapConstants.systemConstants>`, and each is
+    owned by the owner of the same system on the map. Every query runs in time linear in the part of the graph it
+    visits, and its result is cached, so build a new graph for each new snapshot rather than changing the map
+    """
+
+    def __init__(self, graph, starmap, factionCodes=None):
+        """
+        :param graph: the adjacency graph
+        :type graph: roguewarapi.data.NeighborGraph
+        :param starmap: the map the owners are taken from, systems that aren't on it have no owner
+        :type starmap: roguewarapi.data.StarMap
+        :param factionCodes: optional, the faction codes to use
+        :type factionCodes: FactionCodes
+        """
+        self.graph = graph
+        self.factions = factionCodes if factionCodes is not None else FactionCodes()
+        self._offsets = graph.offsets.tolist()
+        self._indices = graph.indices.tolist()
+        code = self.factions.code
+        owners = [-1] * len(graph)
+        for node, name in enumerate(graph.names):
+            system = starmap.findSystem(name)
+            if system is not None:
+                owners[node] = code(system.owner)
+        self.owners = owners  #: the faction code of the owner of each node, -1 for systems that aren't on the map
+        self._territories = None  # type: dict[int, list[int]]
+        self._frontiers = {}  # type: dict[int, list[int]]
+        self._distances = {}  # type: dict[int, list[int]]
+        self._components = {}  # type: dict[int, list[list[int]]]
+
+    def __len__(self):
+        return len(self.owners)
+
+    def ownerOf(self, node):
+        """
+        :param node: a node id
+        :type node: int
+        :return: the owner of the node, None if the system isn't on the map
+        :rtype: str
+        """
+        code = self.owners[node]
+        return None if code < 0 else self.factions.names[code]
+
+    def territory(self, faction):
+        """
+        :param faction: a faction
+        :type faction: str
+        :return: the nodes the faction owns, in node order
+        :rtype: list[int]
+        """
+        if self._territories is None:
+            territories = {}
+            for node, code in enumerate(self.owners):
+                owned = territories.get(code)
+                if owned is None:
+                    territories[code] = [node]
+                else:
+                    owned.append(node)
+            self._territories = territories
+        code = self.factions.find(faction)
+        if code < 0:
+            return []
+        return self._territories.get(code, [])
+
+    def frontier(self, faction):
+        """
+        find the faction's border, the systems it owns that are adjacent to a system with another owner or none
+
+        :param faction: a faction
+        :type faction: str
+        :return: the frontier nodes, in node order
+        :rtype: list[int]
+        """
+        code = self.factions.find(faction)
+        frontier = self._frontiers.get(code)
+        if frontier is None:
+            offsets = self._offsets
+            indices = self._indices
+            owners = self.owners
+            frontier = []
+            for node in self.territory(faction):
+                for other in indices[offsets[node]:offsets[node + 1]]:
+                    if owners[other] != code:
+                        frontier.append(node)
+                        break
+            self._frontiers[code] = frontier
+        return frontier
+
+    def frontierNames(self, faction):
+        """
+        :param faction: a faction
+        :type faction: str
+        :return: the names of the faction's frontier systems, in node order
+        :rtype: list[str]
+        """
+        names = self.graph.names
+        return [names[node] for node in self.frontier(faction)]
+
+    def distances(self, faction):
+        """
+        the number of jumps from every system to the nearest system the faction owns, found with a single breadth first
+        search from all of the faction's systems at once
+
+        :param faction: a faction
+        :type faction: str
+        :return: the distance of each node, 0 for the faction's own systems and -1 for systems it can't reach
+        :rtype: list[int]
+        """
+        code = self.factions.find(faction)
+        distances = self._distances.get(code)
+        if distances is None:
+            offsets = self._offsets
+            indices = self._indices
+            distances = [-1] * len(self.owners)
+            queue = deque(self.territory(faction))
+            for node in queue:
+                distances[node] = 0
+            while queue:
+                node = queue.popleft()
+                nextDistance = distances[node] + 1
+                for other in indices[offsets[node]:offsets[node + 1]]:
+                    if distances[other] < 0:
+                        distances[other] = nextDistance
+                        queue.append(other)
+            self._distances[code] = distances
+        return distances
+
+    def withinJumps(self, faction, jumps):
+        """
+        :param faction: a faction
+        :type faction: str
+        :param jumps: the most jumps away
+        :type jumps: int
+        :return: the nodes at most `jumps` jumps from the faction's territory, excluding the territory itself
+        :rtype: list[int]
+        """
+        return [node for node, distance in enumerate(self.distances(faction)) if 0 < distance <= jumps]
+
+    def components(self, faction):
+        """
+        split the faction's territory into connected regions, systems are in the same region if a path between them
+        only passes through systems the faction owns
+
+        :param faction: a faction
+        :type faction: str
+        :return: the regions, largest first, each a list of nodes in node order
+        :rtype: list[list[int]]
+        """
+        code = self.factions.find(faction)
+        components = self._components.get(code)
+        if components is None:
+            offsets = self._offsets
+            indices = self._indices
+            owners = self.owners
+            seen = set()
+            components = []
+            for start in self.territory(faction):
+                if start in seen:
+                    continue
+                seen.add(start)
+                component = [start]
+                stack = [start]
+                while stack:
+                    node = stack.pop()
+                    for other in indices[offsets[node]:offsets[node + 1]]:
+                        if other not in seen and owners[other] == code:
+                            seen.add(other)
+                            component.append(other)
+                            stack.append(other)
+                component.sort()
+                components.append(component)
+            components.sort(key=len, reverse=True)
+            self._components[code] = components
+        return components
@@ -0,0 +1,210 @@
+import threading
+import time
+
+
+class _NullTimerType(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NullTimer = _NullTimerType()
+
+
+class _Timer(object):
+
+    __slots__ = ('_metrics', '_phase', '_tags', '_start')
+
+    def __init__(self, metrics, phase, tags):
+        self._metrics = metrics
+        self._phase = phase
+        self._tags = tags
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._metrics.timing(self._phase, time.perf_counter() - self._start, **self._tags)
+        return False
+
+
+class Metrics(object):
+    """
+    Receives timings and counts from a client, this base class ignores them and costs next to nothing, subclass it or
+    use :class:`MetricsRecorder` or :class:`CallbackMetrics` to collect them
+
+    The phases reported are:
+
+    ============================  ============================================================================
+    phase                         measures
+    ============================  ============================================================================
+    ``dns``                       resolving the service's host name, async client only
+    ``connect``                   opening a new connection to the service, DNS included for the sync client
+    ``request``                   sending a request and receiving the whole response
+    ``decode``                    decoding a response's json
+    ``construct``                 building data objects from decoded json
+    ``adjacency``                 mapping system adjacency
+    ``getStarMap``                a whole :meth:`getStarMap <roguewarapi.RogueWarApi.getStarMap>` call
+    ``getSystemConstants``        a whole :meth:`getSystemConstants <roguewarapi.RogueWarApi.getSystemConstants>` call
+    ============================  ============================================================================
+
+    and the counts ``cache.hit``, ``cache.stale``, ``cache.miss`` and ``notModified``. Requests are tagged with
+    their `method` and `uri`
+    """
+
+    enabled = False  #: False when reporting can be skipped altogether
+
+    def timing(self, phase, seconds, **tags):
+        """
+        report how long a phase took
+
+        :param phase: the phase
+        :type phase: str
+        :param seconds: the time taken
+        :type seconds: float
+        :param tags: details of the phase, such as the uri of a request
+        """
+        pass
+
+    def count(self, name, value=1, **tags):
+        """
+        report an event
+
+        :param name: the event
+        :type name: str
+        :param value: how many times it happened
+        :type value: int
+        :param tags: details of the event
+        """
+        pass
+
+    def timer(self, phase, **tags):
+        """
+        time the body of a ``with`` block as `phase`
+
+        :param phase: the phase
+        :type phase: str
+        :param tags: details of the phase
+        :return: a context manager
+        """
+        if not self.enabled:
+            return _NullTimer
+        return _Timer(self, phase, tags)
+
+
+class PhaseStats(object):
+    """
+    The totals of a single phase recorded by a :class:`MetricsRecorder`
+    """
+
+    __slots__ = ('count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0  #: the number of times the phase was timed
+        self.total = 0.0  #: the total time, in seconds
+        self.min = float('inf')  #: the shortest time, in seconds
+        self.max = 0.0  #: the longest time, in seconds
+
+    @property
+    def mean(self):
+        """
+        :rtype: float
+        """
+        return self.total / self.count if self.count else 0.0
+
+    def __repr__(self):
+        return f'PhaseStats(count={self.count}, mean={self.mean:.6f}, min={self.min:.6f}, max={self.max:.6f})'
+
+
+class MetricsRecorder(Metrics):
+    """
+    Keeps running totals of every phase and count, safe to share between threads
+    """
+
+    enabled = True
+
+    def __init__(self, byTag=None):
+        """
+        :param byTag: optional, a tag to break the totals down by, such as ``'uri'``, phases reported with the tag are
+            recorded as ``phase[value]``
+        :type byTag: str
+        """
+        self.byTag = byTag
+        self._lock = threading.Lock()
+        self._phases = {}  # type: dict[str, PhaseStats]
+        self._counts = {}  # type: dict[str, int]
+
+    def _key(self, name, tags):
+        if self.byTag is not None and self.byTag in tags:
+            return f'{name}[{tags[self.byTag]}]'
+        return name
+
+    def timing(self, phase, seconds, **tags):
+        key = self._key(phase, tags)
+        with self._lock:
+            stats = self._phases.get(key)
+            if stats is None:
+                stats = self._phases[key] = PhaseStats()
+            stats.count += 1
+            stats.total += seconds
+            if seconds < stats.min:
+                stats.min = seconds
+            if seconds > stats.max:
+                stats.max = seconds
+
+    def count(self, name, value=1, **tags):
+        key = self._key(name, tags)
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + value
+
+    def phases(self):
+        """
+        :return: a copy of the totals of every phase
+        :rtype: dict[str, PhaseStats]
+        """
+        with self._lock:
+            phases = {}
+            for key, stats in self._phases.items():
+                copy = phases[key] = PhaseStats()
+                copy.count, copy.total, copy.min, copy.max = stats.count, stats.total, stats.min, stats.max
+            return phases
+
+    def counts(self):
+        """
+        :return: a copy of every count
+        :rtype: dict[str, int]
+        """
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self._phases = {}
+            self._counts = {}
+
+
+class CallbackMetrics(Metrics):
+    """
+    Passes every timing and count on to callbacks, for forwarding to a metrics system such as statsd or prometheus
+    """
+
+    enabled = True
+
+    def __init__(self, onTiming, onCount=None):
+        """
+        :param onTiming: called with (phase, seconds, tags) for every timing
+        :param onCount: optional, called with (name, value, tags) for every count
+        """
+        self.onTiming = onTiming
+        self.onCount = onCount
+
+    def timing(self, phase, seconds, **tags):
+        self.onTiming(phase, seconds, tags)
+
+    def count(self, name, value=1, **tags):
+        if self.onCount is not None:
+            self.onCount(name, value, tags)
@@ -1,27 +1,48 @@
 import requests
-import logging
-import traceback
-import json
+import requests.adapters
+import threading
 import time
+import traceback
+import urllib3.poolmanager
+
+from .apibase import RogueWarApiBase, RequestError
+from .batch import fetchBatch
+from .data import StarMap, StarSystem, SingleFlight
+from .data.streamparse import iterStarSystems
 
-from .data import StarMap, StarSystem, CacheManager, StarSystemConst, StarMapConstants
 
-class RogueWarApi:
+def _timedPoolClasses(metrics):
     """
-    The Primary Interface for accessing the Roguewar API
+    :return: urllib3 connection pool classes, by scheme, whose connections report how long they took to open as the
+        `connect` phase
+    :rtype: dict[str, type]
+    """
+    pools = {}
+    for scheme, poolCls in urllib3.poolmanager.pool_classes_by_scheme.items():
+        connectionCls = poolCls.ConnectionCls
 
+        def connect(self, _connect=connectionCls.connect):
+            stTime = time.perf_counter()
+            _connect(self)
+            metrics.timing('connect', time.perf_counter() - stTime, host=self.host)
 
+        timedConnection = type(f'Timed{connectionCls.__name__}', (connectionCls,), {'connect': connect})
+        pools[scheme] = type(f'Timed{poolCls.__name__}', (poolCls,), {'ConnectionCls': timedConnection})
+    return pools
 
 
+class RogueWarApi(RogueWarApiBase):
     """
-    _Version = "0.0.X"
-    DefaultUri = 'http://roguewar.org'  #: the default URI of the RogueWar service
-    _UserAgent = f'RogueWarApi/{_Version}'
+    The Primary Interface for accessing the Roguewar API
 
-    _kStarMapCacheKey = "kStarMap"
+    A single client can be shared by any number of threads, every call returns its own result, concurrent requests
+    for the same data are coalesced and an expired token is only refreshed once however many requests it failed
 
+    """
 
-    def __init__(self, appName, appSecret, url=None, loggerhandler=None):
+    def __init__(self, appName, appSecret, url=None, loggerhandler=None, poolSize=10, timeout=30, keepAlive=True,
+                 starMapTtl=60, staleWhileRevalidate=False, starMapGrace=300, snapshotPath=None, metrics=None,
+                 starMapCls=StarMap, globalDataUri='getglobaldata'):
         """
         :param appName: the name of the client, use the name provided to you as part of your Name/Secret combo for authentication
         :type appName: str
@@ -31,142 +52,335 @@ class RogueWarApi:
         :type url: str
         :param loggerhandler: optional, a standard python logging handler object
         :type loggerhandler: logging.Handler
+        :param poolSize: optional, the maximum number of connections kept open to the service
+        :type poolSize: int
+        :param timeout: optional, the connect and read timeout of each request in seconds, a (connect, read) tuple or
+            None to wait forever
+        :type timeout: float
+        :param keepAlive: optional, reuse connections between requests, when False every request opens a new connection
+        :type keepAlive: bool
+        :param starMapTtl: optional, the number of seconds a fetched starmap is considered fresh
+        :type starMapTtl: float
+        :param staleWhileRevalidate: optional, when True an expired starmap is returned straight away while a fresh one
+            is fetched in the background
+        :type staleWhileRevalidate: bool
+        :param starMapGrace: optional, how many seconds past expiry a starmap may still be returned while revalidating
+        :type starMapGrace: float
+        :param snapshotPath: optional, a file to keep a snapshot of the system constants in, so a new client can load
+            them, adjacency included, without downloading and mapping them once the server confirms they are current
+        :type snapshotPath: str
+        :param metrics: optional, receives the timings of each phase of a call, such as a
+            :class:`MetricsRecorder <roguewarapi.MetricsRecorder>`, nothing is timed when not supplied
+        :type metrics: roguewarapi.Metrics
+        :param starMapCls: optional, the starmap class to build, such as :class:`LazyStarMap <roguewarapi.data.LazyStarMap>`
+            to only decode the parts of the map that are read
+        :param globalDataUri: optional, the endpoint serving the server's :class:`GlobalData <roguewarapi.data.GlobalData>`,
+            relative to the api url
+        :type globalDataUri: str
 
         """
-        self.appName = appName
-        self.appSecret = appSecret
-        self.BaseUri = self.DefaultUri + '/api/'
-        if url is not None:
-            self.BaseUri = url + '/api/'
-        self.appToken = ''
-        self.Logger = logging.getLogger("RogueWarApi")
-        self.Logger.setLevel(logging.INFO)
-        if loggerhandler is None:
-            nullhandler = logging.NullHandler()
-            self.Logger.addHandler(nullhandler)
-        else:
-            self.Logger.addHandler(loggerhandler)
-        self.lastResult = None  # type: dict
-        self.cache = CacheManager()
-        self.starMapConstants = None # type: StarMapConstants
-
-
-    def _getHeaders(self, cHeaders):
-        headers = {'User-Agent': self._UserAgent, 'content-type': 'application/json', f'Authorization': f'Bearer {self.appToken}'}
-        if self.appToken == '':
-            del headers['Authorization']
-        if cHeaders is not None:
-            for header in cHeaders:
-                headers[header] = cHeaders[header]
-                if headers[header] == '':
-                    del headers[header]
-        return headers
-
-    def _sendGetRequest(self, uri, callback=None, headers=None, reauth=True, **kwargs):
-        try:
-            url = self.BaseUri + uri
-            firstarg = False
-            for kwarg in kwargs:
-                if not firstarg:
-                    url += f'?{kwarg}={kwargs[kwarg]}'
-                    firstarg = True
-                else:
-                    url += f'&{kwarg}={kwargs[kwarg]}'
-            self.Logger.info(f'Sending Get request to: {url}')
-            result = requests.get(url, headers=self._getHeaders(headers), verify=False)
-            if result.ok:
-                if callback is not None:
-                    callback(result.json())
-                else:
-                    self.lastResult = result.json()
-                return True
-            else:
-                if result.status_code == 401 and reauth:
-                    if self._getAuthToken():
-                        return self._sendGetRequest(uri, callback=callback, headers=headers, reauth=False, **kwargs)
-                self.Logger.info(f'Request Failed: {result.status_code}')
-        except:
-            self.Logger.critical('Request Failed!')
-            for line in traceback.format_exc().split("\n"):
-                self.Logger.critical(line)
-        return False
+        super().__init__(appName, appSecret, url=url, loggerhandler=loggerhandler, starMapTtl=starMapTtl,
+                         staleWhileRevalidate=staleWhileRevalidate, starMapGrace=starMapGrace,
+                         snapshotPath=snapshotPath, metrics=metrics, starMapCls=starMapCls,
+                         globalDataUri=globalDataUri)
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=poolSize, pool_maxsize=poolSize)
+        if self.metrics.enabled:
+            adapter.poolmanager.pool_classes_by_scheme = _timedPoolClasses(self.metrics)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.verify = False
+        if not keepAlive:
+            self.session.headers['Connection'] = 'close'
+        self._flights = SingleFlight()
+        self._authLock = threading.Lock()
+        self._authGeneration = 0  # counts token refreshes, so requests rejected with the same token refresh it once
+        self._authResult = False
+        self._constantsLock = threading.Lock()
 
-    def _sendPostRequest(self, uri, callback=None, jData=None, headers=None, reauth=True, **kwargs):
-        try:
-            url = self.BaseUri + uri
-            firstarg = False
-            for kwarg in kwargs:
-                if not firstarg:
-                    url += f'?{kwarg}={kwargs[kwarg]}'
-                    firstarg = True
-                else:
-                    url += f'&{kwarg}={kwargs[kwarg]}'
-            self.Logger.info(f'Sending Get request to: {url}')
-            if jData is not None:
-                bData = jData.encode()
-                result = requests.post(url, headers=self._getHeaders(headers), data=bData, verify=False)
-            else:
-                result = requests.post(url, headers=self._getHeaders(headers), verify=False)
-            if result.ok:
-                if callback is not None:
-                    callback(result.json())
-                else:
-                    self.lastResult = result.json()
-                return True
-            else:
-                if result.status_code == 401 and reauth:
-                    if self._getAuthToken():
-                        return self._sendPostRequest(uri, callback=callback, jData=jData, headers=headers, reauth=False, **kwargs)
-                self.Logger.info(f'Request Failed: {result.status_code}')
-        except:
-            self.Logger.critical('Request Failed!')
-            for line in traceback.format_exc().split("\n"):
-                self.Logger.critical(line)
-        return False
+    def __enter__(self):
+        return self
 
-    def _authCallback(self, jData):
-        self.appToken = jData['access_token']
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        close all pooled connections, the client may still be used afterwards but will have to reconnect
+        """
+        self.session.close()
+
+    def _request(self, method, uri, jData=None, headers=None, reauth=True, conditional=False, timeout=None, parse=None,
+                 **kwargs):
+        """
+        send a request and decode its json response, a request rejected with 401 is sent again with a new token
+
+        :param conditional: optional, make the request conditional on the validators of the last response from the
+            same url
+        :type conditional: bool
+        :param timeout: optional, the timeout of this request, by default the client's
+        :param parse: optional, builds the result from the decoded json. The validators of the response are only kept
+            once it has been decoded and parsed, so a later 304 never confirms a result that failed to be built
+        :return: the decoded json, or the parsed result, `NotModified` if a conditional request was answered with 304
+            Not Modified
+        :raises RequestError: if the service answers with an error status
+        :raises requests.RequestException: if the request couldn't be made
+        """
+        url = self._buildUrl(uri, **kwargs)
+        self.Logger.info(f'Sending {method} request to: {url}')
+        generation = self._authGeneration
+        sendHeaders = self._conditionalHeaders(url, headers) if conditional else headers
+        bData = jData.encode() if jData is not None else None
+        with self.metrics.timer('request', method=method, uri=uri):
+            result = self.session.request(method, url, headers=self._getHeaders(sendHeaders), data=bData,
+                                          timeout=self.timeout if timeout is None else timeout)
+        if result.status_code == 304 and conditional:
+            self.Logger.info(f'Not modified: {url}')
+            self.metrics.count('notModified', uri=uri)
+            return self.NotModified
+        if not result.ok:
+            if result.status_code == 401 and reauth and self._refreshAuthToken(generation):
+                return self._request(method, uri, jData=jData, headers=headers, reauth=False, conditional=conditional,
+                                     timeout=timeout, parse=parse, **kwargs)
+            raise RequestError(result.status_code, url)
+        with self.metrics.timer('decode', uri=uri):
+            jData = result.json()
+        if parse is not None:
+            jData = parse(jData)
+        if method == 'GET':
+            self._storeValidators(url, result.headers)
+        return jData
+
+    def _refreshAuthToken(self, generation):
+        """
+        fetch a new token on behalf of every request that was rejected with the token of `generation`, only the first
+        caller sends the request, the others wait for it and share its outcome
+
+        :param generation: the token generation the failed request was sent with
+        :type generation: int
+        :return: True if a valid token is now available
+        :rtype: bool
+        """
+        with self._authLock:
+            if generation == self._authGeneration:
+                self._authResult = self._getAuthToken()
+                self._authGeneration += 1
+            return self._authResult
+
+    def _ensureAuthToken(self):
+        """
+        fetch a token if the client doesn't have one yet
+
+        :return: True if a token is available
+        :rtype: bool
+        """
+        if self.appToken:
+            return True
+        return self._refreshAuthToken(self._authGeneration)
 
     def _getAuthToken(self):
-        jData = {
-            "botName" : self.appName,
-            "botSecret" : self.appSecret
-        }
-        return self._sendPostRequest('botauth', callback=self._authCallback, jData=json.dumps(jData), reauth=False)
+        try:
+            jData = self._request('POST', 'botauth', jData=self._authRequestData(), reauth=False)
+        except Exception as e:
+            self._logFailure(e)
+            return False
+        self._authCallback(jData)
+        return True
 
     def getStarMap(self):
         """
         Get the current starmap
 
+        concurrent calls that miss the cache share a single request, with `staleWhileRevalidate` enabled an expired
+        map is returned immediately and refreshed in the background
+
         :return: a starmap object
         :rtype: StarMap
         """
 
-        cache = self.cache.getCacheItem(self._kStarMapCacheKey)
-        if cache:
-            return cache
-        if self._sendGetRequest('getmap'):
-            starmap = StarMap()
-            starmap.fromJson(self.lastResult)
-            self.cache.placeCacheItem(self._kStarMapCacheKey, starmap)
-            return starmap
-        return None
+        with self.metrics.timer('getStarMap'):
+            starmap, refresh = self._cachedStarMap()
+            if not refresh:
+                return starmap
+            if starmap is not None:
+                self._flights.doInBackground(self._kStarMapCacheKey, self._revalidateStarMap)
+                return starmap
+            try:
+                return self._refreshStarMap()
+            except Exception as e:
+                self._logFailure(e)
+                return None
+
+    def _revalidateStarMap(self):
+        # runs on a background thread, where nothing else would report a failure
+        try:
+            return self._fetchStarMap()
+        except Exception as e:
+            self._logFailure(e)
+            return None
+
+    def _refreshStarMap(self, timeout=None):
+        return self._flights.do(self._kStarMapCacheKey, self._fetchStarMap, timeout)
+
+    def _fetchStarMap(self, timeout=None):
+        # a caller that missed the cache just as another fetch finished can use that result, the miss has already been
+        # counted so this look up isn't
+        cached = self.cache.peekCacheItem(self._kStarMapCacheKey)
+        if cached is not None:
+            return cached
+        # a 304 means the last map fetched is still current, so it is reused rather than downloaded and parsed again
+        starmap = self._request('GET', 'getmap', conditional=self._lastStarMap is not None, timeout=timeout,
+                                parse=self._parseStarMap)
+        if starmap is self.NotModified:
+            starmap = self._lastStarMap
+        self._lastStarMap = starmap
+        self._cacheStarMap(starmap)
+        return starmap
 
     def getSystemConstants(self, bForce=False):
         """
         retrieve constants about the starmap, this includes data like system positions, and original owner
 
-        :param bForce: force the data to be refreshed from the server, this generally shouldnt be needed
+        adjacency is mapped at :attr:`supportRadius`, and remapped if that has changed since
+
+        :param bForce: force the data to be refreshed from the server, this generally shouldnt be needed, if the
+            server reports the constants haven't changed the current object is kept
         :type bForce: bool
         :return: a `StarMapConstants` object
         :rtype: StarMapConstants
         """
-        if bForce or self.starMapConstants is None:
-            if self._sendGetRequest('getsystemstatic'):
-                constants = StarMapConstants()
-                constants.fromJson(self.lastResult)
-                stTime = time.time()
-                constants.mapAdjacents(50)
+        with self.metrics.timer('getSystemConstants'):
+            constants = self.starMapConstants
+            if bForce or constants is None or self._needsMapping(constants):
+                try:
+                    self._updateSystemConstants(bForce)
+                except Exception as e:
+                    self._logFailure(e)
+        return self.starMapConstants
+
+    def _refreshSystemConstants(self, timeout=None):
+        return self._updateSystemConstants(True, timeout)
+
+    def _updateSystemConstants(self, bForce, timeout=None):
+        # only one thread updates the constants at a time, the others wait and then find them up to date. Other threads
+        # read the constants without the lock, so they are never changed in place, a remapped copy replaces them
+        with self._constantsLock:
+            if bForce or self.starMapConstants is None:
+                self._fetchSystemConstants(timeout)
+            if self.starMapConstants is not None and self._needsMapping(self.starMapConstants):
+                constants = self.starMapConstants.copy()
+                self._mapAdjacents(constants)
                 self.starMapConstants = constants
-                self.Logger.info(f"Adjacency Mapping took: {time.time() - stTime:0.02f} seconds")
+                self._saveConstantsSnapshot(constants)
+            return self.starMapConstants
+
+    def _fetchSystemConstants(self, timeout=None):
+        # a 304 means the current constants, or those in the snapshot, are still valid
+        etag = self._snapshotETag() if self.starMapConstants is None else None
+        constants = self._request('GET', 'getsystemstatic', timeout=timeout, parse=self._parseSystemConstants,
+                                  conditional=self.starMapConstants is not None or etag is not None)
+        if constants is self.NotModified and self.starMapConstants is None:
+            self.starMapConstants = self._loadConstantsSnapshot(etag)
+            if self.starMapConstants is None:
+                constants = self._request('GET', 'getsystemstatic', timeout=timeout, parse=self._parseSystemConstants)
+        if constants is not self.NotModified:
+            self._mapAdjacents(constants)
+            self.starMapConstants = constants
+            self._saveConstantsSnapshot(constants)
         return self.starMapConstants
+
+    def getGlobalData(self, bForce=False):
+        """
+        retrieve the server's global constants, once fetched adjacency is mapped with their `SupportRadius`
+
+        :param bForce: force the data to be refreshed from the server
+        :type bForce: bool
+        :return: a `GlobalData` object, None if it has never been fetched successfully
+        :rtype: GlobalData
+        """
+        if bForce or self.globalData is None:
+            try:
+                self._refreshGlobalData()
+            except Exception as e:
+                self._logFailure(e)
+        return self.globalData
+
+    def _refreshGlobalData(self, timeout=None):
+        return self._flights.do(self.globalDataUri, self._fetchGlobalData, timeout)
+
+    def _fetchGlobalData(self, timeout=None):
+        self.globalData = self._request('GET', self.globalDataUri, timeout=timeout, parse=self._parseGlobalData)
+        return self.globalData
+
+    def fetchBatch(self, names=RogueWarApiBase.DefaultBatch, maxWorkers=4, timeout=None, retries=2, backoff=0.5):
+        """
+        fetch several things at once on a bounded pool of threads, such as everything a new worker needs, rather than
+        one request after another. To fetch for several clients at once use :func:`fetchBatch <roguewarapi.fetchBatch>`
+
+        Each result is kept by the client as if it had been fetched with the matching ``get`` call, the starmap is
+        taken from the cache while it is fresh. Requests that fail to connect, time out or are answered with a 5xx or
+        429 status are retried
+
+        :param names: optional, the requests to make, from :attr:`BatchRequests`, by default :attr:`DefaultBatch`
+        :type names: list[str]
+        :param maxWorkers: the most requests in flight at once
+        :type maxWorkers: int
+        :param timeout: optional, the connect and read timeout of each request in seconds, or a (connect, read) tuple,
+            by default the client's own timeout
+        :type timeout: float
+        :param retries: how many more times a failed request is tried
+        :type retries: int
+        :param backoff: the wait before the first retry in seconds, doubling for each retry after it
+        :type backoff: float
+        :return: the result of each request, by name, holding either the fetched object or the error that stopped it
+        :rtype: dict[str, roguewarapi.BatchResult]
+        :raises ValueError: if a name isn't in :attr:`BatchRequests`
+        """
+        results = fetchBatch([(self, name) for name in names], maxWorkers=maxWorkers, timeout=timeout, retries=retries,
+                             backoff=backoff)
+        return {result.name: result for result in results}
+
+    def streamStarMap(self, cls=StarSystem, chunkSize=65536):
+        """
+        Stream the current starmap, parsing star systems as the response is downloaded and yielding them one at a
+        time, only the system being parsed is held in memory. Streamed maps are not cached
+
+        If the request fails the failure is logged and nothing is yielded
+
+        :param cls: optional, the star system class to build, such as :class:`SlottedStarSystem <roguewarapi.data.SlottedStarSystem>`
+        :param chunkSize: the number of bytes to read from the response at a time
+        :type chunkSize: int
+        :return: a generator of star system objects
+        :rtype: collections.abc.Iterator[StarSystem]
+        """
+        result = self._openStream('getmap')
+        if result is None:
+            return
+        try:
+            yield from iterStarSystems(result.iter_content(chunk_size=chunkSize), cls)
+        except (ValueError, requests.RequestException):
+            self.Logger.critical('Failed to read the streamed starmap!')
+            for line in traceback.format_exc().split("\n"):
+                self.Logger.critical(line)
+        finally:
+            result.close()
+
+    def _openStream(self, uri, headers=None, reauth=True, **kwargs):
+        try:
+            url = self._buildUrl(uri, **kwargs)
+            self.Logger.info(f'Sending streamed Get request to: {url}')
+            generation = self._authGeneration
+            result = self.session.get(url, headers=self._getHeaders(headers), timeout=self.timeout, stream=True)
+            if result.ok:
+                return result
+            result.close()
+            if result.status_code == 401 and reauth:
+                if self._refreshAuthToken(generation):
+                    return self._openStream(uri, headers=headers, reauth=False, **kwargs)
+            self.Logger.info(f'Request Failed: {result.status_code}')
+        except:
+            self.Logger.critical('Request Failed!')
+            for line in traceback.format_exc().split("\n"):
+                self.Logger.critical(line)
+        return None
@@ -8,5 +8,9 @@ setup(
     license='GPLv3',
     author='wmtorode',
     author_email='',
-    description='Client API for RogueWar Site'
+    description='Client API for RogueWar Site',
+    extras_require={
+        'numpy': ['numpy'],
+        'async': ['aiohttp'],
+    }
 )
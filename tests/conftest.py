@@ -0,0 +1,346 @@
+"""
+Fixtures shared by the tests: a local stand-in for the RogueWar service, synthetic payloads, clients pointed at the
+stand-in and a controllable clock
+"""
+import contextlib
+import copy
+import json
+import logging
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from roguewarapi import RogueWarApi, apibase
+from roguewarapi.data import StarMap, kFactions, objectcache
+
+_Token = 'test-token'
+
+
+def _extentFor(count, neighbours, radius):
+    # size the square map so that each system has roughly `neighbours` others within `radius`
+    density = neighbours / (math.pi * radius * radius)
+    return math.sqrt(count / density)
+
+
+def systemNames(count):
+    """
+    :param count: how many names to generate
+    :type count: int
+    :return: unique, deterministic star system names
+    :rtype: list[str]
+    """
+    return [f'System-{index:05d}' for index in range(count)]
+
+
+def makeConstantsPayload(count, seed=1, neighbours=10, radius=50):
+    """
+    build a synthetic `getsystemstatic` payload
+
+    :param count: the number of star systems
+    :type count: int
+    :param seed: the random seed, the same seed always produces the same payload
+    :type seed: int
+    :param neighbours: the average number of systems within `radius` of each system
+    :type neighbours: float
+    :param radius: the radius used to size the map
+    :type radius: float
+    :return: a json-style dict
+    :rtype: dict
+    """
+    rand = random.Random(seed)
+    half = _extentFor(count, neighbours, radius) / 2
+    factions = kFactions.listItemNames()
+    coordinates = []
+    for name in systemNames(count):
+        coordinates.append({
+            'name': name,
+            'posx': round(rand.uniform(-half, half), 3),
+            'posy': round(rand.uniform(-half, half), 3),
+            'originalOwner': rand.choice(factions),
+        })
+    return {'Coordinates': coordinates}
+
+
+def makeStarMapPayload(count, seed=1, factionsPerSystem=3):
+    """
+    build a synthetic `getmap` payload
+
+    :param count: the number of star systems
+    :type count: int
+    :param seed: the random seed, the same seed always produces the same payload
+    :type seed: int
+    :param factionsPerSystem: the maximum number of faction control entries on each system
+    :type factionsPerSystem: int
+    :return: a json-style dict
+    :rtype: dict
+    """
+    rand = random.Random(seed)
+    factions = kFactions.listItemNames()
+    systems = []
+    for name in systemNames(count):
+        present = rand.sample(factions, rand.randint(1, factionsPerSystem))
+        systems.append({
+            'Players': rand.randint(0, 12),
+            'immuneFromWar': rand.random() < 0.05,
+            'markerType': rand.choice((0, 0, 0, 1, 2)),
+            'name': name,
+            'owner': present[0],
+            'factions': [{
+                'Name': faction,
+                'control': rand.randint(0, 100),
+                'ActivePlayers': rand.randint(0, 4),
+            } for faction in present],
+        })
+    return {'starsystems': systems}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def _send(self, code, body=b'', etag=None):
+        try:
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            if etag is not None:
+                self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):  # the client gave up waiting, as it does after a timeout
+            self.close_connection = True
+
+    def do_GET(self):
+        self.server.requests += 1
+        if self.headers.get('Authorization') != f'Bearer {self.server.token}':
+            return self._send(401)
+        name = self.path.split('?')[0].rsplit('/', 1)[-1]
+        body = self.server.routes.get(name)
+        if body is None:
+            return self._send(404)
+        delay = self.server.delays.get(name)
+        if delay:
+            time.sleep(delay)
+        failures = self.server.failures.get(name)
+        if failures:
+            return self._send(failures.pop(0))
+        etag = self.server.etags.get(name)
+        if etag is not None and self.headers.get('If-None-Match') == etag:
+            self.server.notModified += 1
+            return self._send(304, etag=etag)
+        self._send(200, body, etag)
+
+    def do_POST(self):
+        self.server.requests += 1
+        self.server.authRequests += 1
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self._send(200, json.dumps({'access_token': self.server.token}).encode())
+
+
+class StubServer(object):
+    """
+    Serves json payloads by endpoint name on a free local port, with the same bearer token authentication as the real
+    service. Use it as a context manager, or the :func:`stubServer` fixture
+    """
+
+    def __init__(self, routes, etags=None):
+        """
+        :param routes: the json-style payload of each endpoint, such as ``{'getmap': makeStarMapPayload(1000)}``
+        :type routes: dict[str, object]
+        :param etags: optional, the ETag of each endpoint that has one, requests sending it back in If-None-Match are
+            answered with 304 Not Modified
+        :type etags: dict[str, str]
+        """
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.routes = {name: json.dumps(payload).encode() for name, payload in routes.items()}
+        self._server.requests = 0
+        self._server.connections = 0
+        self._server.etags = dict(etags or {})
+        self._server.notModified = 0
+        self._server.token = _Token
+        self._server.authRequests = 0
+        self._server.failures = {}
+        self._server.delays = {}
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        """
+        the url to pass to a client
+        """
+        return f'http://127.0.0.1:{self._server.server_port}'
+
+    @property
+    def requests(self):
+        """
+        the number of requests served so far
+        """
+        return self._server.requests
+
+    def setRoute(self, name, payload, etag=None):
+        """
+        change what an endpoint serves
+
+        :param name: the endpoint
+        :type name: str
+        :param payload: the json-style payload, or bytes to serve as they are, such as a truncated document
+        :param etag: optional, the new ETag of the endpoint
+        :type etag: str
+        """
+        self._server.routes[name] = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        if etag is None:
+            self._server.etags.pop(name, None)
+        else:
+            self._server.etags[name] = etag
+
+    def failRoute(self, name, *statuses):
+        """
+        answer the next requests to an endpoint with error statuses, one request per status, before serving its payload
+        again
+
+        :param name: the endpoint
+        :type name: str
+        :param statuses: the http statuses to answer with, in order
+        :type statuses: int
+        """
+        self._server.failures.setdefault(name, []).extend(statuses)
+
+    def delayRoute(self, name, seconds):
+        """
+        wait before answering each request to an endpoint
+
+        :param name: the endpoint
+        :type name: str
+        :param seconds: the wait, 0 to answer straight away again
+        :type seconds: float
+        """
+        self._server.delays[name] = seconds
+
+    @property
+    def token(self):
+        """
+        the token the server accepts and hands out, set a new one to expire the token clients hold
+        """
+        return self._server.token
+
+    @token.setter
+    def token(self, value):
+        self._server.token = value
+
+    @property
+    def authRequests(self):
+        """
+        the number of tokens handed out so far
+        """
+        return self._server.authRequests
+
+    @property
+    def notModified(self):
+        """
+        the number of requests answered with 304 Not Modified so far
+        """
+        return self._server.notModified
+
+    @property
+    def connections(self):
+        """
+        the number of connections accepted so far
+        """
+        return self._server.connections
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class Clock(object):
+    """
+    Stands in for the ``time`` module of the cache and the clients, so expiry can be tested without waiting
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def perf_counter(self):
+        return time.perf_counter()
+
+
+@pytest.fixture
+def starMapPayload():
+    """
+    :return: :func:`makeStarMapPayload`
+    """
+    return makeStarMapPayload
+
+
+@pytest.fixture
+def constantsPayload():
+    """
+    :return: :func:`makeConstantsPayload`
+    """
+    return makeConstantsPayload
+
+
+@pytest.fixture
+def stubServer():
+    """
+    :return: a function taking the arguments of :class:`StubServer` and returning a running server, every server is
+        shut down after the test
+    """
+    with contextlib.ExitStack() as stack:
+        yield lambda routes, etags=None: stack.enter_context(StubServer(routes, etags))
+
+
+@pytest.fixture
+def client():
+    """
+    :return: a function taking a :class:`StubServer` and returning a client for it, keyword arguments are passed on to
+        the client and `cls` picks the client class. Sync clients are closed after the test, async clients have to be
+        closed on their event loop, with ``async with``
+    """
+    with contextlib.ExitStack() as stack:
+        def make(server, cls=RogueWarApi, **kwargs):
+            api = cls('test', 'secret', url=server.url, loggerhandler=logging.NullHandler(), **kwargs)
+            return stack.enter_context(api) if cls is RogueWarApi else api
+        yield make
+
+
+@pytest.fixture
+def readStarMap():
+    """
+    :return: a function reading a copy of a payload into a starmap, of the class given as `cls`
+    """
+    def read(payload, cls=StarMap):
+        result = cls()
+        assert result.fromJson(copy.deepcopy(payload))
+        return result
+    return read
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    :return: a :class:`Clock` the cache and the clients read the time from
+    """
+    clock = Clock()
+    monkeypatch.setattr(objectcache, 'time', clock)
+    monkeypatch.setattr(apibase, 'time', clock)
+    return clock
+
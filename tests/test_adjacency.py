@@ -0,0 +1,92 @@
+"""
+Adjacency must be exactly what the original all-pairs scan produced, on every backend and however the graph was built
+"""
+import random
+
+import pytest
+
+from roguewarapi.data import StarMapConstants
+from roguewarapi.data.neighborgraph import hasNumpy
+
+from benchmarks.bench_adjacency import bruteForceAdjacents
+
+_Backends = [False, pytest.param(True, marks=pytest.mark.skipif(not hasNumpy(), reason='numpy is not installed'))]
+
+
+def _constants(coordinates):
+    constants = StarMapConstants()
+    assert constants.fromJson({'Coordinates': coordinates})
+    return constants
+
+
+def _adjacency(constants):
+    return [list(const.adjacentSystems) for const in constants.systemConstants]
+
+
+def _randomCoordinates(count, seed, integers):
+    rand = random.Random(seed)
+    coordinates = []
+    for index in range(count):
+        if integers:
+            posx, posy = rand.randint(-60, 60), rand.randint(-60, 60)
+        else:
+            posx, posy = round(rand.uniform(-60, 60), 1), round(rand.uniform(-60, 60), 1)
+        # every tenth system reuses an earlier name, as the server's data has done
+        name = f'System-{rand.randrange(index)}' if index and index % 10 == 0 else f'System-{index}'
+        coordinates.append({'name': name, 'posx': posx, 'posy': posy})
+    return coordinates
+
+
+# systems on an axis and on a 3-4-5 triangle sit exactly on a radius of 5, and the stacked systems are at distance 0
+_EdgeCases = [
+    {'name': 'origin', 'posx': 0, 'posy': 0},
+    {'name': 'east', 'posx': 5, 'posy': 0},
+    {'name': 'north', 'posx': 0.0, 'posy': -5.0},
+    {'name': 'diagonal', 'posx': 3, 'posy': 4},
+    {'name': 'diagonalFloat', 'posx': -3.0, 'posy': 4.0},
+    {'name': 'stacked', 'posx': 0, 'posy': 0},
+    {'name': 'stacked', 'posx': 0, 'posy': 0},
+    {'name': 'outside', 'posx': 5, 'posy': 0.001},
+    {'name': 'tenth', 'posx': 0.1, 'posy': 0.2},
+    {'name': 'tenthOffset', 'posx': 0.4, 'posy': 0.6},
+]
+
+
+@pytest.mark.parametrize('useNumpy', _Backends)
+@pytest.mark.parametrize('radius', [0, 0.5, 5, 5.000001, 17.5, 50])
+def test_edgeCasesMatchTheAllPairsScan(useNumpy, radius):
+    constants = _constants(_EdgeCases)
+    constants.mapAdjacents(radius, useNumpy=useNumpy)
+    assert _adjacency(constants) == bruteForceAdjacents(constants.systemConstants, radius)
+
+
+@pytest.mark.parametrize('useNumpy', _Backends)
+@pytest.mark.parametrize('integers', [True, False], ids=['int', 'float'])
+@pytest.mark.parametrize('radius', [0, 1, 7, 12.5, 30])
+def test_randomMapsMatchTheAllPairsScan(useNumpy, integers, radius):
+    constants = _constants(_randomCoordinates(300, radius * 10 + integers, integers))
+    constants.mapAdjacents(radius, useNumpy=useNumpy)
+    assert _adjacency(constants) == bruteForceAdjacents(constants.systemConstants, radius)
+
+
+@pytest.mark.parametrize('useNumpy', _Backends)
+def test_filteredGraphsMatchTheAllPairsScan(useNumpy):
+    coordinates = _randomCoordinates(300, 5, True) + _EdgeCases
+    constants = _constants(coordinates)
+    constants.neighborGraph(30, useNumpy=useNumpy)
+    for radius in (12.5, 7, 5, 1, 0):
+        assert constants.neighborGraph(radius, useNumpy=useNumpy).radius == radius
+        constants.mapAdjacents(radius, useNumpy=useNumpy)
+        assert _adjacency(constants) == bruteForceAdjacents(constants.systemConstants, radius)
+
+
+def test_backendsAgree(constantsPayload):
+    payload = constantsPayload(1000)
+    lists = []
+    for useNumpy in (False, True) if hasNumpy() else (False,):
+        constants = StarMapConstants()
+        constants.fromJson(payload)
+        constants.mapAdjacents(50, useNumpy=useNumpy)
+        lists.append(_adjacency(constants))
+    assert all(adjacency == lists[0] for adjacency in lists)
+    assert lists[0] == bruteForceAdjacents(constants.systemConstants, 50)
@@ -0,0 +1,45 @@
+import copy
+
+from roguewarapi.data import StarMapArchive
+
+
+def test_controlsRoundTripExactly(tmp_path, readStarMap):
+    payload = {'starsystems': [
+        {'name': 'a', 'owner': 'Davion', 'factions': [{'Name': 'Davion', 'control': '0.50'},
+                                                      {'Name': 'Liao', 'control': '50'},
+                                                      {'Name': 'Kurita'}]},
+        {'name': 'b', 'owner': 'Liao', 'factions': [{'Name': 'Liao', 'control': 50},
+                                                    {'Name': 'Davion', 'control': 0.5},
+                                                    {'Name': 'Kurita', 'control': 50.0}]},
+        {'name': 'c', 'owner': 'Kurita', 'Players': 2.5, 'markerType': 1.5, 'immuneFromWar': None,
+         'factions': [{'Name': 'Kurita', 'control': None, 'ActivePlayers': 1.5},
+                      {'Name': 'Liao', 'control': 1, 'ActivePlayers': None}]},
+        {'name': 'd', 'owner': 'Davion', 'Players': None, 'markerType': None, 'immuneFromWar': True},
+    ]}
+    live = readStarMap(payload)
+    with StarMapArchive(str(tmp_path)) as archive:
+        archive.append(live, timestamp=1)
+    with StarMapArchive(str(tmp_path), readOnly=True) as archive:
+        restored = archive.snapshot(0)
+    assert restored.toRawJson() == live.toRawJson()
+    controls = [fctCtl.control for system in restored.systems for fctCtl in system.availableFactions]
+    assert controls == ['0.50', '50', '', 50, 0.5, 50.0, None, 1]
+    assert [type(control) for control in controls] == [str, str, str, int, float, float, type(None), int]
+    members = [(system.Players, system.markerType, system.immuneFromWar) for system in restored.systems]
+    assert members == [(0, 0, False), (0, 0, False), (2.5, 1.5, None), (None, None, True)]
+    assert [type(system.Players) for system in restored.systems] == [int, int, float, type(None)]
+    active = [fctCtl.ActivePlayers for fctCtl in restored.findSystem('c').availableFactions]
+    assert active == [1.5, None]
+    assert live.diff(restored).isEmpty
+
+
+def test_historyAcrossSnapshots(tmp_path, readStarMap, starMapPayload):
+    first = starMapPayload(30)
+    second = copy.deepcopy(first)
+    second['starsystems'][0]['owner'] = 'Steiner'
+    with StarMapArchive(str(tmp_path)) as archive:
+        archive.append(readStarMap(first), timestamp=1)
+        archive.append(readStarMap(second), timestamp=2)
+        name = first['starsystems'][0]['name']
+        assert archive.ownerHistory(name) == [(1, first['starsystems'][0]['owner']), (2, 'Steiner')]
+        assert archive.snapshot(1).toRawJson() == second
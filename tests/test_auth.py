@@ -0,0 +1,44 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from roguewarapi import AsyncRogueWarApi
+
+_Threads = 30
+
+
+@pytest.fixture
+def server(stubServer, starMapPayload):
+    return stubServer({'getmap': starMapPayload(10)})
+
+
+def test_expiredTokenIsRefreshedOnce(server, client):
+    api = client(server, poolSize=_Threads)
+    assert api._ensureAuthToken()
+    server.token = 'rotated-token'
+    barrier = threading.Barrier(_Threads)
+
+    def fetch(_):
+        barrier.wait()
+        return api._request('GET', 'getmap')
+
+    with ThreadPoolExecutor(max_workers=_Threads) as executor:
+        results = list(executor.map(fetch, range(_Threads)))
+    assert all(result is not None for result in results)
+    assert server.authRequests == 2
+    assert api.appToken == 'rotated-token'
+
+
+def test_expiredTokenIsRefreshedOnceAsync(server, client):
+    async def run():
+        async with client(server, AsyncRogueWarApi, poolSize=_Threads) as api:
+            assert await api._sendRequest('GET', 'getmap') is not None
+            server.token = 'rotated-token'
+            results = await asyncio.gather(*(api._sendRequest('GET', 'getmap') for _ in range(_Threads)))
+            assert all(result is not None for result in results)
+            assert api.appToken == 'rotated-token'
+
+    asyncio.run(run())
+    assert server.authRequests == 2
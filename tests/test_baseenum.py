@@ -0,0 +1,65 @@
+"""
+The lookup tables built for each :class:`BaseEnum` must answer exactly as the original reflection based lookups did
+"""
+import inspect
+
+import pytest
+
+from roguewarapi.data import BaseEnum, kFactions
+
+
+class _Mixed(BaseEnum):
+    Zero = 0
+    One = 1
+    AlsoOne = 1
+    Half = 0.5
+    Name = 'Name'
+    Pair = (1, 2)
+    Listed = [1, 2]
+    Nothing = None
+
+    @classmethod
+    def helper(cls):
+        return None
+
+
+def _reflectedMembers(cls):
+    # the original BaseEnum._getMembers, which inspected the class on every call
+    return [member for member in inspect.getmembers(cls) if not member[0].startswith('_') and
+            not callable(getattr(cls, member[0]))]
+
+
+def _reflectedFindByName(cls, item):
+    for member in _reflectedMembers(cls):
+        if member[0] == item:
+            return member[1]
+    return -1
+
+
+def _reflectedGetItemName(cls, item):
+    for member in _reflectedMembers(cls):
+        if member[1] == item:
+            return str(member[0])
+    return ''
+
+
+_Names = ['Davion', 'Zero', 'One', 'AlsoOne', 'Listed', 'Nothing', 'helper', 'missing', '_members', '__doc__']
+_Items = ['Davion', 'NotAFaction', 0, 1, 1.0, True, 0.5, 'Name', (1, 2), [1, 2], [], None, -1]
+
+
+@pytest.mark.parametrize('cls', [kFactions, _Mixed])
+def test_tablesMatchReflection(cls):
+    assert cls._getMembers() == _reflectedMembers(cls)
+    assert cls.listItemNames() == [member[0] for member in _reflectedMembers(cls)]
+    for name in _Names:
+        assert cls.findByName(name) == _reflectedFindByName(cls, name), name
+    for item in _Items:
+        assert cls.getItemName(item) == _reflectedGetItemName(cls, item), item
+        assert cls.isAnItem(item) == any(member[1] == item for member in _reflectedMembers(cls)), item
+
+
+def test_getMembersSorted():
+    # this used to raise AttributeError, it referred to a _sort_key method that doesn't exist
+    members = kFactions._getMembersSorted()
+    assert members == sorted(_reflectedMembers(kFactions), key=lambda member: member[1])
+    assert [member[1] for member in members] == sorted(kFactions.listItemNames())
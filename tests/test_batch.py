@@ -0,0 +1,146 @@
+import asyncio
+
+import aiohttp
+import pytest
+import requests
+
+from roguewarapi import AsyncRogueWarApi, RogueWarApi
+from roguewarapi.batch import isRetryable
+from roguewarapi.apibase import RequestError
+
+
+@pytest.fixture
+def routes(starMapPayload, constantsPayload):
+    return {'getmap': starMapPayload(50), 'getsystemstatic': constantsPayload(50)}
+
+
+@pytest.fixture
+def server(stubServer, routes):
+    return stubServer(routes)
+
+
+def test_defaultBatchLeavesOutGlobalData(server, client):
+    api = client(server)
+    results = api.fetchBatch()
+    assert sorted(results) == sorted(RogueWarApi.DefaultBatch)
+    assert all(result.ok for result in results.values())
+    assert api.globalData is None
+
+
+def test_missingGlobalDataFailsOnlyItsOwnRequest(server, client):
+    results = client(server).fetchBatch(RogueWarApi.BatchRequests, retries=0)
+    assert not results['globalData'].ok
+    assert results['globalData'].error.status == 404
+    assert results['starMap'].ok and results['systemConstants'].ok
+
+
+def test_globalDataUriIsConfigurable(stubServer, routes, client):
+    api = client(stubServer(dict(routes, globals={'SupportRadius': 30})), globalDataUri='globals')
+    assert api.getGlobalData().SupportRadius == 30
+    assert api.supportRadius == 30
+
+
+def test_unavailableRequestIsRetried(server, client):
+    api = client(server)
+    server.failRoute('getmap', 503)
+    results = api.fetchBatch(['starMap'], backoff=0.05)
+    result = results['starMap']
+    assert result.ok
+    assert result.attempts == 2
+    assert result.elapsed >= 0.05
+    assert api.getStarMap() is result.value
+
+
+def test_retriesRunOut(server, client):
+    server.failRoute('getmap', 503, 429, 500)
+    result = client(server).fetchBatch(['starMap'], retries=2, backoff=0)['starMap']
+    assert not result.ok
+    assert result.attempts == 3
+    assert result.error.status == 500
+
+
+def test_missingRequestIsNotRetried(server, client):
+    server.failRoute('getmap', 404)
+    result = client(server).fetchBatch(['starMap'], backoff=0)['starMap']
+    assert not result.ok
+    assert result.attempts == 1
+    assert result.error.status == 404
+
+
+def test_timedOutRequestIsRetried(server, client):
+    server.delayRoute('getmap', 0.5)
+    result = client(server).fetchBatch(['starMap'], timeout=0.1, retries=1, backoff=0)['starMap']
+    assert not result.ok
+    assert result.attempts == 2
+    assert isinstance(result.error, requests.Timeout)
+
+
+@pytest.fixture
+def asyncBatch(server, client):
+    """
+    :return: a function running an async client's batch against the server, returning the client, the results and
+        the client's starmap afterwards
+    """
+    def run(names, **kwargs):
+        async def fetch():
+            async with client(server, AsyncRogueWarApi) as api:
+                results = await api.fetchBatch(names, **kwargs)
+                return api, results, await api.getStarMap()
+
+        return asyncio.run(fetch())
+    return run
+
+
+def test_asyncBatchIsKeptByTheClient(server, asyncBatch):
+    api, results, starmap = asyncBatch(RogueWarApi.DefaultBatch)
+    assert sorted(results) == sorted(AsyncRogueWarApi.DefaultBatch)
+    assert all(result.ok and result.attempts == 1 for result in results.values())
+    assert starmap is results['starMap'].value
+    assert api.starMapConstants is results['systemConstants'].value
+    # one token, fetched before the requests so none of them is rejected
+    assert server.authRequests == 1
+    assert server.requests == 3
+
+
+def test_asyncUnavailableRequestIsRetried(server, asyncBatch):
+    server.failRoute('getmap', 503)
+    api, results, starmap = asyncBatch(['starMap'], backoff=0.05)
+    result = results['starMap']
+    assert result.ok
+    assert result.attempts == 2
+    assert result.elapsed >= 0.05
+    assert starmap is result.value
+
+
+def test_asyncRetriesRunOut(server, asyncBatch):
+    server.failRoute('getmap', 503, 429, 500)
+    result = asyncBatch(['starMap'], retries=2, backoff=0)[1]['starMap']
+    assert not result.ok
+    assert result.attempts == 3
+    assert result.error.status == 500
+
+
+def test_asyncMissingRequestIsNotRetried(asyncBatch):
+    api, results, starmap = asyncBatch(RogueWarApi.BatchRequests, backoff=0)
+    assert not results['globalData'].ok
+    assert results['globalData'].attempts == 1
+    assert results['globalData'].error.status == 404
+    assert results['starMap'].ok and results['systemConstants'].ok
+
+
+def test_asyncTimedOutRequestIsRetried(server, asyncBatch):
+    server.delayRoute('getmap', 0.5)
+    result = asyncBatch(['starMap'], timeout=0.1, retries=1, backoff=0)[1]['starMap']
+    assert not result.ok
+    assert result.attempts == 2
+    assert isinstance(result.error, asyncio.TimeoutError)
+
+
+def test_isRetryable():
+    assert isRetryable(RequestError(503, 'url'))
+    assert isRetryable(RequestError(429, 'url'))
+    assert not isRetryable(RequestError(404, 'url'))
+    assert isRetryable(requests.ConnectionError())
+    assert isRetryable(aiohttp.ServerDisconnectedError())
+    assert isRetryable(asyncio.TimeoutError())
+    assert not isRetryable(ValueError())
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from roguewarapi.data import LazyStarMap, SlottedStarSystem, StarMap, StarSystem
+from roguewarapi.data.kfactions import kFactions
+
+
+def _decodedCopy(value):
+    # a value decoded from json is an equal string but not the enum's own one
+    return json.loads(json.dumps(value))
+
+
+def test_canonicalReturnsTheEnumsValue():
+    name = _decodedCopy(kFactions.Davion)
+    assert name is not kFactions.Davion
+    assert kFactions.canonical(name) is kFactions.Davion
+    assert kFactions.canonical('NotAFaction') == 'NotAFaction'
+    assert kFactions.canonical([]) == []
+
+
+@pytest.mark.parametrize('cls', [StarMap, LazyStarMap])
+def test_starMapSharesFactionNames(cls, starMapPayload):
+    starmap = cls()
+    assert starmap.fromJson(_decodedCopy(starMapPayload(20)))
+    for system in starmap.systems:
+        assert system.owner is kFactions.canonical(system.owner)
+        for fctCtl in system.availableFactions:
+            assert fctCtl.Name is kFactions.canonical(fctCtl.Name)
+
+
+@pytest.mark.parametrize('cls', [StarSystem, SlottedStarSystem])
+def test_genericDecodingSharesFactionNames(cls):
+    system = cls()
+    assert system._fromJsonGeneric(_decodedCopy({'owner': kFactions.Steiner,
+                                                 'factions': [{'Name': kFactions.Kurita}]}))
+    assert system.owner is kFactions.Steiner
+    assert system.availableFactions[0].Name is kFactions.Kurita
@@ -0,0 +1,66 @@
+from array import array
+
+import pytest
+
+from roguewarapi.data import ColumnarStarMap, FactionCodes, SlottedStarMap, StarMap
+
+
+@pytest.mark.parametrize('cls', [StarMap, SlottedStarMap], ids=['StarMap', 'SlottedStarMap'])
+def test_roundTripIsLossless(cls, readStarMap, starMapPayload):
+    payload = starMapPayload(200)
+    starmap = readStarMap(payload)
+    columnar = ColumnarStarMap.fromStarMap(starmap)
+    assert isinstance(columnar.players, array) and isinstance(columnar.ctlControl, array)
+    assert columnar.toStarMap(cls).toRawJson() == starmap.toRawJson()
+    assert ColumnarStarMap.fromJson(payload).toStarMap(cls).toRawJson() == starmap.toRawJson()
+
+
+def test_mixedValuesAreKept(readStarMap):
+    payload = {'starsystems': [
+        {'name': 'a', 'owner': 'Davion', 'Players': 2, 'factions': [{'Name': 'Davion', 'control': '0.50'},
+                                                                     {'Name': 'Liao', 'control': 2.5},
+                                                                     {'Name': 'Kurita'}]},
+        {'name': 'b', 'owner': 'Liao', 'Players': 1.5, 'immuneFromWar': True, 'factions': [{'Name': 'Liao', 'control': 7}]},
+        {'name': 'c'},
+    ]}
+    starmap = readStarMap(payload)
+    columnar = ColumnarStarMap.fromJson(payload)
+    assert isinstance(columnar.ctlControl, list) and isinstance(columnar.players, list)
+    restored = columnar.toStarMap()
+    assert restored.toRawJson() == starmap.toRawJson()
+    assert [type(fctCtl.control) for fctCtl in restored.findSystem('a').availableFactions] == [str, float, str]
+    assert restored.findSystem('b').Players == 1.5
+    assert columnar.controlOf(0) == [('Davion', '0.50', 0), ('Liao', 2.5, 0), ('Kurita', '', 0)]
+    assert columnar.controlOf(2) == []
+
+
+def test_filters():
+    payload = {'starsystems': [
+        {'name': 'a', 'owner': 'Davion', 'Players': 5, 'markerType': 3, 'factions': [{'Name': 'Liao', 'ActivePlayers': 2}]},
+        {'name': 'b', 'owner': 'Liao', 'Players': 1, 'markerType': 1, 'immuneFromWar': True},
+        {'name': 'c', 'owner': 'Davion', 'Players': 0, 'markerType': 2, 'factions': [{'Name': 'Liao', 'ActivePlayers': 1}]},
+    ]}
+    columnar = ColumnarStarMap.fromJson(payload)
+    assert columnar.rowOf('b') == 1 and columnar.rowOf('z') == -1
+    assert columnar.systemsByOwner('Davion') == ['a', 'c']
+    assert columnar.systemsByOwner('Kurita') == []
+    assert columnar.filterRows(owner='Davion', minPlayers=1) == [0]
+    assert columnar.filterRows(markerType=1) == [0, 1]
+    assert columnar.filterRows(immuneFromWar=False) == [0, 2]
+    assert columnar.filterRows() == [0, 1, 2]
+    assert columnar.countByOwner() == {'Davion': 2, 'Liao': 1}
+    assert columnar.playersByOwner() == {'Davion': 5, 'Liao': 1}
+    assert columnar.activePlayersByFaction() == {'Liao': 3}
+
+
+def test_aggregatesMatchTheStarMap(readStarMap, starMapPayload):
+    payload = starMapPayload(300)
+    starmap = readStarMap(payload)
+    codes = FactionCodes()
+    columnar = ColumnarStarMap.fromStarMap(starmap, codes)
+    assert columnar.factions is codes
+    for stats in starmap.factionLeaderboard():
+        assert columnar.countByOwner().get(stats.name, 0) == stats.systems
+        assert columnar.playersByOwner().get(stats.name, 0) == stats.players
+        assert columnar.activePlayersByFaction().get(stats.name, 0) == stats.activePlayers
+        assert columnar.systemsByOwner(stats.name) == [system.name for system in starmap.findSystemsByOwner(stats.name)]
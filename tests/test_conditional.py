@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from roguewarapi import AsyncRogueWarApi
+
+
+@pytest.fixture
+def server(stubServer, starMapPayload, constantsPayload):
+    return stubServer({'getmap': starMapPayload(50), 'getsystemstatic': constantsPayload(50)},
+                      etags={'getmap': '"map-1"', 'getsystemstatic': '"constants-1"'})
+
+
+@pytest.fixture
+def api(server, client):
+    return client(server, starMapTtl=0)
+
+
+def test_notModifiedReusesTheStarMap(server, api):
+    first = api.getStarMap()
+    second = api.getStarMap()
+    assert first is not None
+    assert second is first
+    assert server.notModified == 1
+
+
+def test_changedStarMapIsParsedAgain(server, api, starMapPayload):
+    first = api.getStarMap()
+    server.setRoute('getmap', starMapPayload(60), etag='"map-2"')
+    second = api.getStarMap()
+    assert second is not first
+    assert len(second.systems) == 60
+    assert server.notModified == 0
+
+
+def test_brokenBodyIsNotConfirmedByANotModified(server, api, starMapPayload):
+    first = api.getStarMap()
+    server.setRoute('getmap', b'{"starsystems": [', etag='"map-2"')
+    assert api.getStarMap() is None
+    server.setRoute('getmap', starMapPayload(60), etag='"map-2"')
+    second = api.getStarMap()
+    assert second is not first
+    assert len(second.systems) == 60
+    assert server.notModified == 0
+
+
+def test_brokenBodyIsNotConfirmedByANotModifiedAsync(server, client, starMapPayload):
+    async def run():
+        async with client(server, AsyncRogueWarApi, starMapTtl=0) as api:
+            first = await api.getStarMap()
+            server.setRoute('getmap', [], etag='"map-2"')
+            assert await api.getStarMap() is None
+            server.setRoute('getmap', starMapPayload(60), etag='"map-2"')
+            second = await api.getStarMap()
+            assert second is not first
+            assert len(second.systems) == 60
+
+    asyncio.run(run())
+    assert server.notModified == 0
+
+
+def test_notModifiedReusesTheConstants(server, api):
+    first = api.getSystemConstants()
+    second = api.getSystemConstants(bForce=True)
+    assert first is not None
+    assert second is first
+    assert server.notModified == 1
+
+
+def test_snapshotIsRevalidated(tmp_path, server, client, constantsPayload):
+    snapshotPath = str(tmp_path / 'constants.snapshot')
+    with client(server, starMapTtl=0, snapshotPath=snapshotPath) as api:
+        assert api.getSystemConstants() is not None
+    with client(server, starMapTtl=0, snapshotPath=snapshotPath) as api:
+        constants = api.getSystemConstants()
+        assert constants.snapshotTag.endswith('"constants-1"')
+        assert server.notModified == 1
+    server.setRoute('getsystemstatic', constantsPayload(60), etag='"constants-2"')
+    with client(server, starMapTtl=0, snapshotPath=snapshotPath) as api:
+        assert len(api.getSystemConstants().systemConstants) == 60
+        assert server.notModified == 1
+
+
+def test_snapshotOfAnotherServerIsIgnored(tmp_path, stubServer, starMapPayload, constantsPayload, client):
+    snapshotPath = str(tmp_path / 'constants.snapshot')
+    for _ in range(2):
+        server = stubServer({'getmap': starMapPayload(50), 'getsystemstatic': constantsPayload(50)},
+                            etags={'getsystemstatic': '"constants-1"'})
+        with client(server, starMapTtl=0, snapshotPath=snapshotPath) as api:
+            assert api.getSystemConstants() is not None
+        assert server.notModified == 0
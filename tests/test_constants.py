@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from roguewarapi import AsyncRogueWarApi
+from roguewarapi.data import StarMapConstants
+
+
+@pytest.fixture
+def server(stubServer, constantsPayload):
+    return stubServer({'getsystemstatic': constantsPayload(200), 'getglobaldata': {'SupportRadius': 30}})
+
+
+def _adjacency(constants):
+    return [list(const.adjacentSystems) for const in constants.systemConstants]
+
+
+def test_copyHasItsOwnAdjacency(constantsPayload):
+    constants = StarMapConstants()
+    constants.fromJson(constantsPayload(100))
+    constants.mapAdjacents(50)
+    before = _adjacency(constants)
+    copied = constants.copy()
+    copied.mapAdjacents(20)
+    assert _adjacency(constants) == before
+    assert _adjacency(copied) != before
+    assert copied.findSystem(constants.systemConstants[0].name) is copied.systemConstants[0]
+
+
+def test_clearGraphCacheSeesMovedSystems():
+    constants = StarMapConstants()
+    constants.fromJson({'Coordinates': [{'name': 'a', 'posx': 0, 'posy': 0}, {'name': 'b', 'posx': 10, 'posy': 0}]})
+    constants.mapAdjacents(20)
+    assert constants.findSystemsInRadius(0, 0, 20) == constants.systemConstants
+    assert constants.findSystem('a').adjacentSystems == ['b']
+    constants.findSystem('b').posx = 1000
+    constants.clearGraphCache()
+    constants.mapAdjacents(20)
+    assert constants.findSystem('a').adjacentSystems == []
+    assert constants.findSystemsInRadius(0, 0, 20) == [constants.findSystem('a')]
+
+
+def test_remapReplacesTheConstants(server, client):
+    api = client(server)
+    first = api.getSystemConstants()
+    before = _adjacency(first)
+    assert first.adjacencyGraph.radius == 50
+    api.getGlobalData()
+    second = api.getSystemConstants()
+    assert second is not first
+    assert second.adjacencyGraph.radius == 30
+    assert first.adjacencyGraph.radius == 50
+    assert _adjacency(first) == before
+
+
+def test_remapReplacesTheConstantsAsync(server, client):
+    async def run():
+        async with client(server, AsyncRogueWarApi) as api:
+            first = await api.getSystemConstants()
+            before = _adjacency(first)
+            await api.getGlobalData()
+            second = await api.getSystemConstants()
+            assert second is not first
+            assert second.adjacencyGraph.radius == 30
+            assert _adjacency(first) == before
+
+    asyncio.run(run())
+
+
+def test_concurrentConstantsUpdatesAreCoalescedAsync(server, client):
+    async def run():
+        async with client(server, AsyncRogueWarApi) as api:
+            results = await asyncio.gather(*(api.getSystemConstants() for _ in range(20)))
+            assert results[0] is not None
+            assert all(result is results[0] for result in results)
+            requests = server.requests
+            forced = await asyncio.gather(*(api.getSystemConstants(bForce=True) for _ in range(20)))
+            assert all(result is forced[0] for result in forced)
+            return server.requests - requests
+
+    assert asyncio.run(run()) == 1
+    assert server.requests - server.authRequests == 3
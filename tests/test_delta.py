@@ -0,0 +1,112 @@
+import copy
+
+from roguewarapi.data import StarMapDelta
+
+
+def _changed(payload):
+    after = copy.deepcopy(payload)
+    systems = after['starsystems']
+    systems[0]['owner'] = 'Steiner'
+    systems[1]['Players'] += 3
+    systems[1]['markerType'] = 4
+    systems[2]['factions'][0]['control'] = '0.50'
+    systems[3]['factions'][0]['control'] += 7
+    systems[3]['factions'].append({'Name': 'ComStar', 'control': 1, 'ActivePlayers': 2})
+    systems[4]['factions'].reverse()
+    systems[5]['factions'] = systems[5]['factions'][:1]
+    systems[6]['immuneFromWar'] = not systems[6]['immuneFromWar']
+    del systems[7]
+    systems.append({'Players': 1, 'name': 'New', 'owner': 'Davion', 'immuneFromWar': False, 'markerType': 0,
+                    'factions': [{'Name': 'Davion', 'control': 100, 'ActivePlayers': 1}]})
+    return after
+
+
+def test_diffDescribesTheChanges(readStarMap, starMapPayload):
+    before = starMapPayload(20, factionsPerSystem=4)
+    old = readStarMap(before)
+    after = _changed(before)
+    delta = old.diff(readStarMap(after))
+    changes = {change.name: change for change in delta.changedSystems}
+    first = before['starsystems'][0]
+    assert delta.ownershipFlips == [(first['name'], first['owner'], 'Steiner')]
+    assert changes[before['starsystems'][1]['name']].Players == before['starsystems'][1]['Players'] + 3
+    control = changes[before['starsystems'][3]['name']].controlChanges[0]
+    assert control.controlDelta == 7
+    assert [system.name for system in delta.addedSystems] == ['New']
+    assert delta.removed == [before['starsystems'][7]['name']]
+    assert delta.order is None
+    assert len(delta) == 9
+
+
+def test_applyReproducesTheNewMap(readStarMap, starMapPayload):
+    before = starMapPayload(20, factionsPerSystem=4)
+    after = _changed(before)
+    old = readStarMap(before)
+    old.apply(old.diff(readStarMap(after)))
+    assert old.toRawJson() == after
+    assert old.findSystem('New').Players == 1
+    assert old.findSystem(before['starsystems'][7]['name']) is None
+    assert old.diff(readStarMap(after)).isEmpty
+
+
+def test_deltaSurvivesAJsonRoundTrip(readStarMap, starMapPayload):
+    before = starMapPayload(20, factionsPerSystem=4)
+    after = _changed(before)
+    delta = readStarMap(before).diff(readStarMap(after))
+    restored = StarMapDelta()
+    assert restored.fromJson(delta.toJson())
+    assert restored.toRawJson() == delta.toRawJson()
+    old = readStarMap(before)
+    old.apply(restored)
+    assert old.toRawJson() == after
+
+
+def test_reorderedSystemsAndDuplicateFactions(readStarMap):
+    before = {'starsystems': [
+        {'name': 'a', 'owner': 'Davion', 'factions': [{'Name': 'Davion', 'control': 10}, {'Name': 'Davion', 'control': 20}]},
+        {'name': 'b', 'owner': 'Liao', 'factions': []},
+        {'name': 'c', 'owner': 'Kurita', 'factions': []},
+    ]}
+    after = copy.deepcopy(before)
+    after['starsystems'].reverse()
+    after['starsystems'][2]['factions'][1]['control'] = 30
+    old = readStarMap(before)
+    delta = old.diff(readStarMap(after))
+    assert delta.order == ['c', 'b', 'a']
+    control, = delta.changedSystems[0].controlChanges
+    assert (control.Name, control.occurrence, control.control) == ('Davion', 1, 30)
+    restored = StarMapDelta()
+    assert restored.fromJson(delta.toJson())
+    old.apply(restored)
+    assert old.toRawJson() == readStarMap(after).toRawJson()
+    assert [system.name for system in old.systems] == ['c', 'b', 'a']
+    assert old.findSystem('a').availableFactions[1].control == 30
+
+
+def test_identicalMapsGiveAnEmptyDelta(readStarMap, starMapPayload):
+    payload = starMapPayload(20)
+    delta = readStarMap(payload).diff(readStarMap(payload))
+    assert delta.isEmpty
+    assert not len(delta)
+
+
+def test_changesToNoneRoundTrip(readStarMap):
+    before = {'starsystems': [{'name': 'a', 'owner': 'Davion', 'Players': 3, 'markerType': 1,
+                               'factions': [{'Name': 'Davion', 'control': 60, 'ActivePlayers': 2}]}]}
+    after = {'starsystems': [{'name': 'a', 'owner': None, 'Players': None, 'markerType': 1,
+                              'factions': [{'Name': 'Davion', 'control': None, 'ActivePlayers': None}]}]}
+    new = readStarMap(after)
+    delta = readStarMap(before).diff(new)
+    change, = delta.changedSystems
+    assert sorted(change.changed) == ['Players', 'owner']
+    assert delta.ownershipFlips == [('a', 'Davion', None)]
+    assert sorted(change.controlChanges[0].changed) == ['ActivePlayers', 'control']
+    for applied in (delta, StarMapDelta()):
+        if applied is not delta:
+            assert applied.fromJson(delta.toJson())
+        old = readStarMap(before)
+        old.apply(applied)
+        assert old.toRawJson() == new.toRawJson()
+        assert old.findSystem('a').Players is None
+        assert old.findSystem('a').availableFactions[0].control is None
+        assert old.diff(new).isEmpty
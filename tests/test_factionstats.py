@@ -0,0 +1,99 @@
+import copy
+
+import pytest
+
+from roguewarapi.data import LazyStarMap, SlottedStarMap, StarMap, StarSystem
+
+_MapClasses = [StarMap, SlottedStarMap, LazyStarMap]
+
+
+def _holds(control):
+    try:
+        return float(control) != 0
+    except (TypeError, ValueError):
+        return False
+
+
+def _count(payload, faction):
+    # the totals counted straight from the payload, one faction at a time
+    systems = [system for system in payload['starsystems'] if system['owner'] == faction]
+    return {
+        'name': faction,
+        'systems': len(systems),
+        'players': sum(system.get('Players', 0) for system in systems),
+        'activePlayers': sum(fctCtl.get('ActivePlayers', 0) for system in payload['starsystems']
+                             for fctCtl in system.get('factions', ()) if fctCtl['Name'] == faction),
+        'contestedSystems': sum(1 for system in systems if any(
+            fctCtl['Name'] != faction and _holds(fctCtl.get('control')) for fctCtl in system.get('factions', ()))),
+    }
+
+
+def _factions(payload):
+    factions = set()
+    for system in payload['starsystems']:
+        factions.add(system['owner'])
+        factions.update(fctCtl['Name'] for fctCtl in system.get('factions', ()))
+    return factions
+
+
+@pytest.fixture
+def payload(starMapPayload):
+    payload = starMapPayload(300, factionsPerSystem=4)
+    # control that is held, a string, empty or missing
+    systems = payload['starsystems']
+    systems[0]['factions'].append({'Name': 'ComStar', 'control': '0.50', 'ActivePlayers': 1})
+    systems[1]['factions'].append({'Name': 'ComStar', 'control': '', 'ActivePlayers': 2})
+    systems[2]['factions'].append({'Name': 'ComStar', 'control': None})
+    systems[3]['factions'].append({'Name': 'ComStar', 'control': 0})
+    return payload
+
+
+@pytest.mark.parametrize('cls', _MapClasses)
+def test_statsMatchACount(cls, payload, readStarMap):
+    starmap = readStarMap(payload, cls)
+    for faction in _factions(payload) | {'missing'}:
+        assert vars(starmap.factionStats(faction)) == _count(payload, faction), faction
+
+
+@pytest.mark.parametrize('sortBy', ['systems', 'players', 'activePlayers', 'contestedSystems'])
+def test_leaderboardMatchesACount(sortBy, payload, readStarMap):
+    leaderboard = readStarMap(payload).factionLeaderboard(sortBy)
+    assert sorted(stats.name for stats in leaderboard) == sorted(_factions(payload))
+    for stats in leaderboard:
+        assert vars(stats) == _count(payload, stats.name)
+    ranked = [getattr(stats, sortBy) for stats in leaderboard]
+    assert ranked == sorted(ranked, reverse=True)
+
+
+def test_addedAndRemovedSystemsAreCounted(payload, readStarMap):
+    starmap = readStarMap(payload)
+    owner = payload['starsystems'][0]['owner']
+    before = starmap.factionStats(owner).systems
+    added = {'name': 'New', 'owner': owner, 'Players': 7,
+             'factions': [{'Name': owner, 'control': 60, 'ActivePlayers': 3}, {'Name': 'ComStar', 'control': 40}]}
+    system = StarSystem()
+    assert system.fromJson(copy.deepcopy(added))
+    starmap.addSystem(system)
+    payload['starsystems'].append(added)
+    assert starmap.factionStats(owner).systems == before + 1
+    assert vars(starmap.factionStats(owner)) == _count(payload, owner)
+    del starmap.systems[0]
+    del payload['starsystems'][0]
+    assert vars(starmap.factionStats(owner)) == _count(payload, owner)
+
+
+def test_inPlaceEditsNeedReindex(payload, readStarMap):
+    starmap = readStarMap(payload)
+    system = starmap.systems[0]
+    owner = system.owner
+    first = system.availableFactions[0].Name
+    before = vars(starmap.factionStats(owner)).copy()
+    system.Players += 10
+    system.availableFactions[0].ActivePlayers += 5
+    payload['starsystems'][0]['Players'] += 10
+    payload['starsystems'][0]['factions'][0]['ActivePlayers'] += 5
+    # the totals are cached until the map is reindexed
+    assert vars(starmap.factionStats(owner)) == before
+    starmap.reindex()
+    assert vars(starmap.factionStats(owner)) == _count(payload, owner)
+    assert vars(starmap.factionStats(first)) == _count(payload, first)
@@ -0,0 +1,69 @@
+"""
+A :class:`LazyStarMap` must behave exactly like a :class:`StarMap` read from the same payload, whichever of its
+members have been decoded
+"""
+import copy
+
+import pytest
+
+from roguewarapi.data import LazyStarMap, LazyStarSystem, StarMap, StarSystem
+
+
+def _maps(payload):
+    lazy = LazyStarMap()
+    eager = StarMap()
+    assert lazy.fromJson(copy.deepcopy(payload)) and eager.fromJson(copy.deepcopy(payload))
+    return lazy, eager
+
+
+def test_toJsonMatches(starMapPayload):
+    payload = starMapPayload(50)
+    lazy, eager = _maps(payload)
+    assert lazy.toRawJson() == eager.toRawJson() == payload
+    assert lazy.toJson() == eager.toJson()
+
+
+def test_toJsonMatchesAfterPartialDecoding(starMapPayload):
+    lazy, eager = _maps(starMapPayload(50))
+    lazy.systems[0].Players
+    lazy.systems[1].availableFactions
+    assert lazy.toRawJson() == eager.toRawJson()
+
+
+def test_strMatchesWhicheverIsReadFirst(starMapPayload):
+    lazy, eager = _maps(starMapPayload(5))
+    for system, other in zip(lazy.systems, eager.systems):
+        assert str(system) == str(other)
+    assert 'Players : 0' in str(LazyStarSystem())
+
+
+def test_equalityComparesEveryMember(starMapPayload):
+    lazy, eager = _maps(starMapPayload(5))
+    for system, other in zip(lazy.systems, eager.systems):
+        assert system == other and other == system
+    eager.systems[0].Players += 1
+    assert lazy.systems[0] != eager.systems[0]
+    assert eager.systems[0] != lazy.systems[0]
+    assert LazyStarSystem() == StarSystem()
+
+
+def test_factionStatsMatch(starMapPayload):
+    lazy, eager = _maps(starMapPayload(200))
+    assert [vars(stats) for stats in lazy.factionLeaderboard()] == [vars(stats) for stats in eager.factionLeaderboard()]
+
+
+@pytest.mark.parametrize('cls', [StarMap, LazyStarMap], ids=['StarMap', 'LazyStarMap'])
+def test_applyRebuildsAddedSystems(cls, starMapPayload):
+    before = starMapPayload(10)
+    after = copy.deepcopy(before)
+    del after['starsystems'][3]
+    after['starsystems'].append({'Players': 1, 'immuneFromWar': True, 'markerType': 2, 'name': 'New', 'owner': 'Davion',
+                                 'factions': [{'Name': 'Davion', 'control': 100, 'ActivePlayers': 1}]})
+    after['starsystems'][0]['Players'] += 4
+    old = cls()
+    new = cls()
+    assert old.fromJson(copy.deepcopy(before)) and new.fromJson(copy.deepcopy(after))
+    old.apply(old.diff(new))
+    assert old.toRawJson() == after
+    added = old.findSystem('New')
+    assert added.Players == 1 and added.immuneFromWar and added.markerType == 2
@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+import pytest
+
+from roguewarapi import AsyncRogueWarApi, CallbackMetrics, MetricsRecorder, RogueWarApi
+
+_Ttl = 60
+_Grace = 300
+
+
+class _Recording(CallbackMetrics):
+    """
+    keeps every timing and count in the order they were reported
+    """
+
+    def __init__(self):
+        super().__init__(lambda phase, seconds, tags: self.timings.append((phase, tags)),
+                         lambda name, value, tags: self.counts.append((name, value, tags)))
+        self.timings = []
+        self.counts = []
+
+    def phases(self):
+        return [phase for phase, tags in self.timings]
+
+    def events(self):
+        return [name for name, value, tags in self.counts]
+
+    def take(self):
+        phases, events = self.phases(), self.events()
+        self.timings, self.counts = [], []
+        return phases, events
+
+
+@pytest.fixture
+def server(stubServer, starMapPayload, constantsPayload):
+    return stubServer({'getmap': starMapPayload(50), 'getsystemstatic': constantsPayload(50)},
+                      etags={'getmap': '"map-1"'})
+
+
+@pytest.fixture
+def metered(server, client):
+    """
+    :return: a function making a client that reports to `metrics`, of the class given as `cls`
+    """
+    def make(metrics, cls=RogueWarApi):
+        return client(server, cls, metrics=metrics, starMapTtl=_Ttl, staleWhileRevalidate=True, starMapGrace=_Grace)
+    return make
+
+
+def _waitForRevalidation(api, recording):
+    deadline = time.monotonic() + 10
+    while 'notModified' not in recording.events() or api._flights.inFlight(api._kStarMapCacheKey):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_starMapPhasesAndCounts(clock, server, metered):
+    recording = _Recording()
+    api = metered(recording)
+    # miss, the first request goes without a token and is rejected
+    assert api.getStarMap() is not None
+    assert recording.take() == (['connect', 'request', 'request', 'decode', 'request', 'decode', 'construct',
+                                 'getStarMap'], ['cache.miss'])
+    # hit
+    api.getStarMap()
+    assert recording.take() == (['getStarMap'], ['cache.hit'])
+    # stale, the revalidation in the background is answered with 304
+    clock.now += _Ttl
+    api.getStarMap()
+    _waitForRevalidation(api, recording)
+    phases, events = recording.take()
+    assert sorted(phases) == ['getStarMap', 'request']
+    assert events == ['cache.stale', 'notModified']
+    # expired past the grace period, fetched again and answered with 304
+    clock.now += _Ttl + _Grace
+    api.getStarMap()
+    assert recording.take() == (['request', 'getStarMap'], ['cache.miss', 'notModified'])
+    assert server.notModified == 2
+
+
+def test_requestsAreTagged(clock, metered):
+    recording = _Recording()
+    api = metered(recording)
+    api.getStarMap()
+    api.getStarMap()
+    assert recording.timings[0] == ('connect', {'host': '127.0.0.1'})
+    assert recording.timings[1:] == [('request', {'method': 'GET', 'uri': 'getmap'}),
+                                     ('request', {'method': 'POST', 'uri': 'botauth'}), ('decode', {'uri': 'botauth'}),
+                                     ('request', {'method': 'GET', 'uri': 'getmap'}), ('decode', {'uri': 'getmap'}),
+                                     ('construct', {'kind': 'StarMap'}), ('getStarMap', {}), ('getStarMap', {})]
+    assert [tags for name, value, tags in recording.counts] == [{'key': 'kStarMap'}] * 2
+
+
+def test_constantsPhases(metered):
+    recording = _Recording()
+    api = metered(recording)
+    assert api._ensureAuthToken()
+    recording.take()
+    assert api.getSystemConstants() is not None
+    assert recording.take() == (['request', 'decode', 'construct', 'adjacency', 'getSystemConstants'], [])
+    assert recording.timings == []
+
+
+def test_recorderTotals(clock, metered):
+    recorder = MetricsRecorder(byTag='uri')
+    with metered(recorder) as api:
+        api.getStarMap()
+        api.getStarMap()
+        clock.now += _Ttl + _Grace
+        api.getStarMap()
+    phases = recorder.phases()
+    assert {key: stats.count for key, stats in phases.items()} == {
+        'connect': 1, 'request[botauth]': 1, 'decode[botauth]': 1, 'request[getmap]': 3, 'decode[getmap]': 1,
+        'construct': 1, 'getStarMap': 3}
+    assert all(0 <= stats.min <= stats.mean <= stats.max for stats in phases.values())
+    assert recorder.counts() == {'cache.miss': 2, 'cache.hit': 1, 'notModified[getmap]': 1}
+    recorder.reset()
+    assert recorder.phases() == {} and recorder.counts() == {}
+
+
+def test_starMapPhasesAndCountsAsync(clock, server, metered):
+    recording = _Recording()
+
+    async def run():
+        async with metered(recording, AsyncRogueWarApi) as api:
+            # miss, the first request goes without a token and is rejected
+            assert await api.getStarMap() is not None
+            assert recording.take() == (['connect', 'request', 'request', 'decode', 'request', 'decode', 'construct',
+                                         'getStarMap'], ['cache.miss'])
+            # hit
+            await api.getStarMap()
+            assert recording.take() == (['getStarMap'], ['cache.hit'])
+            # stale, the revalidation in the background is answered with 304
+            clock.now += _Ttl
+            await api.getStarMap()
+            await api._starMapTask
+            assert recording.take() == (['getStarMap', 'request'], ['cache.stale', 'notModified'])
+            # expired past the grace period, fetched again and answered with 304
+            clock.now += _Ttl + _Grace
+            await api.getStarMap()
+            assert recording.take() == (['request', 'getStarMap'], ['cache.miss', 'notModified'])
+            # constants
+            assert await api.getSystemConstants() is not None
+            assert recording.take() == (['request', 'decode', 'construct', 'adjacency', 'getSystemConstants'], [])
+
+    asyncio.run(run())
+    assert server.notModified == 2
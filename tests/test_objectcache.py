@@ -0,0 +1,131 @@
+import pytest
+
+from roguewarapi.data import CacheManager
+
+
+def test_leastRecentlyUsedIsEvicted(clock):
+    cache = CacheManager(maxEntries=2)
+    cache.placeCacheItem('a', 1)
+    cache.placeCacheItem('b', 2)
+    assert cache.getCacheItem('a') == 1
+    cache.placeCacheItem('c', 3)
+    assert cache.getCacheItem('b') is None
+    assert cache.getCacheItem('a') == 1
+    assert cache.getCacheItem('c') == 3
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.entries == 2
+
+
+def test_byteLimitEvicts(clock):
+    cache = CacheManager(maxBytes=10, sizeOf=len)
+    cache.placeCacheItem('a', 'xxxx')
+    cache.placeCacheItem('b', 'xxxx')
+    assert cache.stats().bytes == 8
+    cache.placeCacheItem('c', 'xxxx')
+    stats = cache.stats()
+    assert (stats.entries, stats.bytes, stats.evictions) == (2, 8, 1)
+    assert cache.getCacheItem('a') is None
+    cache.placeCacheItem('d', 'x' * 11)
+    stats = cache.stats()
+    assert (stats.entries, stats.bytes, stats.evictions) == (0, 0, 4)
+
+
+def test_replacingAnItemKeepsTheByteCount(clock):
+    cache = CacheManager(maxBytes=100, sizeOf=len)
+    cache.placeCacheItem('a', 'xxxx')
+    cache.placeCacheItem('a', 'xx')
+    assert cache.stats().bytes == 2
+    assert cache.removeCacheItem('a')
+    assert not cache.removeCacheItem('a')
+    assert cache.stats().bytes == 0
+
+
+def test_expiredItemIsAMiss(clock):
+    cache = CacheManager()
+    cache.placeCacheItem('a', 1, expire=10)
+    assert cache.getCacheItem('a') == 1
+    clock.now += 10
+    assert cache.getCacheItem('a') is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.expirations, stats.entries) == (1, 1, 1, 0)
+
+
+def test_staleEntryIsKeptUntilItsWindowPasses(clock):
+    cache = CacheManager()
+    cache.placeCacheItem('a', 1, expire=10, stale=5)
+    clock.now += 12
+    entry = cache.getCacheEntry('a')
+    assert entry.data == 1
+    assert entry.isExpired(clock.now)
+    assert cache.getCacheItem('a') is None
+    clock.now += 3
+    assert cache.getCacheEntry('a') is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.expirations) == (0, 3, 1)
+
+
+def test_peekIsNotCounted(clock):
+    cache = CacheManager(maxEntries=2)
+    cache.placeCacheItem('a', 1, expire=10)
+    cache.placeCacheItem('b', 2)
+    assert cache.peekCacheItem('a') == 1
+    assert cache.peekCacheItem('c') is None
+    cache.placeCacheItem('c', 3)
+    assert cache.peekCacheItem('a') is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (0, 0)
+
+
+def test_placingPurgesExpiredItems(clock):
+    cache = CacheManager()
+    cache.placeCacheItem('a', 1, expire=10)
+    cache.placeCacheItem('b', 2, expire=30)
+    clock.now += 20
+    cache.placeCacheItem('c', 3)
+    assert len(cache) == 2
+    assert cache.stats().expirations == 1
+    assert cache.purgeExpired() == 0
+
+
+def test_hitRateAndReset(clock):
+    cache = CacheManager(sizeOf=len, maxBytes=100)
+    assert cache.stats().hitRate == 0.0
+    cache.placeCacheItem('a', 'xxx')
+    cache.getCacheItem('a')
+    cache.getCacheItem('a')
+    cache.getCacheItem('b')
+    assert cache.stats().hitRate == pytest.approx(2 / 3)
+    cache.resetStats()
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries, stats.bytes) == (0, 0, 1, 3)
+
+
+@pytest.fixture
+def server(stubServer, starMapPayload):
+    return stubServer({'getmap': starMapPayload(50)})
+
+
+def test_clientCachesTheStarMap(server, client):
+    api = client(server)
+    assert api._ensureAuthToken()
+    first = api.getStarMap()
+    assert api.getStarMap() is first
+    assert api.getStarMap() is first
+    assert server.requests - server.authRequests == 1
+    stats = api.cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (2, 1, 1)
+
+
+def test_expiredStarMapIsOneMiss(clock, server, client):
+    api = client(server)
+    assert api._ensureAuthToken()
+    api.getStarMap()
+    stats = api.cache.stats()
+    assert (stats.hits, stats.misses) == (0, 1)
+    clock.now += api.starMapTtl
+    api.getStarMap()
+    api.getStarMap()
+    stats = api.cache.stats()
+    assert (stats.hits, stats.misses) == (1, 2)
+    assert server.requests - server.authRequests == 2
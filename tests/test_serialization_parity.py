@@ -0,0 +1,96 @@
+"""
+The generated (de)serializers must produce exactly the same results as the generic implementation and the original
+reflection based one
+"""
+import json
+
+import pytest
+
+from roguewarapi.data import (BaseDataObject, SubObjectMap, StarMap, StarMapConstants, GlobalData, FactionStats,
+                              StarSystem)
+
+from benchmarks.legacy import genericSerialization, legacySerialization
+
+
+class _Blob(BaseDataObject):
+    JSON_Type = 'Blob'
+    _B64Memebers = ['data']
+    _useStdDict = False
+
+    def __init__(self):
+        self.data = b''
+        self.label = None
+
+
+class _Wrapper(BaseDataObject):
+    JSON_Type = 'Wrapper'
+    _ExcludeFromMemebers = ['skipped']
+    _SubObjectMapping = [
+        SubObjectMap(_Blob, '_blobs', 'blobs'),
+        SubObjectMap(_Blob, '_single', 'single', bol_list=False),
+        SubObjectMap(StarSystem, '_system', bol_list=False),
+    ]
+
+    def __init__(self):
+        self.count = 0
+        self.skipped = 'never serialized'
+        self._blobs = []
+        self._single = None
+        self._system = None
+
+
+_BlobPayload = {'data': 'aGVsbG8=', 'label': 'greeting'}
+
+# a payload given as a string names the conftest fixture that builds it
+_Cases = [
+    ('starmap', StarMap, 'starMapPayload'),
+    ('empty starmap', StarMap, {}),
+    ('starmap missing fields', StarMap, {'starsystems': [{'name': 'Solo'}, {'factions': [{}]}]}),
+    ('constants', StarMapConstants, 'constantsPayload'),
+    ('global data', GlobalData, {'SupportRadius': 50}),
+    ('faction stats', FactionStats, {'name': 'Davion', 'systems': 3}),
+    ('base64 and ordered dicts', _Blob, _BlobPayload),
+    ('bad base64', _Blob, {'data': 'not base64!'}),
+    ('nested objects', _Wrapper, {'count': 2, 'skipped': 'x', 'blobs': [_BlobPayload, {}], 'single': {'Blob': _BlobPayload},
+                                  'StarSystem': {'StarSystem': {'name': 'Nested', 'owner': 'Davion'}}}),
+    ('nested objects missing', _Wrapper, {'count': 1}),
+]
+
+
+def _dump(obj):
+    # base64 members serialize to bytes, which json can't encode, so compare the raw structure too
+    try:
+        return obj.toJson()
+    except TypeError as e:
+        return repr(e)
+
+
+def _decoded(request, payload):
+    # a copy as the client would have decoded it
+    if isinstance(payload, str):
+        payload = request.getfixturevalue(payload)(500)
+    return json.loads(json.dumps(payload))
+
+
+def _roundTrip(cls, payload):
+    obj = cls()
+    result = obj.fromJson(payload)
+    return result, repr(obj.toRawJson()), _dump(obj), str(obj)
+
+
+@pytest.mark.parametrize('cls, payload', [case[1:] for case in _Cases], ids=[case[0] for case in _Cases])
+def test_generatedMatchesGeneric(cls, payload, request):
+    payload = _decoded(request, payload)
+    generated = _roundTrip(cls, payload)
+    with genericSerialization():
+        generic = _roundTrip(cls, payload)
+    assert generated == generic
+
+
+@pytest.mark.parametrize('cls, payload', [case[1:] for case in _Cases], ids=[case[0] for case in _Cases])
+def test_generatedMatchesLegacy(cls, payload, request):
+    payload = _decoded(request, payload)
+    generated = _roundTrip(cls, payload)
+    with legacySerialization():
+        legacy = _roundTrip(cls, payload)
+    assert generated == legacy
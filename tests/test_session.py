@@ -0,0 +1,30 @@
+import pytest
+
+
+@pytest.fixture
+def server(stubServer, starMapPayload):
+    return stubServer({'getmap': starMapPayload(50)})
+
+
+def test_requestsReuseOneConnection(server, client):
+    with client(server, starMapTtl=0) as api:
+        for _ in range(5):
+            assert api.getStarMap() is not None
+    # authentication, the rejected first request and its retry, then four more maps
+    assert server.requests == 7
+    assert server.connections == 1
+
+
+def test_keepAliveOffOpensAConnectionPerRequest(server, client):
+    with client(server, starMapTtl=0, keepAlive=False) as api:
+        for _ in range(3):
+            assert api.getStarMap() is not None
+    assert server.connections == server.requests
+
+
+def test_closedClientReconnects(server, client):
+    with client(server, starMapTtl=0) as api:
+        assert api.getStarMap() is not None
+        api.close()
+        assert api.getStarMap() is not None
+    assert server.connections == 2
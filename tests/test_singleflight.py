@@ -0,0 +1,100 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from roguewarapi.data import SingleFlight
+
+_Threads = 20
+
+
+def _waitForFlight(flights, key):
+    while not flights.inFlight(key):
+        threading.Event().wait(0.001)
+
+
+def test_concurrentCallsShareOneResult():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def func():
+        calls.append(1)
+        release.wait()
+        return object()
+
+    with ThreadPoolExecutor(max_workers=_Threads) as executor:
+        leader = executor.submit(flights.do, 'key', func)
+        _waitForFlight(flights, 'key')
+        followers = [executor.submit(flights.do, 'key', func) for _ in range(_Threads - 1)]
+        release.set()
+        results = [leader.result()] + [future.result() for future in followers]
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert not flights.inFlight('key')
+
+
+def test_errorIsRaisedToEveryCaller():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def func():
+        release.wait()
+        raise KeyError('failed')
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(flights.do, 'key', func)
+        _waitForFlight(flights, 'key')
+        follower = executor.submit(flights.do, 'key', func)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(KeyError):
+                future.result()
+    assert not flights.inFlight('key')
+
+
+def test_differentKeysDontWaitForEachOther():
+    flights = SingleFlight()
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        blocked = executor.submit(flights.do, 'a', release.wait)
+        _waitForFlight(flights, 'a')
+        assert flights.do('b', lambda: 'b') == 'b'
+        release.set()
+        assert blocked.result() is True
+
+
+def test_sequentialCallsRunAgain():
+    flights = SingleFlight()
+    calls = []
+    flights.do('key', calls.append, 1)
+    flights.do('key', calls.append, 2)
+    assert calls == [1, 2]
+
+
+def test_doInBackgroundSkipsARunningCall():
+    flights = SingleFlight()
+    release = threading.Event()
+    done = threading.Event()
+    assert flights.doInBackground('key', lambda: (release.wait(), done.set()))
+    _waitForFlight(flights, 'key')
+    assert not flights.doInBackground('key', done.set)
+    release.set()
+    assert done.wait(5)
+
+
+def test_concurrentStarMapFetchesAreCoalesced(stubServer, client, starMapPayload):
+    server = stubServer({'getmap': starMapPayload(2000)})
+    api = client(server, poolSize=_Threads)
+    assert api._ensureAuthToken()
+    barrier = threading.Barrier(_Threads)
+
+    def fetch(_):
+        barrier.wait()
+        return api.getStarMap()
+
+    with ThreadPoolExecutor(max_workers=_Threads) as executor:
+        results = list(executor.map(fetch, range(_Threads)))
+    assert results[0] is not None
+    assert all(result is results[0] for result in results)
+    assert server.requests - server.authRequests == 1
@@ -0,0 +1,33 @@
+import pytest
+
+from roguewarapi.data import (FactionControl, FactionControlBase, SlottedFactionControl, SlottedStarMap,
+                              SlottedStarMapConstants, SlottedStarSystem, SlottedStarSystemConst, StarMap,
+                              StarMapConstants, StarSystem, StarSystemBase, StarSystemConst, StarSystemConstBase)
+
+_Pairs = [
+    (StarSystemBase, StarSystem, SlottedStarSystem),
+    (FactionControlBase, FactionControl, SlottedFactionControl),
+    (StarSystemConstBase, StarSystemConst, SlottedStarSystemConst),
+]
+
+
+@pytest.mark.parametrize('base, cls, slottedCls', _Pairs, ids=[pair[1].__name__ for pair in _Pairs])
+def test_slottedClassIsASibling(base, cls, slottedCls):
+    obj = cls()
+    slotted = slottedCls()
+    assert isinstance(obj, base) and isinstance(slotted, base)
+    assert not isinstance(obj, slottedCls)
+    assert not isinstance(slotted, cls)
+    assert not hasattr(slotted, '__dict__')
+
+
+@pytest.mark.parametrize('cls, slottedCls, payloadFixture', [
+    (StarMap, SlottedStarMap, 'starMapPayload'),
+    (StarMapConstants, SlottedStarMapConstants, 'constantsPayload'),
+], ids=['StarMap', 'StarMapConstants'])
+def test_slottedRoundTripMatches(cls, slottedCls, payloadFixture, request):
+    payload = request.getfixturevalue(payloadFixture)(50)
+    obj = cls()
+    slotted = slottedCls()
+    assert obj.fromJson(payload) and slotted.fromJson(payload)
+    assert slotted.toRawJson() == obj.toRawJson()
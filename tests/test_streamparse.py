@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+import pytest
+
+from roguewarapi import AsyncRogueWarApi
+from roguewarapi.data import SlottedStarSystem
+from roguewarapi.data.streamparse import aiterJsonArray, aiterStarSystems, iterJsonArray, iterStarSystems
+
+
+def _chunks(data, size):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+async def _received(chunks):
+    for chunk in chunks:
+        await asyncio.sleep(0)
+        yield chunk
+
+
+async def _collect(values):
+    return [value async for value in values]
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 1 << 20])
+def test_systemsMatchTheWholeDocumentAtAnyChunkSize(size, starMapPayload, readStarMap):
+    payload = starMapPayload(40)
+    expected = readStarMap(payload).toRawJson()['starsystems']
+    data = json.dumps(payload, indent=1).encode('utf-8')
+    systems = list(iterStarSystems(_chunks(data, size)))
+    assert [system._toJson() for system in systems] == expected
+
+
+@pytest.mark.parametrize('size', [1, 5, 1 << 20])
+def test_arrayAmongOtherKeys(size):
+    document = '{"version": 12.5, "meta": {"starsystems": [9]}, "starsystems": [1, 2.5, "x,]", {"a": [1]}, null],' \
+               ' "after": [true]}'
+    assert list(iterJsonArray(_chunks(document, size), 'starsystems')) == [1, 2.5, 'x,]', {'a': [1]}, None]
+    assert list(iterJsonArray(_chunks(document, size), 'missing')) == []
+
+
+def test_numbersSplitAcrossChunks():
+    # a number ending a chunk may continue in the next one
+    assert list(iterJsonArray(['[12', '34, 5', '.25', ']'], None)) == [1234, 5.25]
+    assert list(iterJsonArray(['[2.', '5, 1', 'e3, 1E', '-2, -', '4]'], None)) == [2.5, 1e3, 1e-2, -4]
+
+
+def test_multibyteCharactersSplitAcrossChunks():
+    data = '﻿{"starsystems": [{"name": "Ködern", "owner": "Davion"}]}'.encode('utf-8')
+    system, = iterStarSystems(_chunks(data, 1), SlottedStarSystem)
+    assert isinstance(system, SlottedStarSystem)
+    assert system.name == 'Ködern'
+
+
+def test_truncatedDocumentRaises():
+    with pytest.raises(ValueError):
+        list(iterJsonArray(['{"starsystems": [1, ', '2'], 'starsystems'))
+
+
+@pytest.mark.parametrize('size', [1, 3, 64, 1 << 20])
+def test_asyncSystemsMatchTheWholeDocument(size, starMapPayload, readStarMap):
+    payload = starMapPayload(40)
+    expected = readStarMap(payload).toRawJson()['starsystems']
+    data = json.dumps(payload, indent=1).encode('utf-8')
+    systems = asyncio.run(_collect(aiterStarSystems(_received(_chunks(data, size)), SlottedStarSystem)))
+    assert all(isinstance(system, SlottedStarSystem) for system in systems)
+    assert [system._toJson() for system in systems] == expected
+
+
+@pytest.mark.parametrize('size', [1, 5, 1 << 20])
+def test_asyncArrayAmongOtherKeys(size):
+    document = '{"version": 12.5, "meta": {"starsystems": [9]}, "starsystems": [1, 2.5, "x,]", {"a": [1]}, null],' \
+               ' "after": [true]}'
+    assert asyncio.run(_collect(aiterJsonArray(_received(_chunks(document, size)), 'starsystems'))) == \
+        [1, 2.5, 'x,]', {'a': [1]}, None]
+    assert asyncio.run(_collect(aiterJsonArray(_received(['[12', '34, 5', '.25', ']']), None))) == [1234, 5.25]
+    with pytest.raises(ValueError):
+        asyncio.run(_collect(aiterJsonArray(_received(['{"starsystems": [1, ', '2']), 'starsystems')))
+
+
+def test_clientsStreamTheMap(stubServer, client, starMapPayload, readStarMap):
+    payload = starMapPayload(200)
+    expected = readStarMap(payload).toRawJson()['starsystems']
+    server = stubServer({'getmap': payload})
+
+    async def stream():
+        async with client(server, AsyncRogueWarApi) as api:
+            return [system._toJson() async for system in api.streamStarMap(chunkSize=100)]
+
+    assert [system._toJson() for system in client(server).streamStarMap(chunkSize=100)] == expected
+    assert asyncio.run(stream()) == expected
+
+
+def test_brokenStreamYieldsWhatWasReceived(stubServer, client, starMapPayload):
+    server = stubServer({'getmap': starMapPayload(1)})
+
+    async def stream():
+        async with client(server, AsyncRogueWarApi) as api:
+            return [system.name async for system in api.streamStarMap()]
+
+    server.setRoute('getmap', b'{"starsystems": [{"name": "a", "owner": "Davion"}, {"name": "b"')
+    assert asyncio.run(stream()) == ['a']
+    server.failRoute('getmap', 503)
+    assert asyncio.run(stream()) == []
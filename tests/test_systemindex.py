@@ -0,0 +1,171 @@
+import copy
+
+import pytest
+
+from roguewarapi.data import LazyStarMap, SlottedStarMap, StarMap, StarMapConstants, StarSystem, StarSystemConst
+from roguewarapi.data.systemindex import SystemIndex
+
+
+_MapClasses = [StarMap, SlottedStarMap, LazyStarMap]
+
+
+class _Item:
+
+    def __init__(self, name, owner):
+        self.name = name
+        self.owner = owner
+
+
+def _system(name, owner):
+    system = StarSystem()
+    assert system.fromJson({'name': name, 'owner': owner, 'factions': []})
+    return system
+
+
+def _ownedBy(systems, owner):
+    # what an owner lookup has to agree with
+    return [system for system in systems if system.owner == owner]
+
+
+def test_indexFollowsTheList():
+    index = SystemIndex('owner')
+    items = [_Item('a', 'Davion'), _Item('b', 'Liao'), _Item('c', 'Davion')]
+    assert index.byName(items, 'b') is items[1]
+    assert index.byOwner(items, 'Davion') == [items[0], items[2]]
+    assert index.owners(items) == ['Davion', 'Liao']
+    version = index.version
+    # a different list of the same length
+    replaced = [_Item('x', 'Kurita'), _Item('y', 'Kurita'), _Item('z', 'Liao')]
+    assert index.byName(replaced, 'a') is None
+    assert index.byName(replaced, 'y') is replaced[1]
+    assert index.version == version + 1
+    # the same list, grown
+    replaced.append(_Item('w', 'Davion'))
+    assert index.byOwner(replaced, 'Davion') == [replaced[3]]
+    assert index.version == version + 2
+    # nothing changed, nothing rebuilt
+    index.byName(replaced, 'w')
+    assert index.version == version + 2
+
+
+def test_addedItemIsFound():
+    index = SystemIndex('owner')
+    items = [_Item('a', 'Davion')]
+    index.rebuild(items)
+    item = _Item('b', 'Davion')
+    items.append(item)
+    index.added(item)
+    assert index.byName(items, 'b') is item
+    assert index.byOwner(items, 'Davion') == items
+    # the append was recorded, so the list isn't indexed again
+    assert index.version == 2
+
+
+def test_duplicateNamesFindTheFirst():
+    index = SystemIndex('owner')
+    items = [_Item('a', 'Davion'), _Item('a', 'Liao')]
+    assert index.byName(items, 'a') is items[0]
+    assert index.byOwner(items, 'Liao') == [items[1]]
+    duplicate = _Item('a', 'Kurita')
+    items.append(duplicate)
+    index.added(duplicate)
+    assert index.byName(items, 'a') is items[0]
+    assert index.byOwner(items, 'Kurita') == [duplicate]
+
+
+@pytest.mark.parametrize('cls', _MapClasses)
+def test_lookupsMatchAScan(cls, readStarMap, starMapPayload):
+    payload = starMapPayload(200)
+    starmap = readStarMap(payload, cls)
+    for system in starmap.systems:
+        assert starmap.findSystem(system.name) is system
+    owners = set(system['owner'] for system in payload['starsystems'])
+    for owner in owners:
+        assert starmap.findSystemsByOwner(owner) == _ownedBy(starmap.systems, owner)
+    assert starmap.findSystem('missing') is None
+    assert starmap.findSystemsByOwner('missing') == []
+
+
+def test_addSystemIsFound(readStarMap, starMapPayload):
+    starmap = readStarMap(starMapPayload(20))
+    owner = starmap.systems[0].owner
+    system = _system('New', owner)
+    starmap.addSystem(system)
+    assert starmap.findSystem('New') is system
+    assert starmap.findSystemsByOwner(owner)[-1] is system
+    assert starmap.findSystemsByOwner(owner) == _ownedBy(starmap.systems, owner)
+
+
+def test_replacedSystemsAreFound(readStarMap, starMapPayload):
+    starmap = readStarMap(starMapPayload(20))
+    first = starmap.systems[0]
+    # read a different map into the same object
+    assert starmap.fromJson(starMapPayload(20, seed=2))
+    assert starmap.findSystem(first.name) is starmap.systems[0]
+    assert starmap.findSystem(first.name) is not first
+    # replace the contents of the list with fewer systems
+    kept = starmap.systems[5:]
+    starmap.systems[:] = kept
+    assert starmap.findSystem(first.name) is None
+    assert starmap.findSystem(kept[0].name) is kept[0]
+    assert starmap.findSystemsByOwner(kept[0].owner) == _ownedBy(kept, kept[0].owner)
+
+
+@pytest.mark.parametrize('cls', _MapClasses)
+def test_inPlaceOwnerEditNeedsReindex(cls, readStarMap, starMapPayload):
+    starmap = readStarMap(starMapPayload(20), cls)
+    system = starmap.systems[0]
+    previous = system.owner
+    system.owner = 'NewOwner'
+    # the edit keeps the list the same length, so the tables still hold the old owner
+    assert system in starmap.findSystemsByOwner(previous)
+    assert starmap.findSystemsByOwner('NewOwner') == []
+    starmap.reindex()
+    assert system not in starmap.findSystemsByOwner(previous)
+    assert starmap.findSystemsByOwner('NewOwner') == [system]
+    assert starmap.findSystemsByOwner(previous) == _ownedBy(starmap.systems, previous)
+
+
+def test_duplicateSystemNames(readStarMap):
+    starmap = readStarMap({'starsystems': [{'name': 'a', 'owner': 'Davion'}, {'name': 'a', 'owner': 'Liao'}]})
+    first, second = starmap.systems
+    assert starmap.findSystem('a') is first
+    assert starmap.findSystemsByOwner('Liao') == [second]
+    starmap.addSystem(_system('a', 'Kurita'))
+    assert starmap.findSystem('a') is first
+
+
+def test_joinConstantsPairsByName(readStarMap, starMapPayload, constantsPayload):
+    starmap = readStarMap(starMapPayload(30))
+    constants = StarMapConstants()
+    # the constants are missing the last five systems and list the rest in another order
+    coordinates = constantsPayload(30)['Coordinates'][:25]
+    coordinates.reverse()
+    assert constants.fromJson({'Coordinates': coordinates})
+    joined = starmap.joinConstants(constants)
+    assert [system for system, const in joined] == starmap.systems
+    for system, const in joined[:25]:
+        assert const is not None
+        assert const.name == system.name
+    assert all(const is None for system, const in joined[25:])
+
+
+def test_findSystemsByOriginalOwner(constantsPayload):
+    payload = constantsPayload(200)
+    constants = StarMapConstants()
+    assert constants.fromJson(copy.deepcopy(payload))
+    owners = set(const['originalOwner'] for const in payload['Coordinates'])
+    for owner in owners:
+        expected = [const for const in constants.systemConstants if const.originalOwner == owner]
+        assert constants.findSystemsByOriginalOwner(owner) == expected
+    assert constants.findSystemsByOriginalOwner('missing') == []
+    const = StarSystemConst()
+    assert const.fromJson({'name': 'New', 'posx': 0, 'posy': 0, 'originalOwner': 'NewOwner'})
+    constants.addSystem(const)
+    assert constants.findSystemsByOriginalOwner('NewOwner') == [const]
+    assert constants.findSystem('New') is const
+    const.originalOwner = 'Other'
+    assert constants.findSystemsByOriginalOwner('Other') == []
+    constants.reindex()
+    assert constants.findSystemsByOriginalOwner('Other') == [const]
+    assert constants.findSystemsByOriginalOwner('NewOwner') == []
@@ -0,0 +1,76 @@
+from roguewarapi.data import StarMap, StarMapConstants, StarSystem
+
+
+# a line of systems 10 apart, with f far from everything and g not on the map
+_Positions = {'a': 0, 'b': 10, 'c': 20, 'd': 30, 'e': 40, 'g': 50, 'f': 1000}
+_Owners = {'a': 'Davion', 'b': 'Davion', 'c': 'Liao', 'd': 'Davion', 'e': 'Davion', 'f': 'Davion'}
+
+
+def _line():
+    constants = StarMapConstants()
+    constants.fromJson({'Coordinates': [{'name': name, 'posx': posx, 'posy': 0} for name, posx in _Positions.items()]})
+    starmap = StarMap()
+    starmap.fromJson({'starsystems': [{'name': name, 'owner': owner} for name, owner in _Owners.items()]})
+    return constants, starmap
+
+
+def test_territoryAndFrontier():
+    constants, starmap = _line()
+    territory = starmap.territory(constants, 10)
+    assert territory.territory('Davion') == [0, 1, 3, 4, 6]
+    assert territory.frontierNames('Davion') == ['b', 'd', 'e']
+    assert territory.frontierNames('Liao') == ['c']
+    assert territory.frontier('Kurita') == []
+    assert territory.ownerOf(5) is None
+    assert territory.ownerOf(2) == 'Liao'
+
+
+def test_distances():
+    constants, starmap = _line()
+    territory = starmap.territory(constants, 10)
+    assert territory.distances('Liao') == [2, 1, 0, 1, 2, 3, -1]
+    assert territory.withinJumps('Liao', 1) == [1, 3]
+    assert territory.distances('Kurita') == [-1] * 7
+
+
+def test_components():
+    constants, starmap = _line()
+    territory = starmap.territory(constants, 10)
+    assert territory.components('Davion') == [[0, 1], [3, 4], [6]]
+    assert territory.components('Liao') == [[2]]
+    assert starmap.territory(constants, 20).components('Davion') == [[0, 1, 3, 4], [6]]
+
+
+def test_territoryIsCachedUntilTheMapChanges():
+    constants, starmap = _line()
+    territory = starmap.territory(constants, 10)
+    assert starmap.territory(constants, 10) is territory
+    system = StarSystem()
+    system.name = 'g'
+    system.owner = 'Liao'
+    starmap.addSystem(system)
+    changed = starmap.territory(constants, 10)
+    assert changed is not territory
+    assert changed.frontierNames('Davion') == ['b', 'd', 'e']
+    assert changed.components('Liao') == [[2], [5]]
+
+
+def test_matchesTheAdjacencyLists(starMapPayload, constantsPayload):
+    constants = StarMapConstants()
+    constants.fromJson(constantsPayload(300))
+    constants.mapAdjacents(50)
+    starmap = StarMap()
+    starmap.fromJson(starMapPayload(300))
+    territory = starmap.territory(constants)
+    owners = {system.name: system.owner for system in starmap.systems}
+    for faction in set(owners.values()):
+        expected = [const.name for const in constants.systemConstants if owners[const.name] == faction and
+                    any(owners[name] != faction for name in const.adjacentSystems)]
+        assert territory.frontierNames(faction) == expected
+        distances = territory.distances(faction)
+        for node, const in enumerate(constants.systemConstants):
+            if distances[node] > 0:
+                neighbours = [distances[constants.adjacencyGraph.nodeOf(name)] for name in const.adjacentSystems]
+                assert min(distance for distance in neighbours if distance >= 0) == distances[node] - 1
+        assert sorted(node for component in territory.components(faction) for node in component) == \
+            territory.territory(faction)